@@ -1,29 +1,35 @@
 import os
+import click
 from flask import Flask
-from .extensions import db, migrate, jwt, cors, limiter, cache, ma
-from flask import Flask
-from flask_limiter import Limiter
-from flask_limiter.util import get_remote_address
-import redis
+from .extensions import db, jwt, cors, limiter, cache, ma, init_migrate
+from .json_provider import FastJSONProvider
+from .engine_tuning import configure_engines, install_sqlite_pragmas
+from . import db_routing
 from config import Config, TestConfig
 
 
 def create_app(config_class=None):
     app = Flask(__name__)
+    app.json = FastJSONProvider(app)
 
     # Use TestConfig for testing if no config provided
     if config_class is None:
         if os.environ.get('TESTING') or os.environ.get('FLASK_ENV') == 'testing':
             config_class = TestConfig
         else:
-            config_class = Config# Use TestConfig for testing if no config provided
+            config_class = Config
     
     # Use test config for tests, otherwise use default config
-    app.config.from_object('config.Config')
+    app.config.from_object(config_class)
     
     # Initialize extensions with the app
+    configure_engines(app)
     db.init_app(app)
-    migrate.init_app(app, db)
+    install_sqlite_pragmas(app)
+    db_routing.init_app(app)  # read replicas, when SQLALCHEMY_REPLICAS lists any
+    if click.get_current_context(silent=True) is not None:
+        # Only the `flask` CLI (`flask db ...`) needs Flask-Migrate and alembic
+        init_migrate(app)
     jwt.init_app(app)
     cors.init_app(app)
     limiter.init_app(app)
@@ -32,6 +38,11 @@ def create_app(config_class=None):
     
     # Import models (important for migrations and relationships)
     from application.models import Customer, Mechanic, Inventory, ServiceTicket, TicketPart, Vehicle
+    from . import ticket_stats  # registers the flush hooks that maintain mechanic_ticket_stats
+    from . import caching  # registers the commit hooks that invalidate cache tags
+    from . import low_stock  # registers the commit hooks that send low_stock_changed
+    from . import search  # creates the vehicle search index alongside the vehicles table
+    from . import vin_lookup  # registers the commit hooks that evict cached VIN lookups
     
     # Import and register blueprints
     from .blueprints.customer.routes import customer_bp
@@ -47,12 +58,20 @@ def create_app(config_class=None):
     app.register_blueprint(vehicles_bp, url_prefix='/vehicles')
     app.register_blueprint(service_ticket_bp, url_prefix='/service-tickets')
 
-    
-    # Print loaded routes for debugging
-    print("✓ Customer routes loaded")
-    print("✓ Mechanic routes loaded")
-    print("✓ Inventory routes loaded")
-    print("✓ Vehicle routes loaded")
-    print("✓ Service Ticket routes loaded")
-    
+    # Per-request SQL statement counts and timings
+    from . import instrumentation
+    instrumentation.init_app(app)
+
+    # Latency histograms and counters per endpoint, served at /metrics
+    from . import metrics
+    metrics.init_app(app)
+
+    # The precomputed API spec, served at /apispec.json
+    from . import swagger
+    swagger.init_app(app)
+
+    # Register CLI commands
+    from .commands import register_commands
+    register_commands(app)
+
     return app
\ No newline at end of file
@@ -1,21 +1,21 @@
 # application/blueprints/customer/routes.py
-from application.models import Customer, ServiceTicket, db, Vehicle, TicketPart
-from application.extensions import db, cache
+from application.models import Customer, ServiceTicket, db, Vehicle, TicketPart, ServiceTicketMechanic
+from application.extensions import db, limiter
 from flask import Blueprint
 from flask import request, jsonify
 from marshmallow import fields
+from sqlalchemy import delete, or_, select
 from application.blueprints.customer.customerSchemas import customer_schema, customers_schema, login_schema
-from flask_limiter import Limiter
-from flask_limiter.util import get_remote_address
 from auth.tokens import mechanic_token_required, token_required, encode_token
+from auth.passwords import HashPoolSaturated
+from application.pagination import InvalidCursor, page_from_request, wants_cursor
+from application.serialization import column_query, rows_to_dicts, serialize_query
+from application.ticket_stats import subtract_ticket_assignments
+from application.caching import cached_with_tags, invalidate_on_commit
+from application.conditional import conditional
 
 # Create the Blueprint instance
 customer_bp = Blueprint('customer', __name__)
-limiter = Limiter(key_func=get_remote_address)
-from flask_caching import Cache
-cache = Cache()
-# Add debug print
-print("✓ Loading customer routes")
 
 @customer_bp.route('/login', methods=['POST'])
 @limiter.limit("10 per minute")
@@ -63,6 +63,10 @@ def login():
         description: Too many requests
         schema:
           $ref: '#/definitions/Error'
+      503:
+        description: Password hashing pool saturated, retry later
+        schema:
+          $ref: '#/definitions/Error'
       500:
         description: Internal server error
         schema:
@@ -83,10 +87,14 @@ def login():
         customer = Customer.query.filter_by(email=data['email']).first()
         
         if customer and customer.check_password(data['password']):
+            if db.session.is_modified(customer):
+                db.session.commit()  # persist an upgraded password hash
             token = encode_token(customer.id)
             return jsonify({'token': token}), 200
         else:
             return jsonify({'message': 'Invalid credentials'}), 401
+    except HashPoolSaturated:
+        return jsonify({'error': 'Too many concurrent logins, please retry'}), 503, {'Retry-After': '1'}
     except Exception as e:
         return jsonify({'error': 'Login failed', 'details': str(e)}), 500
     
@@ -126,6 +134,8 @@ def update_customer(current_customer_id, customer_id):
         return jsonify({'error': 'Failed to update customer', 'details': str(e)}), 500
 
 @customer_bp.route('/', methods=['GET'])
+@conditional('customers')
+@cached_with_tags('customers', timeout=60)
 def get_customers():
     """
     Get all customers with pagination
@@ -147,6 +157,18 @@ def get_customers():
         description: Number of items per page
         default: 10
         example: 10
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: >
+          Switches to keyset pagination. Send an empty value for the first
+          page, then the next_cursor of the previous response.
+      - name: include_total
+        in: query
+        type: boolean
+        required: false
+        description: In cursor mode, include a cached estimate of the total
     responses:
       200:
         description: Customers retrieved successfully
@@ -166,31 +188,50 @@ def get_customers():
             current_page:
               type: integer
               example: 1
+            next_cursor:
+              type: string
+              description: Present in cursor mode; null on the last page
+      400:
+        description: Invalid cursor
+        schema:
+          $ref: '#/definitions/Error'
       500:
         description: Internal server error
         schema:
           $ref: '#/definitions/Error'
     """
     try:
+        query = column_query(Customer.query, Customer)
+        if wants_cursor():
+            page = page_from_request(query, [Customer.id])
+            return jsonify({
+                'customers': rows_to_dicts(page.items, Customer.serialized_fields),
+                **page.meta()
+            })
+
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
         
-        customers = Customer.query.paginate(
+        customers = query.paginate(
             page=page, 
             per_page=per_page, 
             error_out=False
         )
         
         return jsonify({
-            'customers': [customer.to_dict() for customer in customers.items],
+            'customers': rows_to_dicts(customers.items, Customer.serialized_fields),
             'total': customers.total,
             'pages': customers.pages,
             'current_page': page
         })
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': 'Failed to retrieve customers', 'details': str(e)}), 500
 
 @customer_bp.route('/<int:customer_id>', methods=['GET'])
+@conditional('customer:{customer_id}')
+@cached_with_tags('customer:{customer_id}')
 def get_customer(customer_id):
     """
     Get specific customer by ID
@@ -227,6 +268,28 @@ def get_customer(customer_id):
 def create_customer():
     """
     Create a new customer
+    ---
+    tags:
+      - Customers
+    parameters:
+      - in: body
+        name: body
+        required: true
+        schema:
+          $ref: '#/definitions/CustomerRegistration'
+    responses:
+      201:
+        description: Customer created successfully
+        schema:
+          $ref: '#/definitions/Customer'
+      400:
+        description: Validation errors
+        schema:
+          $ref: '#/definitions/ValidationError'
+      500:
+        description: Internal server error
+        schema:
+          $ref: '#/definitions/Error'
     """
     try:
         data = request.json
@@ -255,6 +318,9 @@ def create_customer():
         
         return jsonify(customer_schema.dump(customer)), 201
         
+    except HashPoolSaturated:
+        db.session.rollback()
+        return jsonify({'error': 'Server busy, please retry'}), 503, {'Retry-After': '1'}
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': 'Failed to create customer', 'details': str(e)}), 500
@@ -297,56 +363,86 @@ def delete_customer(current_customer_id, customer_id):
           $ref: '#/definitions/Error'
     """
     try:
-        print(f"DEBUG: current_customer_id = {current_customer_id}, customer_id = {customer_id}")
-        
         # Check authorization
         if int(current_customer_id) != customer_id:
-            print("DEBUG: Authorization failed")
             return jsonify({'message': 'Unauthorized - can only delete your own account'}), 403
-            
-        customer = Customer.query.get_or_404(customer_id)
-        print(f"DEBUG: Found customer: {customer.id}")
-        
-        # Delete associated vehicles first
-        print(f"DEBUG: Deleting {len(customer.vehicles)} vehicles")
-        for vehicle in customer.vehicles:
-            # Delete any service tickets associated with this vehicle
-            vehicle_tickets = ServiceTicket.query.filter_by(vehicle_id=vehicle.id).all()
-            for ticket in vehicle_tickets:
-                # Delete associated ticket parts
-                ticket_parts = TicketPart.query.filter_by(ticket_id=ticket.id).all()
-                for part in ticket_parts:
-                    db.session.delete(part)
-                db.session.delete(ticket)
-            db.session.delete(vehicle)
         
-        # Delete any remaining service tickets directly associated with customer
-        customer_tickets = ServiceTicket.query.filter_by(customer_id=customer_id).all()
-        print(f"DEBUG: Deleting {len(customer_tickets)} remaining service tickets")
-        for ticket in customer_tickets:
-            # Delete associated ticket parts
-            ticket_parts = TicketPart.query.filter_by(ticket_id=ticket.id).all()
-            for part in ticket_parts:
-                db.session.delete(part)
-            db.session.delete(ticket)
+        if not delete_customer_cascade(customer_id):
+            db.session.rollback()
+            return jsonify({'message': 'Customer not found'}), 404
         
-        # Now delete the customer
-        db.session.delete(customer)
         db.session.commit()
-        
-        print("DEBUG: Customer deleted successfully")
         return '', 204
         
     except Exception as e:
         db.session.rollback()
-        print(f"DEBUG: Error occurred: {str(e)}")
         return jsonify({'error': 'Failed to delete customer', 'details': str(e)}), 500
+
+def delete_customer_cascade(customer_id):
+    """
+    Delete a customer and everything hanging off it with set-based DELETEs.
+
+    Seven statements regardless of how many vehicles, tickets and parts the
+    customer has: one to take the tickets out of the mechanic ticket
+    counters, five DELETEs, and the SELECT of the vehicles' VINs that
+    application/vin_lookup.py evicts on commit. The tickets include other
+    customers' tickets on this customer's vehicles, so their DELETE returns
+    each ticket's customer to invalidate. Runs in the caller's transaction;
+    returns False if the customer doesn't exist.
+    """
+    vehicle_ids = select(Vehicle.id).where(Vehicle.customer_id == customer_id)
+    ticket_ids = select(ServiceTicket.id).where(or_(
+        ServiceTicket.customer_id == customer_id,
+        ServiceTicket.vehicle_id.in_(vehicle_ids)
+    ))
+
+    subtract_ticket_assignments(ticket_ids)
+    for statement in (
+        delete(TicketPart).where(TicketPart.ticket_id.in_(ticket_ids)),
+        delete(ServiceTicketMechanic).where(ServiceTicketMechanic.ticket_id.in_(ticket_ids)),
+    ):
+        db.session.execute(statement.execution_options(synchronize_session=False))
+    ticket_customer_ids = set(db.session.scalars(
+        delete(ServiceTicket).where(ServiceTicket.id.in_(ticket_ids))
+        .returning(ServiceTicket.customer_id)
+        .execution_options(synchronize_session=False)
+    ))
+    db.session.execute(
+        delete(Vehicle).where(Vehicle.customer_id == customer_id)
+        .execution_options(synchronize_session=False)
+    )
+
+    result = db.session.execute(
+        delete(Customer).where(Customer.id == customer_id)
+        .execution_options(synchronize_session=False)
+    )
+    # Bulk DELETEs skip the ORM hooks that invalidate cache tags
+    invalidate_on_commit('customers', 'vehicles', 'tickets',
+                         *(f'customer:{owner_id}' for owner_id in ticket_customer_ids | {customer_id}))
+    return result.rowcount > 0
+
 @customer_bp.route('/profile', methods=['GET'])
 @token_required
+@conditional('customer:{customer_id}')
+@cached_with_tags('customer:{customer_id}')
 def get_customer_profile(customer_id):
     """
     Get current customer profile
     ---
+    tags:
+      - Customers
+    security:
+      - BearerAuth: []
+    responses:
+      200:
+        description: Profile retrieved successfully
+        schema:
+          $ref: '#/definitions/Customer'
+      401:
+        description: Unauthorized
+        schema:
+          $ref: '#/definitions/Error'
+      404:
         description: Customer not found
         schema:
           $ref: '#/definitions/Error'
@@ -363,12 +459,43 @@ def get_customer_profile(customer_id):
     
 @customer_bp.route('/my-tickets', methods=['GET'])  # Should be '/my-tickets'
 @token_required
+@conditional('customer:{customer_id}')
+@cached_with_tags('customer:{customer_id}')
 def get_my_tickets(customer_id):
     """
     Get customer's service tickets
+    ---
+    tags:
+      - Customers
+    security:
+      - BearerAuth: []
+    responses:
+      200:
+        description: Customer tickets retrieved successfully
+        schema:
+          type: array
+          items:
+            $ref: '#/definitions/ServiceTicket'
+      401:
+        description: Unauthorized
+        schema:
+          $ref: '#/definitions/Error'
+      500:
+        description: Internal server error
+        schema:
+          $ref: '#/definitions/Error'
     """
     try:
-        tickets = ServiceTicket.query.filter_by(customer_id=customer_id).all()
-        return jsonify([ticket.to_dict() for ticket in tickets])
+        query = ServiceTicket.query.filter_by(customer_id=customer_id)
+        if wants_cursor():
+            page = page_from_request(column_query(query, ServiceTicket), [ServiceTicket.id])
+            return jsonify({
+                'tickets': rows_to_dicts(page.items, ServiceTicket.serialized_fields),
+                **page.meta()
+            })
+
+        return jsonify(serialize_query(query, ServiceTicket))
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': 'Failed to retrieve tickets', 'details': str(e)}), 500
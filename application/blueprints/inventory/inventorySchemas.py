@@ -9,9 +9,11 @@ class InventorySchema(Schema):
     quantity = fields.Int(load_default=0)
     price = fields.Float()  # ✅ Use 'missing'
     description = fields.Str()  # ✅ Use 'missing'
+    category = fields.Str()
+    min_stock_level = fields.Int(validate=Range(min=0))
     
     @validates('quantity')
-    def validate_quantity(self, value):
+    def validate_quantity(self, value, **kwargs):
         if value < 0:
             raise ValidationError('Quantity cannot be negative')
 
@@ -3,15 +3,35 @@ from application.models import Customer, ServiceTicket, db, Inventory, Mechanic
 from application.extensions import db, cache
 from application.blueprints.inventory import inventory_bp
 from application.blueprints.inventory.inventorySchemas import inventory_schema, inventories_schema
+from marshmallow import ValidationError
 from auth.tokens import mechanic_token_required, token_required, encode_token
+from application.pagination import InvalidCursor, page_from_request, wants_cursor
+from application.serialization import column_query, rows_to_dicts, serialize_query
+from application.streaming import stream_query, wants_stream
+from application.caching import cached_with_tags, invalidate_on_commit
+from datetime import datetime, timezone
+from sqlalchemy import insert, select, update
+from application.low_stock import record_stock_change
 
 @inventory_bp.route('/', methods=['GET'])
+@cached_with_tags('inventory', etag=True)
 def get_inventory():
     """
     Get all inventory items
     ---
     tags:
       - Inventory
+    produces:
+      - application/json
+      - application/x-ndjson
+    parameters:
+      - name: stream
+        in: query
+        type: boolean
+        required: false
+        description: >
+          Stream one JSON object per line (same as
+          Accept: application/x-ndjson)
     responses:
       200:
         description: Inventory items retrieved successfully
@@ -19,18 +39,32 @@ def get_inventory():
           type: array
           items:
             $ref: '#/definitions/InventoryItem'
+      304:
+        description: Not modified (If-None-Match matched the ETag)
       500:
         description: Internal server error
         schema:
           $ref: '#/definitions/Error'
     """
     try:
-        items = Inventory.query.all()
-        return jsonify([item.to_dict() for item in items])
+        if wants_stream():
+            return stream_query(Inventory.query.order_by(Inventory.id), Inventory)
+
+        if wants_cursor():
+            page = page_from_request(column_query(Inventory.query, Inventory), [Inventory.id])
+            return jsonify({
+                'items': rows_to_dicts(page.items, Inventory.serialized_fields),
+                **page.meta()
+            })
+
+        return jsonify(serialize_query(Inventory.query, Inventory))
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': 'Failed to retrieve inventory items', 'details': str(e)}), 500
 
 @inventory_bp.route('/<int:item_id>', methods=['GET'])
+@cached_with_tags('inventory:{item_id}', etag=True)
 def get_inventory_item(item_id):
     """
     Get specific inventory item by ID
@@ -48,6 +82,8 @@ def get_inventory_item(item_id):
         description: Inventory item retrieved successfully
         schema:
           $ref: '#/definitions/InventoryItem'
+      304:
+        description: Not modified (If-None-Match matched the ETag)
       404:
         description: Inventory item not found
         schema:
@@ -103,10 +139,7 @@ def create_inventory_item(mechanic_id):
             min_stock_level:
               type: integer
               example: 10
-              description: Minimum stock level before reordering
-            supplier:
-              type: string
-              example: "AutoParts Inc."
+              description: Reorder point; the item is low on stock at or below it
     responses:
       201:
         description: Inventory item created successfully
@@ -137,11 +170,10 @@ def create_inventory_item(mechanic_id):
         item = Inventory(
             name=data['item_name'],
             price=data.get('price', 0.0),
-            quantity=data.get('quantity', 0),
+            quantity_in_stock=data.get('quantity', 0),
             description=data.get('description', ''),
-            category=data.get('category', ''),
-            min_stock_level=data.get('min_stock_level', 0),
-            supplier=data.get('supplier', '')
+            category=data.get('category'),
+            min_stock_level=data.get('min_stock_level', 0)
         )
         
         db.session.add(item)
@@ -191,10 +223,8 @@ def update_inventory_item(mechanic_id, item_id):
               example: "Lubricants"
             min_stock_level:
               type: integer
-              example: 15
-            supplier:
-              type: string
-              example: "Premium AutoParts Inc."
+              example: 10
+              description: Reorder point; the item is low on stock at or below it
     responses:
       200:
         description: Inventory item updated successfully
@@ -229,15 +259,13 @@ def update_inventory_item(mechanic_id, item_id):
         if 'price' in data:
             item.price = data['price']
         if 'quantity' in data:
-            item.quantity = data['quantity']
+            item.quantity_in_stock = data['quantity']
         if 'description' in data:
             item.description = data['description']
         if 'category' in data:
             item.category = data['category']
         if 'min_stock_level' in data:
             item.min_stock_level = data['min_stock_level']
-        if 'supplier' in data:
-            item.supplier = data['supplier']
         
         db.session.commit()
         return jsonify(item.to_dict())
@@ -286,7 +314,278 @@ def delete_inventory_item(mechanic_id, item_id):
         db.session.rollback()
         return jsonify({'error': 'Failed to delete inventory item', 'details': str(e)}), 500
 
+# Upper bound on rows per batch request, to keep one transaction reasonable
+BATCH_MAX_ITEMS = 1000
+
+# Request field -> Inventory column
+_FIELD_COLUMNS = {
+    'item_name': 'name',
+    'price': 'price',
+    'quantity': 'quantity_in_stock',
+    'description': 'description',
+    'category': 'category',
+    'min_stock_level': 'min_stock_level',
+}
+
+def _to_columns(item):
+    return {_FIELD_COLUMNS[field]: value for field, value in item.items() if field in _FIELD_COLUMNS}
+
+def _load_items(items, partial=False):
+    """``({index: loaded item}, {index: errors})``; rows are built from the
+    loaded values, which have strings such as "7" converted"""
+    loaded, errors = {}, {}
+    for index, item in enumerate(items):
+        try:
+            loaded[index] = inventory_schema.load(item, partial=partial)
+        except ValidationError as e:
+            errors[index] = e.messages
+    return loaded, errors
+
+def _batch_payload():
+    """The request's JSON array, or an error response"""
+    items = request.get_json(silent=True)
+    if not isinstance(items, list) or not items:
+        return None, (jsonify({'error': 'Request body must be a non-empty JSON array'}), 400)
+    if len(items) > BATCH_MAX_ITEMS:
+        return None, (jsonify({'error': f'At most {BATCH_MAX_ITEMS} items per batch'}), 413)
+    return items, None
+
+def _batch_response(results, ok_status):
+    failed = sum(1 for result in results if result['status'] not in ('created', 'updated'))
+    if not failed:
+        status = ok_status
+    elif failed == len(results):
+        status = 422
+    else:
+        status = 207
+    return jsonify({'results': results, 'succeeded': len(results) - failed, 'failed': failed}), status
+
+@inventory_bp.route('/batch', methods=['POST'])
+@mechanic_token_required
+def create_inventory_batch(mechanic_id):
+    """
+    Create many inventory items in one transaction
+    ---
+    tags:
+      - Inventory
+    security:
+      - BearerAuth: []
+    parameters:
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: array
+          items:
+            type: object
+            required:
+              - item_name
+            properties:
+              item_name:
+                type: string
+                example: "Engine Oil"
+              price:
+                type: number
+                format: float
+                example: 29.99
+              quantity:
+                type: integer
+                example: 50
+              description:
+                type: string
+                example: "Synthetic engine oil 5W-30"
+              category:
+                type: string
+                example: "Lubricants"
+              min_stock_level:
+                type: integer
+                example: 10
+    responses:
+      201:
+        description: Every item was created; results are in request order
+      207:
+        description: Some items were invalid and skipped; the rest were created
+      400:
+        description: Body is not a non-empty JSON array
+        schema:
+          $ref: '#/definitions/Error'
+      401:
+        description: Unauthorized
+        schema:
+          $ref: '#/definitions/Error'
+      413:
+        description: More than BATCH_MAX_ITEMS items
+        schema:
+          $ref: '#/definitions/Error'
+      422:
+        description: No item was valid
+      500:
+        description: Internal server error
+        schema:
+          $ref: '#/definitions/Error'
+    """
+    items, error = _batch_payload()
+    if error:
+        return error
+
+    try:
+        loaded, errors = _load_items(items)
+        valid = list(loaded)
+        rows = [
+            {'price': 0.0, 'quantity_in_stock': 0, 'min_stock_level': 0, 'description': '',
+             **_to_columns(loaded[index])}
+            for index in valid
+        ]
+
+        results = [{'index': index, 'status': 'invalid', 'errors': errors[index]} for index in errors]
+        if rows:
+            # Multi-row INSERT ... RETURNING instead of a flush per object. On
+            # SQLite, asking SQLAlchemy to order RETURNING falls back to one
+            # INSERT per row; SQLite hands out rowids in VALUES order within a
+            # statement, so sorting the ids gives the same pairing.
+            ordered = db.session.get_bind().dialect.name != 'sqlite'
+            ids = db.session.scalars(
+                insert(Inventory).returning(Inventory.id, sort_by_parameter_order=ordered), rows
+            ).all()
+            if not ordered:
+                ids.sort()
+            invalidate_on_commit('inventory', *{f"inventory:category:{row.get('category')}" for row in rows})
+            for item_id, row in zip(ids, rows):
+                record_stock_change(item_id, None, (row['quantity_in_stock'], row['min_stock_level']))
+            db.session.commit()
+            results += [{'index': index, 'status': 'created', 'id': item_id} for index, item_id in zip(valid, ids)]
+
+        results.sort(key=lambda result: result['index'])
+        return _batch_response(results, 201)
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to create inventory items', 'details': str(e)}), 500
+
+@inventory_bp.route('/batch', methods=['PATCH'])
+@mechanic_token_required
+def update_inventory_batch(mechanic_id):
+    """
+    Update many inventory items in one transaction
+    ---
+    tags:
+      - Inventory
+    security:
+      - BearerAuth: []
+    parameters:
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: array
+          items:
+            type: object
+            required:
+              - id
+            properties:
+              id:
+                type: integer
+                example: 1
+              item_name:
+                type: string
+              price:
+                type: number
+                format: float
+              quantity:
+                type: integer
+              description:
+                type: string
+              category:
+                type: string
+              min_stock_level:
+                type: integer
+    responses:
+      200:
+        description: Every item was updated; results are in request order
+      207:
+        description: Some items were invalid or not found; the rest were updated
+      400:
+        description: Body is not a non-empty JSON array
+        schema:
+          $ref: '#/definitions/Error'
+      401:
+        description: Unauthorized
+        schema:
+          $ref: '#/definitions/Error'
+      413:
+        description: More than BATCH_MAX_ITEMS items
+        schema:
+          $ref: '#/definitions/Error'
+      422:
+        description: No item could be updated
+      500:
+        description: Internal server error
+        schema:
+          $ref: '#/definitions/Error'
+    """
+    items, error = _batch_payload()
+    if error:
+        return error
+
+    try:
+        results = {}
+        for index, item in enumerate(items):
+            if not isinstance(item, dict) or not isinstance(item.get('id'), int):
+                results[index] = {'index': index, 'status': 'invalid', 'errors': {'id': ['Missing or invalid id']}}
+
+        candidates = [index for index in range(len(items)) if index not in results]
+        loaded, errors = _load_items(
+            [{k: v for k, v in items[index].items() if k != 'id'} for index in candidates], partial=True
+        )
+        changes = {}
+        for position, index in enumerate(candidates):
+            if position in errors:
+                results[index] = {'index': index, 'status': 'invalid', 'errors': errors[position]}
+            else:
+                changes[index] = loaded[position]
+
+        candidates = [index for index in candidates if index not in results]
+        current = {
+            row.id: row for row in db.session.execute(
+                select(Inventory.id, Inventory.category, Inventory.quantity_in_stock, Inventory.min_stock_level)
+                .where(Inventory.id.in_({items[index]['id'] for index in candidates}))
+            )
+        }
+
+        now = datetime.now(timezone.utc)
+        rows = []
+        for index in candidates:
+            item_id = items[index]['id']
+            if item_id not in current:
+                results[index] = {'index': index, 'status': 'not_found', 'id': item_id}
+                continue
+            rows.append({'id': item_id, **_to_columns(changes[index]), 'updated_at': now})
+            results[index] = {'index': index, 'status': 'updated', 'id': item_id}
+
+        if rows:
+            # ORM bulk UPDATE by primary key: executemany, grouped by the set of columns sent
+            db.session.execute(update(Inventory), rows)
+            tags = {'inventory'}
+            for row in rows:
+                before = current[row['id']]
+                tags.add(f"inventory:{row['id']}")
+                tags.add(f"inventory:category:{before.category}")
+                if 'category' in row:
+                    tags.add(f"inventory:category:{row['category']}")
+                record_stock_change(
+                    row['id'], (before.quantity_in_stock, before.min_stock_level),
+                    (row.get('quantity_in_stock', before.quantity_in_stock),
+                     row.get('min_stock_level', before.min_stock_level))
+                )
+            invalidate_on_commit(*tags)
+            db.session.commit()
+
+        return _batch_response([results[index] for index in range(len(items))], 200)
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to update inventory items', 'details': str(e)}), 500
+
 @inventory_bp.route('/low-stock', methods=['GET'])
+@cached_with_tags('inventory', etag=True)
 def get_low_stock_items():
     """
     Get inventory items with low stock
@@ -307,6 +606,8 @@ def get_low_stock_items():
           type: array
           items:
             $ref: '#/definitions/InventoryItem'
+      304:
+        description: Not modified (If-None-Match matched the ETag)
       500:
         description: Internal server error
         schema:
@@ -315,18 +616,19 @@ def get_low_stock_items():
     try:
         threshold = request.args.get('threshold', type=int)
         
-        if threshold:
-            # Use custom threshold
-            items = Inventory.query.filter(Inventory.quantity <= threshold).all()
+        if threshold is not None:
+            # Custom threshold: range scan on ix_inventory_quantity_in_stock
+            query = Inventory.query.filter(Inventory.quantity_in_stock <= threshold)
         else:
-            # Use min_stock_level
-            items = Inventory.query.filter(Inventory.quantity <= Inventory.min_stock_level).all()
+            # Per-item min_stock_level: matches the partial index ix_inventory_low_stock
+            query = Inventory.query.filter(Inventory.quantity_in_stock <= Inventory.min_stock_level)
         
-        return jsonify([item.to_dict() for item in items])
+        return jsonify(serialize_query(query, Inventory))
     except Exception as e:
         return jsonify({'error': 'Failed to retrieve low stock items', 'details': str(e)}), 500
 
 @inventory_bp.route('/category/<category_name>', methods=['GET'])
+@cached_with_tags('inventory:category:{category_name}', etag=True)
 def get_inventory_by_category(category_name):
     """
     Get inventory items by category
@@ -343,6 +645,8 @@ def get_inventory_by_category(category_name):
           type: array
           items:
             $ref: '#/definitions/InventoryItem'
+      304:
+        description: Not modified (If-None-Match matched the ETag)
       500:
         description: Internal server error
         schema:
@@ -1,10 +1,14 @@
-from application.models import Customer, ServiceTicket, Mechanic
+from application.models import Customer, ServiceTicket, Mechanic, MechanicTicketStats
 from application.extensions import db, cache
+from application.caching import cached_with_tags
+from application.conditional import conditional
 from flask import request, jsonify
 from application.blueprints.mechanic.mechanicSchemas import mechanic_schema, mechanics_schema, login_schema
 from auth.tokens import mechanic_token_required, token_required, encode_token
+from auth.passwords import HashPoolSaturated
 from . import mechanic_bp
 from application.extensions import cache, limiter
+from application.pagination import InvalidCursor, page_from_request, wants_cursor
 
 @mechanic_bp.route('/stats', methods=['GET'])
 def mechanic_stats():
@@ -26,31 +30,43 @@ def mechanic_stats():
               ticket_count:
                 type: integer
                 example: 5
+              open:
+                type: integer
+                example: 2
+              in_progress:
+                type: integer
+                example: 1
+              completed:
+                type: integer
+                example: 2
       500:
         description: Internal server error
         schema:
           $ref: '#/definitions/Error'
     """
     try:
-        mechanics = db.session.query(
-            Mechanic,
-            db.func.count(ServiceTicket.id).label('ticket_count')
-        ).outerjoin(ServiceTicket).group_by(Mechanic.id).all()
-        
-        result = [
-            {
+        # Counters are maintained on write (application/ticket_stats.py), so
+        # this is one pass over mechanics rather than a GROUP BY over tickets.
+        rows = db.session.query(Mechanic, MechanicTicketStats) \
+            .outerjoin(MechanicTicketStats, MechanicTicketStats.mechanic_id == Mechanic.id) \
+            .order_by(Mechanic.id).all()
+
+        result = []
+        for mechanic, stats in rows:
+            counts = stats.to_dict() if stats else {'open': 0, 'in_progress': 0, 'completed': 0, 'total': 0}
+            result.append({
                 'mechanic': mechanic_schema.dump(mechanic),
-                'ticket_count': count
-            }
-            for mechanic, count in mechanics
-        ]
-        
+                'ticket_count': counts.pop('total'),
+                **counts
+            })
+
         return jsonify(result)
     except Exception as e:
         return jsonify({'error': 'Failed to retrieve statistics', 'details': str(e)}), 500
 
 @mechanic_bp.route('/cached', methods=['GET'])
-@cache.cached(timeout=60, key_prefix='mechanics_list')
+@conditional('mechanics')
+@cached_with_tags('mechanics', timeout=60)
 def cached_route():
     """
     Get cached mechanics list
@@ -101,7 +117,8 @@ def rate_limited_route():
 
 @mechanic_bp.route('/', methods=['GET'])
 @token_required
-def get_mechanics():
+@conditional('mechanics')
+def get_mechanics(current_user):
     """
     Get all mechanics
     ---
@@ -126,8 +143,17 @@ def get_mechanics():
           $ref: '#/definitions/Error'
     """
     try:
+        if wants_cursor():
+            page = page_from_request(Mechanic.query, [Mechanic.id])
+            return jsonify({
+                'mechanics': mechanics_schema.dump(page.items),
+                **page.meta()
+            })
+
         mechanics = Mechanic.query.all()
         return jsonify(mechanics_schema.dump(mechanics))
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': 'Failed to retrieve mechanics', 'details': str(e)}), 500
 
@@ -199,13 +225,15 @@ def register_mechanic():
         
         db.session.add(new_mechanic)
         db.session.commit()
-        cache.delete('mechanics_list')
         
         return jsonify({
             'message': 'Mechanic registered successfully',
             'mechanic': mechanic_schema.dump(new_mechanic)
         }), 201
         
+    except HashPoolSaturated:
+        db.session.rollback()
+        return jsonify({'error': 'Server busy, please retry'}), 503, {'Retry-After': '1'}
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': 'Failed to register mechanic', 'details': str(e)}), 500
@@ -252,6 +280,10 @@ def login():
         description: Invalid credentials
         schema:
           $ref: '#/definitions/Error'
+      503:
+        description: Password hashing pool saturated, retry later
+        schema:
+          $ref: '#/definitions/Error'
       500:
         description: Internal server error
         schema:
@@ -266,6 +298,8 @@ def login():
         mechanic = Mechanic.query.filter_by(email=data.get('email')).first()
         
         if mechanic and mechanic.check_password(data.get('password')):
+            if db.session.is_modified(mechanic):
+                db.session.commit()  # persist an upgraded password hash
             token = encode_token(mechanic.id)
             return jsonify({
                 "token": token,
@@ -273,13 +307,36 @@ def login():
             })
         
         return jsonify({"message": "Invalid credentials"}), 401
+    except HashPoolSaturated:
+        return jsonify({'error': 'Too many concurrent logins, please retry'}), 503, {'Retry-After': '1'}
     except Exception as e:
         return jsonify({'error': 'Login failed', 'details': str(e)}), 500
 
 @mechanic_bp.route('/profile', methods=['GET'])
 @mechanic_token_required  # This passes mechanic_id to the function
+@conditional('mechanic:{mechanic_id}')
 def mechanic_profile(mechanic_id):  # ✅ Must accept mechanic_id parameter
-    """Get current mechanic profile"""
+    """
+    Get current mechanic profile
+    ---
+    tags:
+      - Mechanics
+    security:
+      - BearerAuth: []
+    responses:
+      200:
+        description: Profile retrieved successfully
+        schema:
+          $ref: '#/definitions/MechanicResponse'
+      401:
+        description: Unauthorized
+        schema:
+          $ref: '#/definitions/Error'
+      404:
+        description: Mechanic not found
+        schema:
+          $ref: '#/definitions/Error'
+    """
     try:
         mechanic = Mechanic.query.get_or_404(mechanic_id)
         return jsonify(mechanic_schema.dump(mechanic))
@@ -287,8 +344,8 @@ def mechanic_profile(mechanic_id):  # ✅ Must accept mechanic_id parameter
         return jsonify({'error': 'Failed to retrieve profile', 'details': str(e)}), 500
 
 @mechanic_bp.route('/profile', methods=['PUT'])
-@token_required
-def update_mechanic_profile():
+@mechanic_token_required
+def update_mechanic_profile(mechanic_id):
     """
     Update current mechanic profile
     ---
@@ -323,10 +380,13 @@ def update_mechanic_profile():
         description: Internal server error
         schema:
           $ref: '#/definitions/Error'
+      503:
+        description: Password hashing pool saturated, retry later
+        schema:
+          $ref: '#/definitions/Error'
     """
     try:
         data = request.get_json()
-        mechanic_id = getattr(request, 'user_id', None)
         mechanic = Mechanic.query.get_or_404(mechanic_id)
         
         errors = mechanic_schema.validate(data, partial=True)
@@ -341,15 +401,18 @@ def update_mechanic_profile():
             mechanic.set_password(data['password'])
         
         db.session.commit()
-        cache.delete('mechanics_list')
         return jsonify(mechanic_schema.dump(mechanic))
+    except HashPoolSaturated:
+        db.session.rollback()
+        return jsonify({'error': 'Server busy, please retry'}), 503, {'Retry-After': '1'}
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': 'Failed to update profile', 'details': str(e)}), 500
 
 @mechanic_bp.route('/<int:mechanic_id>', methods=['GET'])
 @token_required
-def get_mechanic(mechanic_id):
+@conditional('mechanic:{mechanic_id}')
+def get_mechanic(current_user, mechanic_id):
     """
     Get specific mechanic by ID
     ---
@@ -389,7 +452,7 @@ def get_mechanic(mechanic_id):
 
 @mechanic_bp.route('/<int:mechanic_id>', methods=['PUT'])
 @token_required
-def update_mechanic(mechanic_id):
+def update_mechanic(current_user, mechanic_id):
     """
     Update specific mechanic by ID
     ---
@@ -429,6 +492,10 @@ def update_mechanic(mechanic_id):
         description: Internal server error
         schema:
           $ref: '#/definitions/Error'
+      503:
+        description: Password hashing pool saturated, retry later
+        schema:
+          $ref: '#/definitions/Error'
     """
     try:
         data = request.get_json()
@@ -447,8 +514,10 @@ def update_mechanic(mechanic_id):
             mechanic.set_password(data['password'])
         
         db.session.commit()
-        cache.delete('mechanics_list')
         return jsonify(mechanic_schema.dump(mechanic))
+    except HashPoolSaturated:
+        db.session.rollback()
+        return jsonify({'error': 'Server busy, please retry'}), 503, {'Retry-After': '1'}
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': 'Failed to update mechanic', 'details': str(e)}), 500
@@ -495,7 +564,6 @@ def delete_mechanic(mechanic_id):
         mechanic = Mechanic.query.get_or_404(mechanic_id)
         db.session.delete(mechanic)
         db.session.commit()
-        cache.delete('mechanics_list')
         return jsonify({'message': 'Mechanic deleted successfully'})
     except Exception as e:
         db.session.rollback()
@@ -1,29 +1,338 @@
 # Import necessary modules and blueprints
-from application.models import Customer, ServiceTicket, db
+from application.models import Customer, Inventory, ServiceTicket, ServiceTicketMechanic, Mechanic, TicketPart, Vehicle, db
 from application.extensions import db, cache
 from flask import blueprints, request, jsonify
-from flask_jwt_extended import jwt_required
+from sqlalchemy import select
 from auth.tokens import mechanic_token_required, token_required, encode_token
+from application.pagination import InvalidCursor, page_from_request, wants_cursor
+from application.caching import invalidate_on_commit
+from application.stock import InsufficientStock, reserve_stock, stock_shortages
+from application.ticket_stats import TICKET_STATUSES
+from collections import Counter
+from .serviceTicketSchemas import service_ticket_create_schema, ticket_parts_schema
 from . import service_ticket_bp  # Import from __init__.py
 
 @service_ticket_bp.route('/api/service-tickets', methods=['GET'])
-@jwt_required()
-def get_service_tickets():
-    """Get all service tickets"""
-    return jsonify({"message": "Service tickets endpoint", "data": []})
+@mechanic_token_required
+def get_service_tickets(mechanic_id):
+    """
+    Get service tickets with their parts and assigned mechanics
+    ---
+    tags:
+      - Service Tickets
+    security:
+      - BearerAuth: []
+    parameters:
+      - name: status
+        in: query
+        type: string
+        required: false
+        example: "open"
+      - name: customer_id
+        in: query
+        type: integer
+        required: false
+        example: 1
+      - name: cursor
+        in: query
+        type: string
+        required: false
+        description: Switches to keyset pagination (empty value for the first page)
+      - name: per_page
+        in: query
+        type: integer
+        required: false
+        default: 10
+    responses:
+      200:
+        description: Service tickets retrieved successfully
+        schema:
+          type: array
+          items:
+            $ref: '#/definitions/ServiceTicket'
+      400:
+        description: Invalid cursor
+        schema:
+          $ref: '#/definitions/Error'
+      401:
+        description: Unauthorized
+        schema:
+          $ref: '#/definitions/Error'
+      500:
+        description: Internal server error
+        schema:
+          $ref: '#/definitions/Error'
+    """
+    try:
+        # Parts, their inventory items and mechanics come from two extra
+        # SELECT ... IN queries, however many tickets are returned
+        query = ServiceTicket.query.options(*ServiceTicket.detail_options())
+        
+        status = request.args.get('status')
+        if status:
+            query = query.filter_by(status=status)
+        customer_id = request.args.get('customer_id', type=int)
+        if customer_id:
+            query = query.filter_by(customer_id=customer_id)
+        
+        if wants_cursor():
+            page = page_from_request(query, [ServiceTicket.id])
+            return jsonify({
+                'tickets': [ticket.to_detail_dict() for ticket in page.items],
+                **page.meta()
+            })
+        
+        tickets = query.order_by(ServiceTicket.id).all()
+        return jsonify([ticket.to_detail_dict() for ticket in tickets])
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': 'Failed to retrieve service tickets', 'details': str(e)}), 500
 
 @service_ticket_bp.route('/api/service-tickets', methods=['POST'])
-@jwt_required()
-def create_service_ticket():
-    """Create a new service ticket"""
-    data = request.get_json()
-    return jsonify({"message": "Service ticket created", "data": data}), 201
+@mechanic_token_required
+def create_service_ticket(mechanic_id):
+    """
+    Create a new service ticket
+    ---
+    tags:
+      - Service Tickets
+    security:
+      - BearerAuth: []
+    parameters:
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: object
+          required:
+            - customer_id
+            - vehicle_id
+            - issue_description
+          properties:
+            customer_id:
+              type: integer
+              example: 1
+            vehicle_id:
+              type: integer
+              example: 1
+            issue_description:
+              type: string
+              example: "Grinding noise when braking"
+            status:
+              type: string
+              enum: [open, pending, in_progress, completed, cancelled]
+              example: "open"
+            mechanic_ids:
+              type: array
+              items:
+                type: integer
+              example: [1, 2]
+    responses:
+      201:
+        description: Service ticket created successfully
+        schema:
+          $ref: '#/definitions/ServiceTicket'
+      400:
+        description: Validation errors
+        schema:
+          $ref: '#/definitions/ValidationError'
+      401:
+        description: Unauthorized
+        schema:
+          $ref: '#/definitions/Error'
+      404:
+        description: Customer, vehicle or mechanic not found
+        schema:
+          $ref: '#/definitions/Error'
+      409:
+        description: Vehicle belongs to another customer
+        schema:
+          $ref: '#/definitions/Error'
+      500:
+        description: Internal server error
+        schema:
+          $ref: '#/definitions/Error'
+    """
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': 'No data provided'}), 400
+        
+        errors = service_ticket_create_schema.validate(data)
+        if errors:
+            return jsonify({'errors': errors}), 400
+        data = service_ticket_create_schema.load(data)
+        
+        if db.session.get(Customer, data['customer_id']) is None:
+            return jsonify({'error': 'Customer not found'}), 404
+        vehicle = db.session.get(Vehicle, data['vehicle_id'])
+        if vehicle is None:
+            return jsonify({'error': 'Vehicle not found'}), 404
+        if vehicle.customer_id != data['customer_id']:
+            return jsonify({'error': 'Vehicle does not belong to customer'}), 409
+        
+        mechanic_ids = set(data['mechanic_ids'])
+        if mechanic_ids:
+            found = set(db.session.scalars(select(Mechanic.id).where(Mechanic.id.in_(mechanic_ids))))
+            if found != mechanic_ids:
+                return jsonify({'error': 'Mechanic not found', 'mechanic_ids': sorted(mechanic_ids - found)}), 404
+        
+        ticket = ServiceTicket(
+            customer_id=data['customer_id'],
+            vehicle_id=data['vehicle_id'],
+            issue_description=data['issue_description'],
+            status=data['status'],
+            mechanic_assignments=[ServiceTicketMechanic(mechanic_id=m_id) for m_id in sorted(mechanic_ids)]
+        )
+        db.session.add(ticket)
+        db.session.commit()
+        
+        ticket = ServiceTicket.query.options(*ServiceTicket.detail_options()).filter_by(id=ticket.id).one()
+        return jsonify(ticket.to_detail_dict()), 201
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to create service ticket', 'details': str(e)}), 500
 
 @service_ticket_bp.route('/api/service-tickets/<int:ticket_id>', methods=['GET'])
-@jwt_required()
-def get_service_ticket(ticket_id):
-    """Get a specific service ticket"""
-    return jsonify({"message": f"Service ticket {ticket_id}", "data": {}})
+@mechanic_token_required
+def get_service_ticket(mechanic_id, ticket_id):
+    """
+    Get a specific service ticket with its parts and assigned mechanics
+    ---
+    tags:
+      - Service Tickets
+    security:
+      - BearerAuth: []
+    parameters:
+      - name: ticket_id
+        in: path
+        type: integer
+        required: true
+        example: 1
+    responses:
+      200:
+        description: Service ticket retrieved successfully
+        schema:
+          $ref: '#/definitions/ServiceTicket'
+      401:
+        description: Unauthorized
+        schema:
+          $ref: '#/definitions/Error'
+      404:
+        description: Ticket not found
+        schema:
+          $ref: '#/definitions/Error'
+    """
+    ticket = ServiceTicket.query.options(*ServiceTicket.detail_options()) \
+        .filter_by(id=ticket_id).first_or_404()
+    return jsonify(ticket.to_detail_dict())
+
+@service_ticket_bp.route('/api/service-tickets/<int:ticket_id>/parts', methods=['POST'])
+@mechanic_token_required
+def add_ticket_parts(mechanic_id, ticket_id):
+    """
+    Consume parts on a service ticket, taking them out of stock
+    ---
+    tags:
+      - Service Tickets
+    security:
+      - BearerAuth: []
+    parameters:
+      - name: ticket_id
+        in: path
+        type: integer
+        required: true
+        example: 1
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: object
+          required:
+            - parts
+          properties:
+            parts:
+              type: array
+              items:
+                type: object
+                required:
+                  - inventory_id
+                  - quantity
+                properties:
+                  inventory_id:
+                    type: integer
+                    example: 3
+                  quantity:
+                    type: integer
+                    example: 2
+    responses:
+      201:
+        description: Parts recorded and stock decremented; returns the updated ticket
+        schema:
+          $ref: '#/definitions/ServiceTicket'
+      400:
+        description: Validation errors
+        schema:
+          $ref: '#/definitions/ValidationError'
+      401:
+        description: Unauthorized
+        schema:
+          $ref: '#/definitions/Error'
+      404:
+        description: Ticket or inventory item not found
+        schema:
+          $ref: '#/definitions/Error'
+      409:
+        description: Not enough stock for one or more parts; nothing was recorded
+        schema:
+          $ref: '#/definitions/Error'
+      500:
+        description: Internal server error
+        schema:
+          $ref: '#/definitions/Error'
+    """
+    try:
+        data = request.get_json(silent=True)
+        errors = ticket_parts_schema.validate(data or {})
+        if errors:
+            return jsonify({'errors': errors}), 400
+        lines = ticket_parts_schema.load(data)['parts']
+
+        if db.session.get(ServiceTicket, ticket_id) is None:
+            return jsonify({'error': 'Ticket not found'}), 404
+
+        quantities = Counter()
+        for line in lines:
+            quantities[line['inventory_id']] += line['quantity']
+
+        categories = dict(db.session.execute(
+            select(Inventory.id, Inventory.category).where(Inventory.id.in_(quantities))
+        ).all())
+        missing = sorted(set(quantities) - set(categories))
+        if missing:
+            return jsonify({'error': 'Inventory item not found', 'inventory_ids': missing}), 404
+
+        try:
+            reserve_stock(quantities)
+        except InsufficientStock:
+            db.session.rollback()
+            return jsonify({'error': 'Insufficient stock', 'shortages': stock_shortages(quantities)}), 409
+
+        db.session.add_all(
+            TicketPart(ticket_id=ticket_id, inventory_id=line['inventory_id'], quantity_used=line['quantity'])
+            for line in lines
+        )
+        invalidate_on_commit('inventory',
+                             *(f'inventory:{item_id}' for item_id in categories),
+                             *(f'inventory:category:{category}' for category in set(categories.values())))
+        db.session.commit()
+
+        ticket = ServiceTicket.query.options(*ServiceTicket.detail_options()).filter_by(id=ticket_id).one()
+        return jsonify(ticket.to_detail_dict()), 201
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Failed to add parts', 'details': str(e)}), 500
 
 @service_ticket_bp.route('/api/service-tickets/<int:ticket_id>', methods=['PUT'])
 @mechanic_token_required
@@ -52,7 +361,7 @@ def update_service_ticket(mechanic_id, ticket_id):
               example: "Updated description of the issue"
             status:
               type: string
-              enum: [pending, in_progress, completed, cancelled]
+              enum: [open, pending, in_progress, completed, cancelled]
               example: "in_progress"
             priority:
               type: string
@@ -88,8 +397,10 @@ def update_service_ticket(mechanic_id, ticket_id):
             return jsonify({'error': 'No data provided'}), 400
         
         if 'description' in data:
-            ticket.description = data['description']
+            ticket.issue_description = data['description']
         if 'status' in data:
+            if data['status'] not in TICKET_STATUSES:
+                return jsonify({'error': 'Invalid status', 'allowed': list(TICKET_STATUSES)}), 400
             ticket.status = data['status']
         if 'priority' in data:
             ticket.priority = data['priority']
@@ -1,6 +1,8 @@
 from marshmallow import fields, validates, ValidationError
+from marshmallow.validate import Length, OneOf, Range
 from application.extensions import ma
 from application.models import ServiceTicket, Mechanic, Inventory, TicketPart
+from application.ticket_stats import TICKET_STATUSES
 
 class ServiceTicketSchema(ma.SQLAlchemyAutoSchema):
     class Meta:
@@ -20,11 +22,22 @@ class ServiceTicketSchema(ma.SQLAlchemyAutoSchema):
 
 class ServiceTicketCreateSchema(ma.Schema):
     """Manual schema for creating service tickets"""
-    description = fields.Str(required=True)
     customer_id = fields.Int(required=True)
-    priority = fields.Str(load_default="normal")
+    vehicle_id = fields.Int(required=True)
+    issue_description = fields.Str(required=True)
+    status = fields.Str(load_default="open", validate=OneOf(TICKET_STATUSES))
+    mechanic_ids = fields.List(fields.Int(), load_default=list)
+
+class TicketPartLineSchema(ma.Schema):
+    inventory_id = fields.Int(required=True)
+    quantity = fields.Int(required=True, validate=Range(min=1))
+
+class TicketPartsSchema(ma.Schema):
+    """Parts consumed on a ticket"""
+    parts = fields.List(fields.Nested(TicketPartLineSchema), required=True, validate=Length(min=1))
 
 # Initialize schemas
 service_ticket_schema = ServiceTicketSchema()
 service_tickets_schema = ServiceTicketSchema(many=True)
-service_ticket_create_schema = ServiceTicketCreateSchema()
\ No newline at end of file
+service_ticket_create_schema = ServiceTicketCreateSchema()
+ticket_parts_schema = TicketPartsSchema()
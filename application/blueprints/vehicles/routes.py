@@ -4,8 +4,18 @@ from application.extensions import db, cache
 from.vehicle_schemas import vehicle_schema, vehicle_update_schema, vehicles_schema, vehicle_response_schema
 from auth.tokens import mechanic_token_required, token_required, encode_token
 from flask import Blueprint, request, jsonify
+from sqlalchemy.orm import joinedload
 from .vehicle_schemas import vehicle_schema, vehicle_update_schema, vehicle_schema, vehicle_response_schema
 from auth.tokens import token_required
+from application.pagination import InvalidCursor, page_from_request, wants_cursor
+from application.streaming import stream_query, wants_stream
+from application.conditional import conditional
+from application.caching import cached_with_tags
+from application.search import matching_criteria, search_terms, search_vehicles
+from application.vin_lookup import lookup_vin, lookup_vins
+
+SEARCH_MAX_LIMIT = 100
+VIN_BATCH_MAX = 500
 
 # Create blueprint
 vehicles_bp = Blueprint('vehicles', __name__, url_prefix='/vehicles')
@@ -44,26 +54,156 @@ def create_vehicle(current_user):
         db.session.rollback()
         return jsonify({'error': str(e)}), 400
 
-@vehicles_bp.route('/vehicles', methods=['GET'])
-@token_required
-def get_vehicles(current_user):
-    """Get all vehicles (with optional customer_id filter)"""
+def _vehicle_filters():
+    """Criteria for the customer_id / make query parameters of GET /vehicles"""
     customer_id = request.args.get('customer_id')
     make = request.args.get('make')
-    
-    query = Vehicle.query
-    
+
+    criteria = []
     if customer_id:
-        query = query.filter_by(customer_id=customer_id)
+        criteria.append(Vehicle.customer_id == customer_id)
     if make:
-        query = query.filter(Vehicle.make.ilike(f'%{make}%'))
+        criteria += matching_criteria(search_terms(make), columns=('make',), short_anywhere=True)
+    return criteria
+
+@vehicles_bp.route('/vehicles', methods=['GET'])
+@token_required
+# 'customers' too: responses embed the owners' names and emails
+@conditional('vehicles', 'customers')
+def get_vehicles(current_user):
+    """Get all vehicles (with optional customer_id filter)"""
+    query = Vehicle.query.filter(*_vehicle_filters())
     
+    if wants_stream():
+        # Same records as the JSON modes, owner's name and email included
+        query = query.outerjoin(Vehicle.customer).order_by(Vehicle.id)
+        return stream_query(query, Vehicle, columns=Vehicle.response_columns())
+
+    # Owners come back in the same SELECT rather than one query per vehicle
+    query = query.options(joinedload(Vehicle.customer))
+
+    if wants_cursor():
+        try:
+            page = page_from_request(query, [Vehicle.id])
+        except InvalidCursor as e:
+            return jsonify({'error': str(e)}), 400
+        return jsonify({
+            'vehicles': [vehicle_response_schema.dump(v.to_response_dict()) for v in page.items],
+            **page.meta()
+        })
+
     vehicles = query.all()
-    result = vehicle_response_schema.dump([v.to_response_dict() for v in vehicles])
+    result = vehicle_response_schema.dump([v.to_response_dict() for v in vehicles], many=True)
     return jsonify(result)
 
+@vehicles_bp.route('/vehicles/search', methods=['GET'])
+@token_required
+@cached_with_tags('vehicles', timeout=60)
+def search_vehicles_view(current_user):
+    """
+    Search vehicles by make, model, VIN or license plate
+    ---
+    tags:
+      - Vehicles
+    parameters:
+      - name: q
+        in: query
+        type: string
+        required: true
+        description: Terms to find; each must match one of the columns. Falls back to typo-tolerant matching when nothing matches exactly.
+        example: "toyota cam"
+      - name: limit
+        in: query
+        type: integer
+        required: false
+        description: Maximum number of vehicles (default 20, max 100)
+    responses:
+      200:
+        description: Matching vehicles; fuzzy is true when they are near misses
+      400:
+        description: Missing query or invalid limit
+    """
+    query = request.args.get('q', '')
+    limit = request.args.get('limit', 20, type=int)
+    if not search_terms(query):
+        return jsonify({'error': 'q is required'}), 400
+    if not 1 <= limit <= SEARCH_MAX_LIMIT:
+        return jsonify({'error': f'limit must be between 1 and {SEARCH_MAX_LIMIT}'}), 400
+
+    vehicles, fuzzy = search_vehicles(query, limit=limit)
+    return jsonify({'vehicles': [vehicle.to_dict() for vehicle in vehicles], 'fuzzy': fuzzy})
+
+@vehicles_bp.route('/by-vin/<vin>', methods=['GET'])
+@token_required
+def get_vehicle_by_vin(current_user, vin):
+    """
+    Look up a vehicle by VIN
+    ---
+    tags:
+      - Vehicles
+    parameters:
+      - name: vin
+        in: path
+        type: string
+        required: true
+        description: Case and surrounding whitespace are ignored
+        example: "1HGCM82633A004352"
+    responses:
+      200:
+        description: The vehicle
+      404:
+        description: No vehicle has this VIN
+    """
+    vehicle = lookup_vin(vin)
+    if vehicle is None:
+        return jsonify({'error': 'Vehicle not found'}), 404
+    return jsonify(vehicle)
+
+@vehicles_bp.route('/by-vin', methods=['POST'])
+@token_required
+def get_vehicles_by_vin(current_user):
+    """
+    Look up many vehicles by VIN, e.g. for a fleet check-in
+    ---
+    tags:
+      - Vehicles
+    parameters:
+      - in: body
+        name: body
+        required: true
+        schema:
+          type: object
+          required:
+            - vins
+          properties:
+            vins:
+              type: array
+              items:
+                type: string
+              example: ["1HGCM82633A004352", "4T1BF1FK5CU000001"]
+    responses:
+      200:
+        description: Vehicles keyed by normalized VIN, and the VINs that matched nothing
+      400:
+        description: vins is not a non-empty array of strings
+      413:
+        description: More than VIN_BATCH_MAX VINs
+    """
+    vins = (request.get_json(silent=True) or {}).get('vins')
+    if not isinstance(vins, list) or not vins or not all(isinstance(vin, str) for vin in vins):
+        return jsonify({'error': 'vins must be a non-empty array of strings'}), 400
+    if len(vins) > VIN_BATCH_MAX:
+        return jsonify({'error': f'At most {VIN_BATCH_MAX} VINs per request'}), 413
+
+    results = lookup_vins(vins)
+    return jsonify({
+        'vehicles': {vin: vehicle for vin, vehicle in results.items() if vehicle is not None},
+        'not_found': [vin for vin, vehicle in results.items() if vehicle is None],
+    })
+
 @vehicles_bp.route('/vehicles/<int:vehicle_id>', methods=['GET'])
 @token_required
+@conditional('vehicles', 'customers')
 def get_vehicle(current_user, vehicle_id):
     """Get a specific vehicle by ID"""
     vehicle = Vehicle.query.get_or_404(vehicle_id)
@@ -117,9 +257,11 @@ def delete_vehicle(current_user, vehicle_id):
 
 @vehicles_bp.route('/customers/<int:customer_id>/vehicles', methods=['GET'])
 @token_required
+@conditional('customer:{customer_id}')
 def get_customer_vehicles(current_user, customer_id):
     """Get all vehicles for a specific customer"""
     customer = Customer.query.get_or_404(customer_id)
+    # vehicle.customer resolves from the identity map: no query per vehicle
     vehicles = Vehicle.query.filter_by(customer_id=customer_id).all()
-    result = vehicle_response_schema.dump([v.to_response_dict() for v in vehicles])
+    result = vehicle_response_schema.dump([v.to_response_dict() for v in vehicles], many=True)
     return jsonify(result)
\ No newline at end of file
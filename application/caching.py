@@ -0,0 +1,182 @@
+# application/caching.py
+"""
+Tag-versioned caching on top of the shared ``cache`` extension.
+
+Every cached entry is stored under a key that embeds the current version of
+each tag it depends on (``customers``, ``customer:<id>``, ``inventory``, ...).
+Invalidating a tag just gives it a new version, so every entry built against
+the old one stops being reachable and ages out on its own timeout; nothing
+has to know which keys exist.
+
+Writes made through the ORM invalidate themselves: models list the tags they
+affect in ``cache_tags()``, the tags touched by a flush are collected, and
+they are invalidated once the transaction commits. Bulk ``update()`` /
+``delete()`` statements bypass the unit of work and must call
+``invalidate_on_commit`` themselves.
+"""
+import hashlib
+import inspect as pyinspect
+import os
+import time
+from datetime import datetime, timezone
+from functools import wraps
+
+from flask import current_app, make_response, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from .extensions import cache, db
+from .streaming import wants_stream
+
+_PENDING_KEY = 'cache_tags'
+
+
+def _version_key(tag):
+    return f'tag-version:{tag}'
+
+
+def tag_versions(tags):
+    """Current version of each tag, creating versions for unseen tags"""
+    keys = [_version_key(tag) for tag in tags]
+    versions = dict(zip(tags, cache.get_many(*keys))) if keys else {}
+    missing = {tag: _new_version() for tag, version in versions.items() if version is None}
+    if missing:
+        cache.set_many({_version_key(tag): version for tag, version in missing.items()}, timeout=0)
+        versions.update(missing)
+    return versions
+
+
+def _new_version():
+    # Issue time first, so a version also says when its tag last changed
+    return f'{int(time.time()):x}.{os.urandom(6).hex()}'
+
+
+def version_time(version):
+    """When ``version`` was issued, or None for a version without a time"""
+    issued, dot, _ = version.partition('.')
+    return datetime.fromtimestamp(int(issued, 16), timezone.utc) if dot else None
+
+
+def invalidate_tags(*tags):
+    """Make every entry cached against any of ``tags`` unreachable"""
+    if tags:
+        cache.set_many({_version_key(tag): _new_version() for tag in set(tags)}, timeout=0)
+
+
+def invalidate_on_commit(*tags):
+    """Invalidate ``tags`` when the current transaction commits"""
+    db.session().info.setdefault(_PENDING_KEY, set()).update(tags)
+
+
+def tagged_key(key, tags):
+    versions = tag_versions(sorted(set(tags)))
+    return key + '|' + ','.join(f'{tag}={version}' for tag, version in versions.items())
+
+
+def resolve_tags(tags, view, args, kwargs):
+    """The tags a view depends on, given the arguments it was called with"""
+    if callable(tags):
+        return list(tags(*args, **kwargs))
+    bound = pyinspect.signature(view).bind_partial(*args, **kwargs).arguments
+    return [tag.format(**bound) for tag in tags]
+
+
+def cached_with_tags(*tags, timeout=None, etag=False):
+    """
+    Cache a GET view's successful responses against ``tags``.
+
+    Tags may reference the view's arguments, e.g. ``'customer:{customer_id}'``,
+    or ``tags`` may be a single callable taking the view's arguments. The key
+    is the request path and query string plus the resolved tags, so views
+    behind ``token_required`` are cached per caller when a tag names them.
+    Place it below the auth decorator.
+
+    With ``etag=True`` the body's digest is stored with it and sent as an
+    ETag; a matching If-None-Match gets a 304 without re-sending the body.
+
+    Reads from a replica (see ``db_routing``) are cached apart from reads
+    from the primary and for no longer than ``REPLICA_STICKY_SECONDS``: a
+    lagging replica can answer after a write has bumped the tags, and a
+    client reading its own writes must not be served that entry.
+
+    Streamed (NDJSON) requests bypass the cache, and every response carries
+    ``Vary: Accept``, since the same URL also has a JSON representation.
+    """
+    if len(tags) == 1 and callable(tags[0]):
+        tags = tags[0]
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            if wants_stream():
+                response = make_response(view(*args, **kwargs))
+                response.vary.add('Accept')
+                return response
+
+            resolved = resolve_tags(tags, view, args, kwargs)
+            from_replica = db.session().info.get('replica') is not None
+            key = tagged_key(f'view:{request.full_path}' + ('|replica' if from_replica else ''), resolved)
+
+            cached = cache.get(key)
+            if cached is None:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200 or response.is_streamed:
+                    response.vary.add('Accept')
+                    return response
+                body = response.get_data()
+                cached = (body, response.content_type, body_etag(body) if etag else None)
+                store_timeout = _replica_timeout(timeout) if from_replica else timeout
+                if store_timeout is None or store_timeout > 0:
+                    cache.set(key, cached, timeout=store_timeout)
+
+            body, content_type, entity_tag = cached
+            response = current_app.response_class(body, content_type=content_type)
+            response.vary.add('Accept')
+            if entity_tag:
+                response.set_etag(entity_tag)
+                response.make_conditional(request)
+            return response
+        return wrapper
+    return decorator
+
+
+def _replica_timeout(timeout):
+    sticky = current_app.config['REPLICA_STICKY_SECONDS']
+    return min(timeout or current_app.config['CACHE_DEFAULT_TIMEOUT'], sticky)
+
+
+def body_etag(body):
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def _collect(session, objects):
+    tags = session.info.setdefault(_PENDING_KEY, set())
+    for obj in objects:
+        cache_tags = getattr(obj, 'cache_tags', None)
+        if cache_tags is not None:
+            tags.update(cache_tags())
+
+
+@event.listens_for(Session, 'before_flush')
+def _collect_changed_tags(session, flush_context, instances):
+    # Before the flush, while deleted rows can still be loaded
+    with session.no_autoflush:
+        _collect(session, (*session.dirty, *session.deleted))
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_new_tags(session, flush_context):
+    # After the flush, once new rows have their ids
+    _collect(session, session.new)
+
+
+@event.listens_for(Session, 'after_commit')
+def _invalidate_committed_tags(session):
+    tags = session.info.pop(_PENDING_KEY, None)
+    if tags:
+        invalidate_tags(*tags)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_pending_tags(session):
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,77 @@
+# application/commands.py
+"""
+Flask CLI commands (``flask <command>``)
+"""
+import click
+from flask import current_app
+
+from auth.passwords import HASHERS, benchmark, get_hasher
+
+
+def register_commands(app):
+    app.cli.add_command(hash_benchmark)
+    app.cli.add_command(rebuild_mechanic_stats_command)
+    app.cli.add_command(apispec_command)
+
+
+@click.command('hash-benchmark')
+@click.option('--algorithm', type=click.Choice(sorted(HASHERS)), default=None,
+              help='Algorithm to measure (defaults to PASSWORD_HASH_ALGORITHM).')
+@click.option('--work-factor', type=int, default=None,
+              help='Work factor to measure (defaults to PASSWORD_HASH_WORK_FACTOR).')
+@click.option('--seconds', type=float, default=2.0, show_default=True,
+              help='How long to hash for.')
+def hash_benchmark(algorithm, work_factor, seconds):
+    """Report password hashes/sec per core to size login capacity."""
+    if algorithm is None:
+        algorithm = current_app.config.get('PASSWORD_HASH_ALGORITHM')
+        work_factor = work_factor or current_app.config.get('PASSWORD_HASH_WORK_FACTOR')
+
+    result = benchmark(get_hasher(algorithm, work_factor), seconds=seconds)
+
+    click.echo(f"algorithm:        {result['algorithm']} (work factor {result['work_factor']})")
+    click.echo(f"hashes/sec/core:  {result['hashes_per_sec_per_core']:.1f}")
+    click.echo(f"ms per hash:      {1000 / result['hashes_per_sec_per_core']:.1f}")
+    click.echo(f"cores:            {result['cores']}")
+    click.echo(f"logins/sec/host:  {result['estimated_hashes_per_sec']:.1f} (estimated)")
+
+
+@click.command('rebuild-mechanic-stats')
+@click.option('--mechanic-id', 'mechanic_ids', type=int, multiple=True,
+              help='Only rebuild these mechanics (repeatable). Defaults to all.')
+def rebuild_mechanic_stats_command(mechanic_ids):
+    """Backfill or repair the mechanic_ticket_stats counters."""
+    from .extensions import db
+    from .ticket_stats import rebuild_mechanic_stats
+
+    rebuild_mechanic_stats(list(mechanic_ids) or None)
+    db.session.commit()
+    click.echo('Mechanic ticket stats rebuilt')
+
+
+@click.group('apispec')
+def apispec_command():
+    """Build or check the precomputed API spec (apispec.json)."""
+
+
+@apispec_command.command('build')
+def apispec_build():
+    """Regenerate apispec.json from the view docstrings."""
+    from .swagger import SPEC_PATH, SpecArtifact
+    from .swagger.spec import write_spec
+
+    artifact = SpecArtifact(write_spec(current_app))
+    click.echo(f'{SPEC_PATH}: {len(artifact.body)} bytes, {len(artifact.gzipped)} gzipped, ETag {artifact.etag}')
+
+
+@apispec_command.command('check')
+def apispec_check():
+    """Fail if apispec.json is stale or swagger.yalm documents missing operations."""
+    from .swagger.spec import check_spec
+
+    problems = check_spec(current_app)
+    for problem in problems:
+        click.echo(problem, err=True)
+    if problems:
+        raise click.ClickException(f'{len(problems)} problem(s) with the API spec')
+    click.echo('API spec is up to date')
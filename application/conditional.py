@@ -0,0 +1,96 @@
+# application/conditional.py
+"""
+Conditional GETs (ETag / Last-Modified) derived from cache tag versions.
+
+A view names the cache tags its response depends on, as it does for
+``cached_with_tags``. Every commit that changes a row gives that row's tags
+new versions (see application/caching.py), so the current versions identify
+the representation: the ETag is their digest, and Last-Modified is when the
+newest of them was issued. A client that already has the current
+representation gets its 304 from one cache lookup, without a query, the
+view running or anything being serialized.
+
+Tag versions change when the primary commits, so two cases get no
+validators, only the body:
+
+* a read from a replica (see ``db_routing``) while the newest version is
+  younger than ``REPLICA_STICKY_SECONDS``: the replica may not have the
+  write yet, and its body must not be tagged as the new version;
+* a Last-Modified in the current second: HTTP dates have one-second
+  resolution, so a second write in the same second would leave the date
+  unchanged and If-Modified-Since would answer 304 for a stale copy.
+
+Bulk ``update()``/``delete()`` statements bypass the unit of work and must
+call ``invalidate_on_commit`` or clients will keep their stale copies.
+"""
+import hashlib
+import inspect as pyinspect
+from datetime import datetime, timedelta, timezone
+from functools import wraps
+
+from flask import current_app, make_response, request
+from werkzeug.http import is_resource_modified
+
+from .caching import resolve_tags, tag_versions, version_time
+from .extensions import db
+
+
+def _etag(arguments, versions):
+    parts = (request.full_path, repr(sorted(arguments.items())),
+             *(f'{tag}={version}' for tag, version in versions.items()))
+    return hashlib.blake2b('|'.join(parts).encode(), digest_size=16).hexdigest()
+
+
+def _replica_may_lag(last_modified, now):
+    if db.session().info.get('replica') is None:
+        return False
+    if last_modified is None:
+        return True
+    # Issue times are truncated to the second, so allow one more
+    window = timedelta(seconds=current_app.config['REPLICA_STICKY_SECONDS'] + 1)
+    return now - last_modified < window
+
+
+def conditional(*tags):
+    """
+    Answer If-None-Match / If-Modified-Since for a GET view before it runs.
+
+    ``tags`` are the cache tags of every row the view serializes, including
+    related rows it embeds; like ``cached_with_tags`` they may reference the
+    view's arguments, e.g. ``'customer:{customer_id}'``, or be a single
+    callable taking them. The ETag also covers the query string and the
+    view's arguments, so paging, filters and per-caller views each get their
+    own. Validators are only attached to 200 responses. Place it below the
+    auth decorator and above any caching decorator.
+    """
+    if len(tags) == 1 and callable(tags[0]):
+        tags = tags[0]
+
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            arguments = pyinspect.signature(view).bind_partial(*args, **kwargs).arguments
+            versions = tag_versions(sorted(set(resolve_tags(tags, view, args, kwargs))))
+            issued = [version_time(version) for version in versions.values()]
+            last_modified = max((time for time in issued if time is not None), default=None)
+            etag = _etag(arguments, versions)
+
+            now = datetime.now(timezone.utc)
+            if _replica_may_lag(last_modified, now):
+                return view(*args, **kwargs)
+            if last_modified is not None and last_modified >= now.replace(microsecond=0):
+                last_modified = None
+
+            if not is_resource_modified(request.environ, etag=etag, last_modified=last_modified):
+                response = current_app.response_class(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag, weak=True)
+            if last_modified is not None:
+                response.last_modified = last_modified
+            return response
+        return wrapper
+    return decorator
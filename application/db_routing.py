@@ -0,0 +1,108 @@
+# application/db_routing.py
+"""
+Read/write splitting: reads in GET requests go to a read replica, writes
+always go to the primary.
+
+Replica URIs are listed in ``SQLALCHEMY_REPLICAS``. They are kept out of
+``SQLALCHEMY_BINDS`` on purpose: every bind gets its own MetaData, which
+``create_all``/``drop_all`` then act on, while a replica holds the
+primary's tables and is filled by replication, not by the app.
+
+``db.session`` is a ``RoutingSession``. At the start of a GET, HEAD or
+OPTIONS request it is pointed at the next replica (round robin), and
+``get_bind`` sends SELECTs on the primary's tables there. Everything else
+stays on the primary: flushes, INSERT/UPDATE/DELETE, ``SELECT ... FOR
+UPDATE``, textual SQL and tables on other binds.
+
+Read-your-writes:
+
+* within a request, the first write moves the rest of the request to the
+  primary;
+* across requests, a request that commits a write stamps the client's
+  session cookie, and that client reads from the primary for the next
+  ``REPLICA_STICKY_SECONDS``, which should cover the replication lag.
+  Clients that drop cookies only get the first guarantee.
+
+Without replicas configured no hooks are registered and every statement
+goes where Flask-SQLAlchemy would send it.
+"""
+import time
+from itertools import cycle
+
+import sqlalchemy as sa
+from flask import current_app, request, session as client_session
+from flask_sqlalchemy.session import Session
+
+from .engine_tuning import engine_options, tune_sqlite_engine
+
+READ_METHODS = frozenset(('GET', 'HEAD', 'OPTIONS'))
+STICKY_KEY = 'db_primary_until'
+
+
+def _is_read(clause):
+    return getattr(clause, 'is_select', False) and getattr(clause, '_for_update_arg', None) is None
+
+
+class RoutingSession(Session):
+    """Session that reads from ``info['replica']`` when one is set"""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        if self._flushing or getattr(clause, 'is_dml', False):
+            # Reads after a write in this request must see it
+            self.info['replica'] = None
+            self.info['routing_pending'] = True
+            return engine
+
+        replica = self.info.get('replica')
+        if replica is not None and bind is None and _is_read(clause) and engine is self._db.engines.get(None):
+            return replica
+        return engine
+
+
+@sa.event.listens_for(RoutingSession, 'after_commit')
+def _after_commit(session):
+    if session.info.pop('routing_pending', False):
+        session.info['routing_wrote'] = True
+
+
+@sa.event.listens_for(RoutingSession, 'after_rollback')
+def _after_rollback(session):
+    session.info.pop('routing_pending', None)
+
+
+def _route_request():
+    replica = None
+    if request.method in READ_METHODS and client_session.get(STICKY_KEY, 0) <= time.time():
+        replica = next(current_app.extensions['db_replicas'])
+    current_app.extensions['sqlalchemy'].session().info['replica'] = replica
+
+
+def _stick_after_write(response):
+    if current_app.extensions['sqlalchemy'].session().info.pop('routing_wrote', False):
+        client_session[STICKY_KEY] = time.time() + current_app.config['REPLICA_STICKY_SECONDS']
+    return response
+
+
+def _teardown_request(exception):
+    # The session outlives the request when a test keeps the app context pushed
+    info = current_app.extensions['sqlalchemy'].session().info
+    info.pop('replica', None)
+    info.pop('routing_wrote', None)
+
+
+def init_app(app):
+    uris = app.config.get('SQLALCHEMY_REPLICAS')
+    if not uris:
+        return
+    engines = []
+    for uri in uris:
+        engine = sa.create_engine(uri, **engine_options(uri, app.config))
+        tune_sqlite_engine(engine, app.config.get('SQLITE_PRAGMAS'))
+        engines.append(engine)
+    app.extensions['db_replica_engines'] = engines
+    app.extensions['db_replicas'] = cycle(engines)
+
+    app.before_request(_route_request)
+    app.after_request(_stick_after_write)
+    app.teardown_request(_teardown_request)
@@ -0,0 +1,91 @@
+# application/engine_tuning.py
+"""
+Engine options per database backend, and SQLite PRAGMAs on connect.
+
+``configure_engines`` runs before ``db.init_app`` and fills in pool settings
+for the main database and every bind, chosen by backend:
+
+* server databases get a bounded pool (``DB_POOL_SIZE`` + ``DB_MAX_OVERFLOW``)
+  with ``pool_pre_ping`` and ``pool_recycle``, so connections the server or
+  a proxy dropped are replaced instead of failing the request;
+* file SQLite gets the same pool size and nothing else (there is no server
+  to lose the connection);
+* in-memory SQLite is left alone: it is one shared connection.
+
+Options set explicitly in ``SQLALCHEMY_ENGINE_OPTIONS`` or a bind's dict win.
+
+``install_sqlite_pragmas`` runs after ``db.init_app`` and applies
+``SQLITE_PRAGMAS`` to every new SQLite connection. The defaults switch to
+WAL, where readers and the writer no longer block each other.
+"""
+from functools import partial
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+
+
+def _in_memory(url):
+    return url.database in (None, '', ':memory:') or 'mode=memory' in str(url)
+
+
+def engine_options(uri, config):
+    """Pool options for the database at ``uri``"""
+    url = make_url(uri)
+    if url.get_backend_name() == 'sqlite':
+        if _in_memory(url):
+            return {}
+        return {'pool_size': config.get('DB_POOL_SIZE', 5), 'max_overflow': config.get('DB_MAX_OVERFLOW', 10)}
+    return {
+        'pool_size': config.get('DB_POOL_SIZE', 5),
+        'max_overflow': config.get('DB_MAX_OVERFLOW', 10),
+        'pool_timeout': config.get('DB_POOL_TIMEOUT', 30),
+        'pool_recycle': config.get('DB_POOL_RECYCLE', 1800),
+        'pool_pre_ping': True,
+    }
+
+
+def configure_engines(app):
+    """Fill in per-backend engine options; call before ``db.init_app``"""
+    config = app.config
+    uri = config.get('SQLALCHEMY_DATABASE_URI')
+    if uri:
+        config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+            **engine_options(uri, config), **(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+        }
+
+    binds = {}
+    for key, bind in (config.get('SQLALCHEMY_BINDS') or {}).items():
+        bind = {'url': bind} if isinstance(bind, str) else dict(bind)
+        binds[key] = {**engine_options(bind['url'], config), **bind}
+    if binds:
+        config['SQLALCHEMY_BINDS'] = binds
+
+
+def _set_pragmas(pragmas, dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+    finally:
+        cursor.close()
+
+
+def tune_sqlite_engine(engine, pragmas):
+    """Run ``pragmas`` on each new connection of a SQLite ``engine``"""
+    if engine.dialect.name != 'sqlite' or not pragmas:
+        return
+    pragmas = dict(pragmas)
+    if _in_memory(engine.url):
+        # An in-memory database has no journal file to put in WAL mode
+        pragmas.pop('journal_mode', None)
+    event.listen(engine, 'connect', partial(_set_pragmas, pragmas))
+
+
+def install_sqlite_pragmas(app):
+    """Run ``SQLITE_PRAGMAS`` on each new SQLite connection; call after ``db.init_app``"""
+    pragmas = app.config.get('SQLITE_PRAGMAS')
+    if not pragmas:
+        return
+    with app.app_context():
+        for engine in app.extensions['sqlalchemy'].engines.values():
+            tune_sqlite_engine(engine, pragmas)
@@ -1,6 +1,6 @@
 # application/extensions.py
+from flask import current_app
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from flask_limiter import Limiter
@@ -9,11 +9,28 @@ from flask_caching import Cache
 from flask_marshmallow import Marshmallow
 import bcrypt
 
+from .db_routing import RoutingSession
+
 # Create SINGLE instances - this should be the ONLY place
-db = SQLAlchemy()
-migrate = Migrate()
+db = SQLAlchemy(session_options={'class_': RoutingSession})
 jwt = JWTManager()
 cors = CORS()
 limiter = Limiter(key_func=get_remote_address)
 cache = Cache()
-ma = Marshmallow()
\ No newline at end of file
+ma = Marshmallow()
+
+
+def init_migrate(app):
+    """Set up Flask-Migrate, which imports alembic (about 0.1 s); only the CLI needs it"""
+    from flask_migrate import Migrate
+    return Migrate(app, db)
+
+
+def get_redis(app=None):
+    """Redis client for ``REDIS_URL``, created on first use"""
+    app = app or current_app
+    client = app.extensions.get('redis')
+    if client is None:
+        import redis
+        client = app.extensions['redis'] = redis.Redis.from_url(app.config['REDIS_URL'], decode_responses=True)
+    return client
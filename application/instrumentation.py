@@ -0,0 +1,126 @@
+# application/instrumentation.py
+"""
+Per-request SQL cost: statement count, total database time, slow statements.
+
+Every statement run through SQLAlchemy is timed between
+``before_cursor_execute`` and ``after_cursor_execute``. Inside a request the
+numbers accumulate on ``g.sql_stats``; when the request finishes they are
+
+* sent as ``X-SQL-Queries`` / ``X-SQL-Time-Ms`` / ``X-SQL-Slow`` response
+  headers when ``SQL_STATS_HEADERS`` is on (it defaults to ``app.debug``),
+* logged as one JSON line on the ``application.sql`` logger otherwise.
+
+That logger is a child of ``app.logger`` and writes through its handlers,
+at ``SQL_LOG_LEVEL`` (INFO) unless logging configuration set a level first.
+
+Statements slower than ``SQL_SLOW_QUERY_MS`` are also logged on their own,
+inside a request or not. Streamed responses are measured up to the point
+the response object is returned, not while the body is being generated.
+"""
+import json
+import logging
+import time
+
+from flask import current_app, g, has_app_context, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger('application.sql')
+
+DEFAULT_SLOW_QUERY_MS = 100
+SLOW_STATEMENTS_KEPT = 10
+STATEMENT_PREVIEW = 500
+
+_STARTED_KEY = 'instrumentation_started'
+
+
+class QueryStats:
+    """SQL cost accumulated over one request"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.slow = []
+
+    def record(self, statement, elapsed_ms, slow_ms):
+        self.count += 1
+        self.total_ms += elapsed_ms
+        if elapsed_ms >= slow_ms and len(self.slow) < SLOW_STATEMENTS_KEPT:
+            self.slow.append({'statement': statement[:STATEMENT_PREVIEW], 'ms': round(elapsed_ms, 2)})
+
+    def as_dict(self):
+        return {'queries': self.count, 'db_ms': round(self.total_ms, 2), 'slow': self.slow}
+
+
+def _slow_query_ms():
+    if has_app_context():
+        return current_app.config.get('SQL_SLOW_QUERY_MS', DEFAULT_SLOW_QUERY_MS)
+    return DEFAULT_SLOW_QUERY_MS
+
+
+@event.listens_for(Engine, 'before_cursor_execute')
+def _start_timer(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault(_STARTED_KEY, []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, 'after_cursor_execute')
+def _stop_timer(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info.get(_STARTED_KEY)
+    if not started:
+        return
+    elapsed_ms = (time.perf_counter() - started.pop()) * 1000
+    slow_ms = _slow_query_ms()
+
+    stats = g.get('sql_stats') if has_request_context() else None
+    if stats is not None:
+        stats.record(statement, elapsed_ms, slow_ms)
+    if elapsed_ms >= slow_ms:
+        logger.warning('slow query %.1f ms: %s', elapsed_ms, statement[:STATEMENT_PREVIEW])
+
+
+@event.listens_for(Engine, 'handle_error')
+def _discard_timer(context):
+    # A failed statement never reaches after_cursor_execute
+    started = context.connection.info.get(_STARTED_KEY) if context.connection is not None else None
+    if started:
+        started.pop()
+
+
+def _begin_request():
+    g.sql_stats = QueryStats()
+
+
+def _report_request(response):
+    stats = g.get('sql_stats')
+    if stats is None:
+        return response
+
+    headers = current_app.config.get('SQL_STATS_HEADERS')
+    if headers is None:
+        headers = current_app.debug
+    if headers:
+        response.headers['X-SQL-Queries'] = str(stats.count)
+        response.headers['X-SQL-Time-Ms'] = f'{stats.total_ms:.2f}'
+        response.headers['X-SQL-Slow'] = str(len(stats.slow))
+    else:
+        logger.info(json.dumps({
+            'event': 'request_sql',
+            'method': request.method,
+            'path': request.path,
+            'endpoint': request.endpoint,
+            'status': response.status_code,
+            **stats.as_dict(),
+        }))
+    return response
+
+
+def init_app(app):
+    app.config.setdefault('SQL_SLOW_QUERY_MS', DEFAULT_SLOW_QUERY_MS)
+    app.config.setdefault('SQL_LOG_LEVEL', 'INFO')
+    if logger.level == logging.NOTSET:
+        # Otherwise it inherits the root logger's WARNING and drops the request lines
+        logger.setLevel(app.config['SQL_LOG_LEVEL'])
+    # Flask attaches its default handler when app.logger is first used
+    app.logger
+    app.before_request(_begin_request)
+    app.after_request(_report_request)
@@ -0,0 +1,72 @@
+# application/json_provider.py
+"""
+JSON provider backed by orjson when it is installed.
+
+orjson serializes dicts, lists and datetimes in C, several times faster
+than the stdlib encoder. Without orjson the provider falls back to Flask's
+stdlib implementation, so the dependency stays optional. Dates are emitted
+as ISO 8601 in both modes, matching the models' ``to_dict`` output.
+"""
+from datetime import date
+
+from flask.json.provider import DefaultJSONProvider, _default as _flask_default
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised only without orjson
+    orjson = None
+
+
+def _default(o):
+    if isinstance(o, date):
+        return o.isoformat()
+    return _flask_default(o)
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Drop-in replacement for Flask's ``DefaultJSONProvider``"""
+
+    default = staticmethod(_default)
+
+    @property
+    def using_orjson(self):
+        return orjson is not None
+
+    def _orjson_options(self):
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return option
+
+    def _dumps_bytes(self, obj, indent=False):
+        option = self._orjson_options()
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=self.default, option=option)
+
+    def dumps(self, obj, **kwargs):
+        # Callers passing json.dumps() arguments get the stdlib behaviour
+        if orjson is None or kwargs:
+            return super().dumps(obj, **kwargs)
+        try:
+            return self._dumps_bytes(obj).decode('utf-8')
+        except TypeError:
+            # e.g. integers wider than 64 bits
+            return super().dumps(obj)
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        try:
+            body = self._dumps_bytes(obj, indent=indent)
+        except TypeError:
+            return super().response(*args, **kwargs)
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
@@ -0,0 +1,137 @@
+# application/low_stock.py
+"""
+Low-stock membership changes, published as a blinker signal.
+
+An item is low on stock when ``quantity_in_stock <= min_stock_level``; the
+partial index ``ix_inventory_low_stock`` holds exactly those rows. Whenever a
+committed write moves an item into or out of that set, ``low_stock_changed``
+is sent once per item with the state after the commit; for a deleted item
+that is ``low=False`` and None for both levels. Receivers run after the
+commit, so an exception in one is logged rather than raised::
+
+    from application.low_stock import low_stock_changed
+
+    @low_stock_changed.connect
+    def reorder(app, item_id, low, quantity_in_stock, min_stock_level):
+        ...
+
+ORM writes are picked up by a flush hook, and bulk ``delete()`` statements
+by reading the levels of the rows before they run. Bulk statements that
+change stock (``reserve_stock``, the batch endpoints) report their changes
+with ``record_stock_change``.
+"""
+from blinker import Namespace
+from flask import current_app
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from .extensions import db
+from .models import Inventory
+
+signals = Namespace()
+low_stock_changed = signals.signal('low-stock-changed')
+
+_PENDING_KEY = 'low_stock_changes'
+
+
+def _as_levels(levels):
+    # ORM objects hold what was assigned until they are refreshed, e.g. "7" from a raw JSON body
+    if levels is None:
+        return None
+    return tuple(None if value is None else int(value) for value in levels)
+
+
+def _is_low(levels):
+    if levels is None:
+        return False
+    quantity, minimum = levels
+    return (quantity or 0) <= (minimum or 0)
+
+
+def record_stock_change(item_id, before, after, session=None):
+    """
+    Note that ``item_id`` went from ``before`` to ``after`` in this transaction.
+
+    Both are ``(quantity_in_stock, min_stock_level)``, or None for an item that
+    didn't exist yet. The signal is sent after commit, only if the item's
+    low-stock membership actually changed across the whole transaction.
+    """
+    session = session or db.session()
+    pending = session.info.setdefault(_PENDING_KEY, {})
+    first_before = pending[item_id][0] if item_id in pending else _as_levels(before)
+    pending[item_id] = (first_before, _as_levels(after))
+
+
+def _previous(state, attr):
+    history = state.attrs[attr].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    return getattr(state.object, attr)
+
+
+@event.listens_for(Session, 'before_flush')
+def _collect_orm_stock_changes(session, flush_context, instances):
+    for obj in session.dirty:
+        if not isinstance(obj, Inventory):
+            continue
+        state = inspect(obj)
+        if not (state.attrs.quantity_in_stock.history.has_changes()
+                or state.attrs.min_stock_level.history.has_changes()):
+            continue
+        before = (_previous(state, 'quantity_in_stock'), _previous(state, 'min_stock_level'))
+        record_stock_change(obj.id, before, (obj.quantity_in_stock, obj.min_stock_level), session)
+
+    for obj in session.deleted:
+        if isinstance(obj, Inventory):
+            state = inspect(obj)
+            before = (_previous(state, 'quantity_in_stock'), _previous(state, 'min_stock_level'))
+            record_stock_change(obj.id, before, None, session)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _collect_bulk_deletes(orm_execute_state):
+    # Bulk DELETEs bypass the flush; read the levels of the rows they will remove
+    if not orm_execute_state.is_delete:
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None or not issubclass(mapper.class_, Inventory):
+        return
+
+    query = select(Inventory.id, Inventory.quantity_in_stock, Inventory.min_stock_level)
+    whereclause = orm_execute_state.statement.whereclause
+    if whereclause is not None:
+        query = query.where(whereclause)
+    session = orm_execute_state.session
+    for item_id, quantity, minimum in session.execute(query):
+        record_stock_change(item_id, (quantity, minimum), None, session)
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_new_items(session, flush_context):
+    for obj in session.new:
+        if isinstance(obj, Inventory):
+            record_stock_change(obj.id, None, (obj.quantity_in_stock, obj.min_stock_level), session)
+
+
+@event.listens_for(Session, 'after_commit')
+def _send_low_stock_changes(session):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if not pending:
+        return
+    app = current_app._get_current_object()
+    for item_id, (before, after) in sorted(pending.items()):
+        if _is_low(before) != _is_low(after):
+            quantity, minimum = after or (None, None)
+            # The write is committed; a failing receiver must not turn it into an error
+            try:
+                low_stock_changed.send(app, item_id=item_id, low=_is_low(after),
+                                       quantity_in_stock=quantity, min_stock_level=minimum)
+            except Exception:
+                app.logger.exception('low_stock_changed receiver failed for inventory item %s', item_id)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_low_stock_changes(session):
+    session.info.pop(_PENDING_KEY, None)
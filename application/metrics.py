@@ -0,0 +1,257 @@
+# application/metrics.py
+"""
+Request metrics in the Prometheus text exposition format, served at /metrics.
+
+Per request, labelled by blueprint and endpoint:
+
+* ``http_requests_total`` (counter, also by method and status)
+* ``http_request_duration_seconds`` (histogram)
+* ``http_requests_in_flight`` (gauge, by blueprint)
+* ``http_request_db_seconds_total`` / ``http_request_db_queries_total``
+  (counters, from the SQL instrumentation's per-request numbers)
+
+and, read from their own counters on each scrape, the password hash pool
+(``password_hash_pool_*``, when it is enabled) and the verified-token cache
+(``token_cache_*``).
+
+Requests are counted from the first ``before_request`` hook on, so those
+the rate limiter answers with a 429 are counted too.
+
+The metric types are a few dozen lines rather than a client library: an
+observation is a dict lookup, a bisect and an increment under a lock, which
+keeps the cost per request to a few microseconds. Values live in the
+process, so each worker serves its own and Prometheus sums them across
+targets.
+"""
+import threading
+import time
+from bisect import bisect_left
+
+from flask import current_app, g, request
+
+from auth.passwords import hash_pool_stats
+from auth.tokens import token_cache_stats
+
+from .extensions import limiter
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+UNMATCHED = '<unmatched>'
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names, values, extra=''):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _header(self):
+        return [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Counter(_Metric):
+    kind = 'counter'
+
+    def inc(self, labels=(), amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def value(self, labels=()):
+        return self._values.get(labels, 0)
+
+    def render(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return self._header() + [f'{self.name}{_labels(self.labelnames, labels)} {_number(value)}'
+                                 for labels, value in items]
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def dec(self, labels=(), amount=1):
+        self.inc(labels, -amount)
+
+
+class Histogram(_Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, labels=()):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                # Per-bucket counts (the last one is +Inf), then the sum
+                series = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[index] += 1
+            series[-1] += value
+
+    def count(self, labels=()):
+        series = self._values.get(labels)
+        return sum(series[:-1]) if series else 0
+
+    def render(self):
+        with self._lock:
+            items = sorted((labels, list(series)) for labels, series in self._values.items())
+        lines = self._header()
+        for labels, series in items:
+            cumulative = 0
+            for bound, observed in zip((*self.buckets, float('inf')), series):
+                cumulative += observed
+                le = 'le="' + _number(bound) + '"'
+                lines.append(f'{self.name}_bucket{_labels(self.labelnames, labels, le)} {cumulative}')
+            lines.append(f'{self.name}_sum{_labels(self.labelnames, labels)} {_number(series[-1])}')
+            lines.append(f'{self.name}_count{_labels(self.labelnames, labels)} {cumulative}')
+        return lines
+
+
+class Collected(_Metric):
+    """A single value read when rendered from numbers another module keeps;
+    nothing is rendered while ``read`` returns None"""
+
+    def __init__(self, name, documentation, kind, read):
+        super().__init__(name, documentation)
+        self.kind = kind
+        self._read = read
+
+    def render(self):
+        value = self._read()
+        if value is None:
+            return []
+        return self._header() + [f'{self.name} {_number(value)}']
+
+
+def _stat(stats, key, scale=1):
+    def read():
+        values = stats()
+        return None if values is None else values[key] * scale
+    return read
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = []
+
+    def register(self, metric):
+        self.metrics.append(metric)
+        return metric
+
+    def render(self):
+        return '\n'.join(line for metric in self.metrics for line in metric.render()) + '\n'
+
+    def clear(self):
+        for metric in self.metrics:
+            metric.clear()
+
+
+registry = Registry()
+
+requests_total = registry.register(Counter(
+    'http_requests_total', 'Requests handled, by endpoint, method and status',
+    ('blueprint', 'endpoint', 'method', 'status')))
+request_duration = registry.register(Histogram(
+    'http_request_duration_seconds', 'Request latency in seconds', ('blueprint', 'endpoint')))
+requests_in_flight = registry.register(Gauge(
+    'http_requests_in_flight', 'Requests being handled right now', ('blueprint',)))
+request_db_seconds = registry.register(Counter(
+    'http_request_db_seconds_total', 'Time spent in SQL statements', ('blueprint', 'endpoint')))
+request_db_queries = registry.register(Counter(
+    'http_request_db_queries_total', 'SQL statements run', ('blueprint', 'endpoint')))
+
+for name, kind, key, scale, documentation in (
+    ('password_hash_pool_workers', 'gauge', 'workers', 1, 'Password hashing worker processes'),
+    ('password_hash_pool_in_flight', 'gauge', 'in_flight', 1, 'Hashes running or queued'),
+    ('password_hash_pool_submitted_total', 'counter', 'submitted', 1, 'Hashes submitted to the pool'),
+    ('password_hash_pool_completed_total', 'counter', 'completed', 1, 'Hashes completed by the pool'),
+    ('password_hash_pool_rejected_total', 'counter', 'rejected', 1, 'Hashes refused with the pool saturated'),
+    ('password_hash_pool_restarts_total', 'counter', 'restarts', 1, 'Broken worker pools replaced'),
+    ('password_hash_pool_queue_wait_max_seconds', 'gauge', 'queue_wait_max_ms', 0.001,
+     'Longest time a hash waited for a worker'),
+):
+    registry.register(Collected(name, documentation, kind, _stat(hash_pool_stats, key, scale)))
+
+for name, kind, key, documentation in (
+    ('token_cache_entries', 'gauge', 'size', 'Verified tokens cached'),
+    ('token_cache_hits_total', 'counter', 'hits', 'Token verifications answered from the cache'),
+    ('token_cache_misses_total', 'counter', 'misses', 'Tokens verified in full'),
+):
+    registry.register(Collected(name, documentation, kind, _stat(token_cache_stats, key)))
+
+
+def _start_request():
+    endpoint = request.endpoint
+    if endpoint == 'metrics':
+        return
+    blueprint = request.blueprint or 'app'
+    # Everything the finish needs, so it doesn't go through the request proxy again
+    g.metrics_started = (time.perf_counter(), blueprint, (blueprint, endpoint or UNMATCHED), request.method)
+    requests_in_flight.inc((blueprint,))
+
+
+def _finish_request(status):
+    started = g.pop('metrics_started', None)
+    if started is None:
+        return
+    start, blueprint, labels, method = started
+    requests_in_flight.dec((blueprint,))
+    request_duration.observe(time.perf_counter() - start, labels)
+    requests_total.inc((*labels, method, str(status)))
+
+    stats = g.get('sql_stats')
+    if stats is not None:
+        request_db_seconds.inc(labels, stats.total_ms / 1000)
+        request_db_queries.inc(labels, stats.count)
+
+
+def _after_request(response):
+    _finish_request(response.status_code)
+    return response
+
+
+def _teardown_request(exception):
+    # Only still pending when an exception skipped after_request
+    _finish_request(500)
+
+
+@limiter.exempt
+def metrics_view():
+    return current_app.response_class(registry.render(), content_type=CONTENT_TYPE)
+
+
+def init_app(app):
+    if not app.config.get('METRICS_ENABLED', True):
+        return
+    # First, ahead of the rate limiter's hook, so requests it rejects are counted
+    app.before_request_funcs.setdefault(None, []).insert(0, _start_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
@@ -1,11 +1,14 @@
 # application/models.py
 from .extensions import db
+from sqlalchemy.orm import validates
 from datetime import datetime
-from werkzeug.security import generate_password_hash, check_password_hash
+from auth.passwords import hash_password, verify_password, needs_rehash
 from datetime import datetime, timezone
 
 class Customer(db.Model):
     __tablename__ = 'customers'
+    serialized_fields = ('id', 'first_name', 'last_name', 'email', 'phone', 'address',
+                         'created_at', 'updated_at')
     
     id = db.Column(db.Integer, primary_key=True)
     first_name = db.Column(db.String(100), nullable=False)
@@ -13,7 +16,7 @@ class Customer(db.Model):
     email = db.Column(db.String(120), unique=True, nullable=False)
     phone = db.Column(db.String(20))
     address = db.Column(db.Text)
-    password_hash = db.Column(db.String(128))
+    password_hash = db.Column(db.String(255))
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
@@ -22,11 +25,20 @@ class Customer(db.Model):
     service_tickets = db.relationship('ServiceTicket', back_populates='customer', lazy=True)
     
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        """Verify password, upgrading a stale hash in place on success"""
+        if not verify_password(self.password_hash, password):
+            return False
+        if needs_rehash(self.password_hash):
+            self.password_hash = hash_password(password)
+        return True
     
+    def cache_tags(self):
+        """Cache tags invalidated when this row changes (see application/caching.py)"""
+        return ('customers', f'customer:{self.id}')
+
     def to_dict(self):
         """Convert customer object to dictionary"""
         return {
@@ -40,15 +52,23 @@ class Customer(db.Model):
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
 
+def normalize_vin(vin):
+    """VINs are stored and looked up upper-case, without surrounding whitespace"""
+    return vin.strip().upper() if isinstance(vin, str) else vin
+
 class Vehicle(db.Model):
     __tablename__ = 'vehicles'
+    serialized_fields = ('id', 'customer_id', 'make', 'model', 'year', 'vin', 'license_plate',
+                         'created_at', 'updated_at')
     
     id = db.Column(db.Integer, primary_key=True)
-    customer_id = db.Column(db.Integer, db.ForeignKey('customers.id', ondelete='CASCADE'), nullable=False)
+    customer_id = db.Column(db.Integer, db.ForeignKey('customers.id', ondelete='CASCADE'), nullable=False, index=True)
     make = db.Column(db.String(50), nullable=False)
     model = db.Column(db.String(50), nullable=False)
     year = db.Column(db.Integer, nullable=False)
-    vin = db.Column(db.String(17), unique=True, nullable=False)
+    # active_history: the old VIN is loaded on assignment so the VIN lookup cache can evict it
+    vin = db.column_property(db.Column(db.String(17), unique=True, nullable=False), active_history=True)
+    license_plate = db.Column(db.String(20))
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
     
@@ -56,6 +76,21 @@ class Vehicle(db.Model):
     customer = db.relationship('Customer', back_populates='vehicles')
     service_tickets = db.relationship('ServiceTicket', back_populates='vehicle', lazy=True)
 
+    @validates('vin')
+    def _normalize_vin(self, key, vin):
+        return normalize_vin(vin)
+
+    @classmethod
+    def get_by_vin(cls, vin):
+        """The vehicle with this VIN or None; a single probe of the unique vin index"""
+        return cls.query.filter_by(vin=normalize_vin(vin)).first()
+
+    def cache_tags(self):
+        """Cache tags invalidated when this row changes (see application/caching.py)"""
+        # Both the owner it had and the one it is moving to
+        owners = {self.customer_id, *db.inspect(self).attrs.customer_id.history.deleted}
+        return ('vehicles', *(f'customer:{owner}' for owner in owners))
+
     def to_dict(self):
         """Convert vehicle object to dictionary"""
         return {
@@ -65,18 +100,50 @@ class Vehicle(db.Model):
             'model': self.model,
             'year': self.year,
             'vin': self.vin,
+            'license_plate': self.license_plate,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
 
+    @classmethod
+    def response_columns(cls):
+        """
+        ``to_response_dict()`` as ``{name: column}``, for column queries that
+        outer-join ``Vehicle.customer``
+        """
+        return {
+            **{name: getattr(cls, name) for name in cls.serialized_fields},
+            'customer_name': (Customer.first_name + ' ' + Customer.last_name).label('customer_name'),
+            'customer_email': Customer.email.label('customer_email'),
+        }
+
+    def to_response_dict(self):
+        """
+        Fields of ``VehicleResponseSchema``, including the owner's name and
+        email. Lists should load ``customer`` with the vehicles
+        (``joinedload(Vehicle.customer)``) or this costs a query per row.
+        """
+        customer = self.customer
+        return {
+            **{name: getattr(self, name) for name in self.serialized_fields},
+            'customer_name': f'{customer.first_name} {customer.last_name}' if customer else None,
+            'customer_email': customer.email if customer else None,
+        }
+
 class ServiceTicket(db.Model):
     __tablename__ = 'service_tickets'
+    serialized_fields = ('id', 'customer_id', 'vehicle_id', 'issue_description', 'status',
+                         'created_at', 'updated_at')
+    __table_args__ = (
+        # Leading customer_id also serves plain customer_id lookups
+        db.Index('ix_service_tickets_customer_id_created_at', 'customer_id', 'created_at'),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     customer_id = db.Column(db.Integer, db.ForeignKey('customers.id'), nullable=False)
-    vehicle_id = db.Column(db.Integer, db.ForeignKey('vehicles.id'), nullable=False)
+    vehicle_id = db.Column(db.Integer, db.ForeignKey('vehicles.id'), nullable=False, index=True)
     issue_description = db.Column(db.Text, nullable=False)
-    status = db.Column(db.String(20), default='open')
+    status = db.Column(db.String(20), default='open', index=True)
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
@@ -84,6 +151,11 @@ class ServiceTicket(db.Model):
     customer = db.relationship('Customer', back_populates='service_tickets')
     vehicle = db.relationship('Vehicle', back_populates='service_tickets')
     parts_used = db.relationship('TicketPart', back_populates='ticket', cascade='all, delete-orphan')
+    mechanic_assignments = db.relationship('ServiceTicketMechanic', back_populates='ticket', cascade='all, delete-orphan')
+
+    def cache_tags(self):
+        """Cache tags invalidated when this row changes (see application/caching.py)"""
+        return ('tickets', f'customer:{self.customer_id}')
 
     def to_dict(self):
         """Convert service ticket object to dictionary"""
@@ -97,15 +169,42 @@ class ServiceTicket(db.Model):
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
 
+    def to_detail_dict(self):
+        """Ticket with its parts (and their inventory items) and assigned mechanics.
+
+        Load the ticket with ``ServiceTicket.detail_options()`` first, otherwise
+        every relationship below is a lazy load.
+        """
+        data = self.to_dict()
+        data['parts'] = [
+            dict(part.to_dict(), inventory_item=part.inventory_item.to_dict() if part.inventory_item else None)
+            for part in self.parts_used
+        ]
+        data['mechanics'] = [
+            dict(assignment.mechanic.to_dict(),
+                 assigned_at=assignment.assigned_at.isoformat() if assignment.assigned_at else None)
+            for assignment in self.mechanic_assignments
+        ]
+        return data
+
+    @staticmethod
+    def detail_options():
+        """Eager-load everything ``to_detail_dict`` touches in a fixed number of queries"""
+        return (
+            db.selectinload(ServiceTicket.parts_used).joinedload(TicketPart.inventory_item),
+            db.selectinload(ServiceTicket.mechanic_assignments).joinedload(ServiceTicketMechanic.mechanic),
+        )
+
 class Mechanic(db.Model):
     __tablename__ = 'mechanics'
+    serialized_fields = ('id', 'first_name', 'last_name', 'email', 'phone', 'created_at', 'updated_at')
     
     id = db.Column(db.Integer, primary_key=True)
     first_name = db.Column(db.String(100), nullable=False)
     last_name = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(120), unique=True, nullable=False)
     phone = db.Column(db.String(20))
-    password_hash = db.Column(db.String(128))
+    password_hash = db.Column(db.String(255))
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
@@ -113,11 +212,20 @@ class Mechanic(db.Model):
     assigned_tickets = db.relationship('ServiceTicketMechanic', back_populates='mechanic')
 
     def set_password(self, password):
-        self.password_hash = generate_password_hash(password)
+        self.password_hash = hash_password(password)
     
     def check_password(self, password):
-        return check_password_hash(self.password_hash, password)
+        """Verify password, upgrading a stale hash in place on success"""
+        if not verify_password(self.password_hash, password):
+            return False
+        if needs_rehash(self.password_hash):
+            self.password_hash = hash_password(password)
+        return True
     
+    def cache_tags(self):
+        """Cache tags invalidated when this row changes (see application/caching.py)"""
+        return ('mechanics', f'mechanic:{self.id}')
+
     def to_dict(self):
         """Convert mechanic object to dictionary"""
         return {
@@ -132,19 +240,38 @@ class Mechanic(db.Model):
 
 class Inventory(db.Model):
     __tablename__ = 'inventory'
+    serialized_fields = ('id', 'name', 'description', 'category', 'price', 'quantity_in_stock',
+                         'min_stock_level', 'created_at', 'updated_at')
+    __table_args__ = (
+        # Holds only the rows at or below their reorder level, so the default
+        # /inventory/low-stock query reads the low-stock set and nothing else
+        db.Index('ix_inventory_low_stock', 'id',
+                 sqlite_where=db.text('quantity_in_stock <= min_stock_level'),
+                 postgresql_where=db.text('quantity_in_stock <= min_stock_level')),
+    )
     
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text)
-    category = db.Column(db.String(50))
+    # active_history: the old category is loaded on assignment so cache_tags() can invalidate it
+    category = db.column_property(db.Column(db.String(50), index=True), active_history=True)
     price = db.Column(db.Float, nullable=False)
-    quantity_in_stock = db.Column(db.Integer, default=0)
+    # active_history: old values are loaded on assignment so low-stock transitions can be detected
+    quantity_in_stock = db.column_property(db.Column(db.Integer, default=0, index=True), active_history=True)
+    min_stock_level = db.column_property(
+        db.Column(db.Integer, nullable=False, default=0, server_default='0'), active_history=True)
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
     updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))
 
     # Relationships
     ticket_parts = db.relationship('TicketPart', back_populates='inventory_item')
 
+    def cache_tags(self):
+        """Cache tags invalidated when this row changes (see application/caching.py)"""
+        # Both the category it was in and the one it is moving to
+        categories = {self.category, *db.inspect(self).attrs.category.history.deleted}
+        return ('inventory', f'inventory:{self.id}', *(f'inventory:category:{c}' for c in categories))
+
     def to_dict(self):
         """Convert inventory object to dictionary"""
         return {
@@ -154,16 +281,23 @@ class Inventory(db.Model):
             'category': self.category,
             'price': self.price,
             'quantity_in_stock': self.quantity_in_stock,
+            'min_stock_level': self.min_stock_level,
             'created_at': self.created_at.isoformat() if self.created_at else None,
             'updated_at': self.updated_at.isoformat() if self.updated_at else None
         }
 
+    @property
+    def is_low_stock(self):
+        return (self.quantity_in_stock or 0) <= (self.min_stock_level or 0)
+
+
 class TicketPart(db.Model):
     __tablename__ = 'ticket_parts'
+    serialized_fields = ('id', 'ticket_id', 'inventory_id', 'quantity_used', 'created_at')
     
     id = db.Column(db.Integer, primary_key=True)
-    ticket_id = db.Column(db.Integer, db.ForeignKey('service_tickets.id'), nullable=False)
-    inventory_id = db.Column(db.Integer, db.ForeignKey('inventory.id'), nullable=False)
+    ticket_id = db.Column(db.Integer, db.ForeignKey('service_tickets.id'), nullable=False, index=True)
+    inventory_id = db.Column(db.Integer, db.ForeignKey('inventory.id'), nullable=False, index=True)
     quantity_used = db.Column(db.Integer, nullable=False)
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
 
@@ -186,10 +320,29 @@ class ServiceTicketMechanic(db.Model):
     __tablename__ = 'service_ticket_mechanics'
     
     id = db.Column(db.Integer, primary_key=True)
-    ticket_id = db.Column(db.Integer, db.ForeignKey('service_tickets.id'), nullable=False)
-    mechanic_id = db.Column(db.Integer, db.ForeignKey('mechanics.id'), nullable=False)
+    ticket_id = db.Column(db.Integer, db.ForeignKey('service_tickets.id'), nullable=False, index=True)
+    mechanic_id = db.Column(db.Integer, db.ForeignKey('mechanics.id'), nullable=False, index=True)
     assigned_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
 
     # Relationships
-    ticket = db.relationship('ServiceTicket')
-    mechanic = db.relationship('Mechanic', back_populates='assigned_tickets')
\ No newline at end of file
+    ticket = db.relationship('ServiceTicket', back_populates='mechanic_assignments')
+    mechanic = db.relationship('Mechanic', back_populates='assigned_tickets')
+
+class MechanicTicketStats(db.Model):
+    """Ticket counts per mechanic, kept current by ``application.ticket_stats``"""
+    __tablename__ = 'mechanic_ticket_stats'
+
+    mechanic_id = db.Column(db.Integer, db.ForeignKey('mechanics.id', ondelete='CASCADE'), primary_key=True)
+    open_count = db.Column(db.Integer, nullable=False, default=0)
+    in_progress_count = db.Column(db.Integer, nullable=False, default=0)
+    completed_count = db.Column(db.Integer, nullable=False, default=0)
+    total_count = db.Column(db.Integer, nullable=False, default=0)
+
+    def to_dict(self):
+        """Convert ticket stats object to dictionary"""
+        return {
+            'open': self.open_count,
+            'in_progress': self.in_progress_count,
+            'completed': self.completed_count,
+            'total': self.total_count
+        }
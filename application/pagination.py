@@ -0,0 +1,156 @@
+# application/pagination.py
+"""
+Keyset (cursor) pagination shared by the list endpoints.
+
+Instead of ``LIMIT/OFFSET`` plus a ``COUNT(*)`` on every request, a page is
+fetched by seeking past the last row of the previous page on an indexed
+ordering key (``WHERE id > :last_id ORDER BY id LIMIT :n``). The position is
+handed to clients as an opaque ``next_cursor`` token.
+"""
+import base64
+import hashlib
+import json
+from datetime import datetime
+
+from flask import request
+from sqlalchemy import and_, or_, select
+
+from .extensions import cache, db
+
+DEFAULT_PER_PAGE = 10
+MAX_PER_PAGE = 100
+COUNT_ESTIMATE_TIMEOUT = 60  # seconds
+
+
+class InvalidCursor(ValueError):
+    """Raised when a client sends a cursor we did not issue"""
+
+
+def wants_cursor():
+    """Cursor mode is opt-in: any request carrying a ``cursor`` argument
+    (an empty value means the first page) gets a keyset page."""
+    return 'cursor' in request.args
+
+
+def encode_cursor(values):
+    """Encode the ordering-key values of the last row into an opaque token"""
+    payload = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token, columns):
+    """Decode a token produced by :func:`encode_cursor` for ``columns``"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError) as e:
+        raise InvalidCursor('Invalid cursor') from e
+
+    if not isinstance(values, list) or len(values) != len(columns):
+        raise InvalidCursor('Invalid cursor')
+
+    decoded = []
+    for column, value in zip(columns, values):
+        if value is not None and isinstance(column.type, db.DateTime):
+            try:
+                value = datetime.fromisoformat(value)
+            except (TypeError, ValueError) as e:
+                raise InvalidCursor('Invalid cursor') from e
+        decoded.append(value)
+    return decoded
+
+
+def _seek_condition(columns, values):
+    """Row-value comparison ``(c1, c2, ...) > (v1, v2, ...)`` spelled out
+    portably so every backend can turn it into an index seek."""
+    clauses = []
+    for i, (column, value) in enumerate(zip(columns, values)):
+        equal_prefix = [columns[j] == values[j] for j in range(i)]
+        clauses.append(and_(*equal_prefix, column > value))
+    return or_(*clauses)
+
+
+class KeysetPage:
+    """One page of keyset results"""
+
+    def __init__(self, items, next_cursor, per_page, total=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.per_page = per_page
+        self.total = total
+
+    @property
+    def has_more(self):
+        return self.next_cursor is not None
+
+    def meta(self):
+        """Pagination fields to merge into a JSON response"""
+        meta = {
+            'next_cursor': self.next_cursor,
+            'per_page': self.per_page,
+            'has_more': self.has_more,
+        }
+        if self.total is not None:
+            meta['total'] = self.total
+        return meta
+
+
+def keyset_paginate(query, columns, cursor=None, per_page=DEFAULT_PER_PAGE):
+    """
+    Fetch one page of ``query`` ordered by ``columns``.
+
+    ``columns`` must form a unique ordering backed by an index (the primary
+    key alone, or e.g. ``(created_at, id)``). One extra row is fetched to
+    learn whether another page exists, so no COUNT is needed.
+    """
+    columns = list(columns)
+    per_page = max(1, min(per_page or DEFAULT_PER_PAGE, MAX_PER_PAGE))
+
+    if cursor:
+        query = query.filter(_seek_condition(columns, decode_cursor(cursor, columns)))
+
+    rows = query.order_by(*columns).limit(per_page + 1).all()
+
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        last = rows[-1]
+        next_cursor = encode_cursor([getattr(last, column.key) for column in columns])
+
+    return KeysetPage(rows, next_cursor, per_page)
+
+
+def estimated_count(query, timeout=COUNT_ESTIMATE_TIMEOUT):
+    """Row count for ``query``, filters included, served from the shared cache.
+
+    The value is refreshed at most once per ``timeout`` seconds, so it is an
+    estimate suitable for "about N results" displays, not for arithmetic.
+    Each distinct statement (SQL and parameters) gets its own cache entry.
+    """
+    statement = query.order_by(None).statement
+    compiled = statement.compile(dialect=db.session.get_bind().dialect)
+    fingerprint = f'{compiled}|{sorted(compiled.params.items(), key=lambda item: item[0])!r}'
+    key = 'count_estimate:' + hashlib.blake2b(fingerprint.encode(), digest_size=16).hexdigest()
+    total = cache.get(key)
+    if total is None:
+        total = db.session.execute(
+            select(db.func.count()).select_from(statement.subquery())
+        ).scalar()
+        cache.set(key, total, timeout=timeout)
+    return total
+
+
+def page_from_request(query, columns):
+    """Build a :class:`KeysetPage` from ``cursor``, ``per_page`` and
+    ``include_total`` request arguments; the total is an
+    :func:`estimated_count`."""
+    page = keyset_paginate(
+        query,
+        columns,
+        cursor=request.args.get('cursor') or None,
+        per_page=request.args.get('per_page', DEFAULT_PER_PAGE, type=int),
+    )
+    if request.args.get('include_total', '').lower() in ('1', 'true', 'yes'):
+        page.total = estimated_count(query)
+    return page
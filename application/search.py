@@ -0,0 +1,269 @@
+# application/search.py
+"""
+Indexed vehicle search over make, model, VIN and license plate.
+
+A query is split into terms and every term has to match one of the searched
+columns, so ``toyota cam`` finds a Toyota Camry. Terms of three characters
+or more match anywhere in a column (substring, which includes prefixes) and
+are answered from a trigram index:
+
+* SQLite: an FTS5 table, ``vehicle_search``, using the ``trigram``
+  tokenizer. It indexes the ``vehicles`` rows in place (external content)
+  and triggers keep it in step with every write, bulk statements included.
+* PostgreSQL: ``pg_trgm`` GIN indexes, which serve ``ILIKE '%term%'``.
+* Anything else: the same ``ILIKE``, unindexed.
+
+Shorter terms can't use a trigram index and match column prefixes instead.
+
+When nothing matches exactly, ``search_vehicles`` looks for near misses
+(typo tolerance): it pulls candidates sharing trigrams with the terms, or
+with their spellings one swap or deletion away, from the index and keeps
+those with a word close enough to every term: similar like ``pg_trgm``'s
+``similarity()``, or one typo away.
+"""
+import re
+import sqlite3
+
+from sqlalchemy import DDL, column, event, func, literal_column, or_, select, table
+
+from .extensions import db
+from .models import Vehicle
+
+SEARCH_COLUMNS = ('make', 'model', 'vin', 'license_plate')
+MIN_TRIGRAM_TERM = 3
+MAX_TERMS = 8
+SIMILARITY_THRESHOLD = 0.3
+MAX_TYPOS = 1
+FUZZY_CANDIDATES = 200
+
+# FTS5 gained the trigram tokenizer in SQLite 3.34
+SQLITE_FTS = sqlite3.sqlite_version_info >= (3, 34, 0)
+
+vehicle_search = table('vehicle_search', column('rowid'), *(column(name) for name in SEARCH_COLUMNS))
+
+_columns = ', '.join(SEARCH_COLUMNS)
+_new = ', '.join(f'new.{name}' for name in SEARCH_COLUMNS)
+_old = ', '.join(f'old.{name}' for name in SEARCH_COLUMNS)
+
+SQLITE_DDL = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS vehicle_search USING fts5("
+    f"{_columns}, content='vehicles', content_rowid='id', tokenize='trigram')",
+    f"CREATE TRIGGER IF NOT EXISTS vehicle_search_ai AFTER INSERT ON vehicles BEGIN "
+    f"INSERT INTO vehicle_search(rowid, {_columns}) VALUES (new.id, {_new}); END",
+    f"CREATE TRIGGER IF NOT EXISTS vehicle_search_ad AFTER DELETE ON vehicles BEGIN "
+    f"INSERT INTO vehicle_search(vehicle_search, rowid, {_columns}) VALUES ('delete', old.id, {_old}); END",
+    f"CREATE TRIGGER IF NOT EXISTS vehicle_search_au AFTER UPDATE ON vehicles BEGIN "
+    f"INSERT INTO vehicle_search(vehicle_search, rowid, {_columns}) VALUES ('delete', old.id, {_old}); "
+    f"INSERT INTO vehicle_search(rowid, {_columns}) VALUES (new.id, {_new}); END",
+)
+
+POSTGRESQL_DDL = (
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    *(f"CREATE INDEX IF NOT EXISTS ix_vehicles_{name}_trgm ON vehicles USING gin ({name} gin_trgm_ops)"
+      for name in SEARCH_COLUMNS),
+)
+
+
+def _uses_fts(bind):
+    return bind.dialect.name == 'sqlite' and SQLITE_FTS
+
+
+@event.listens_for(Vehicle.__table__, 'after_create')
+def _create_search_index(target, connection, **kw):
+    if _uses_fts(connection):
+        statements = SQLITE_DDL
+    elif connection.dialect.name == 'postgresql':
+        statements = POSTGRESQL_DDL
+    else:
+        return
+    for statement in statements:
+        connection.execute(DDL(statement))
+
+
+@event.listens_for(Vehicle.__table__, 'before_drop')
+def _drop_search_index(target, connection, **kw):
+    if _uses_fts(connection):
+        connection.execute(DDL('DROP TABLE IF EXISTS vehicle_search'))
+
+
+def search_terms(query):
+    """Lower-cased terms of a search string"""
+    return [term for term in (query or '').lower().split() if term][:MAX_TERMS]
+
+
+def _escape_like(term):
+    return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _fts_phrase(term):
+    return '"' + term.replace('"', '""') + '"'
+
+
+def _matches(expression):
+    return literal_column('vehicle_search').op('MATCH')(expression)
+
+
+def _fts_expression(terms, columns):
+    scope = '{' + ' '.join(columns) + '}'
+    return ' AND '.join(f'{scope} : {_fts_phrase(term)}' for term in terms)
+
+
+def _prefix(term, columns, anywhere=False):
+    pattern = ('%' if anywhere else '') + f'{_escape_like(term)}%'
+    return or_(*(getattr(Vehicle, name).ilike(pattern, escape='\\') for name in columns))
+
+
+def _split(terms):
+    long_terms = [term for term in terms if len(term) >= MIN_TRIGRAM_TERM]
+    short_terms = [term for term in terms if len(term) < MIN_TRIGRAM_TERM]
+    return long_terms, short_terms
+
+
+def matching_criteria(terms, columns=SEARCH_COLUMNS, short_anywhere=False):
+    """
+    Filter criteria selecting the vehicles where every term matches one of
+    ``columns``. Usable anywhere a ``Vehicle`` query takes criteria.
+
+    With ``short_anywhere``, terms too short for the trigram index match
+    anywhere in a column, like the longer ones, at the cost of a scan.
+    """
+    long_terms, short_terms = _split(terms)
+    criteria = [_prefix(term, columns, short_anywhere) for term in short_terms]
+    if not long_terms:
+        return criteria
+
+    if _uses_fts(db.session.get_bind()):
+        criteria.append(Vehicle.id.in_(
+            select(vehicle_search.c.rowid).where(_matches(_fts_expression(long_terms, columns)))
+        ))
+    else:
+        criteria += [
+            or_(*(getattr(Vehicle, name).ilike(f'%{_escape_like(term)}%', escape='\\') for name in columns))
+            for term in long_terms
+        ]
+    return criteria
+
+
+def _exact_matches(terms, limit):
+    long_terms, short_terms = _split(terms)
+    if long_terms and _uses_fts(db.session.get_bind()):
+        # Let the index drive: it yields matches in rowid order, so the
+        # LIMIT stops it early instead of collecting every match first
+        query = (
+            Vehicle.query
+            .join(vehicle_search, vehicle_search.c.rowid == Vehicle.id)
+            .filter(_matches(_fts_expression(long_terms, SEARCH_COLUMNS)),
+                    *(_prefix(term, SEARCH_COLUMNS) for term in short_terms))
+            .order_by(vehicle_search.c.rowid)
+        )
+    else:
+        query = Vehicle.query.filter(*matching_criteria(terms)).order_by(Vehicle.id)
+    return query.limit(limit).all()
+
+
+def trigrams(text):
+    """``pg_trgm``-style trigrams of each word, padded with two leading blanks and one trailing"""
+    grams = set()
+    for word in re.findall(r'\w+', text.lower()):
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def similarity(a, b):
+    """Shared trigrams over all trigrams, 0..1, as ``pg_trgm``'s ``similarity()``"""
+    grams_a, grams_b = trigrams(a), trigrams(b)
+    if not grams_a or not grams_b:
+        return 0.0
+    return len(grams_a & grams_b) / len(grams_a | grams_b)
+
+
+def edit_distance(a, b):
+    """Edits (insert, delete, substitute, swap adjacent) turning ``a`` into ``b``"""
+    previous, current = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        before, previous, current = previous, current, [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            current[j] = min(previous[j] + 1, current[j - 1] + 1,
+                             previous[j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+    return current[-1]
+
+
+def _closeness(term, word):
+    # Trigrams reward shared runs of letters; the edit distance also forgives
+    # a swapped pair, which breaks every trigram it touches
+    distance = edit_distance(term, word[:len(term) + 1])
+    typo = 1 - distance / len(term) if distance <= MAX_TYPOS else 0.0
+    return max(similarity(term, word), typo)
+
+
+def _score(vehicle, terms):
+    words = [word for name in SEARCH_COLUMNS
+             for word in re.findall(r'\w+', (getattr(vehicle, name) or '').lower())]
+    scores = []
+    for term in terms:
+        if len(term) < MIN_TRIGRAM_TERM:
+            best = 1.0 if any(word.startswith(term) for word in words) else 0.0
+        else:
+            best = max((_closeness(term, word) for word in words), default=0.0)
+        if best < SIMILARITY_THRESHOLD:
+            return None
+        scores.append(best)
+    return sum(scores) / len(scores)
+
+
+def _variants(term):
+    """``term`` and every spelling one swap of adjacent letters or one deletion away"""
+    swaps = {term[:i] + term[i + 1] + term[i] + term[i + 2:] for i in range(len(term) - 1)}
+    deletions = {term[:i] + term[i + 1:] for i in range(len(term))}
+    return {term, *swaps, *(variant for variant in deletions if len(variant) >= MIN_TRIGRAM_TERM)}
+
+
+def _fuzzy_candidates(terms):
+    # A swapped pair breaks every trigram it touches ("hnoda" shares none
+    # with "honda"), so candidates are looked up by the trigrams of each
+    # term's near spellings, not just of the term
+    long_terms = [variant for term in terms if len(term) >= MIN_TRIGRAM_TERM for variant in _variants(term)]
+    if not long_terms:
+        return []
+    bind = db.session.get_bind()
+
+    if _uses_fts(bind):
+        grams = sorted({term[i:i + 3] for term in long_terms for i in range(len(term) - 2)})
+        ids = select(vehicle_search.c.rowid).where(
+            _matches(' OR '.join(_fts_phrase(gram) for gram in grams))
+        ).order_by(literal_column('rank')).limit(FUZZY_CANDIDATES)
+        return Vehicle.query.filter(Vehicle.id.in_(ids)).all()
+
+    if bind.dialect.name == 'postgresql':
+        closest = func.greatest(*(func.similarity(getattr(Vehicle, name), term)
+                                  for name in SEARCH_COLUMNS for term in long_terms))
+        near = or_(*(getattr(Vehicle, name).op('%')(term) for name in SEARCH_COLUMNS for term in long_terms))
+        return Vehicle.query.filter(near).order_by(closest.desc()).limit(FUZZY_CANDIDATES).all()
+
+    return []
+
+
+def search_vehicles(query, limit=20, fuzzy=True):
+    """
+    ``(vehicles, fuzzy)`` for a search string, at most ``limit`` vehicles.
+
+    Exact matches come back in id order. Only when there are none, and
+    ``fuzzy`` is set, are near misses returned instead, best first; the
+    second element is True for those.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return [], False
+
+    exact = _exact_matches(terms, limit)
+    if exact or not fuzzy:
+        return exact, False
+
+    scored = [(score, vehicle) for vehicle in _fuzzy_candidates(terms)
+              if (score := _score(vehicle, terms)) is not None]
+    scored.sort(key=lambda pair: (-pair[0], pair[1].id))
+    near = [vehicle for _, vehicle in scored[:limit]]
+    return near, bool(near)
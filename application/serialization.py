@@ -0,0 +1,28 @@
+# application/serialization.py
+"""
+Serialize query results straight from column tuples.
+
+``Model.to_dict()`` needs a fully built ORM object per row plus Python-side
+``isoformat()`` calls. For list endpoints we instead select only the
+columns in ``Model.serialized_fields`` with ``Query.with_entities`` and zip
+them into dicts; datetimes are left for the JSON provider to encode.
+"""
+
+
+def serialized_columns(model, fields=None):
+    return [getattr(model, name) for name in (fields or model.serialized_fields)]
+
+
+def column_query(query, model, fields=None):
+    """Narrow ``query`` to the serialized columns of ``model``"""
+    return query.with_entities(*serialized_columns(model, fields))
+
+
+def rows_to_dicts(rows, fields):
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def serialize_query(query, model, fields=None):
+    """Run ``query`` and return JSON-ready dicts without loading ORM objects"""
+    fields = tuple(fields or model.serialized_fields)
+    return rows_to_dicts(column_query(query, model, fields).all(), fields)
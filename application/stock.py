@@ -0,0 +1,71 @@
+# application/stock.py
+"""
+Stock reservation for parts consumed on service tickets.
+
+Stock is only ever changed with a conditional UPDATE, so concurrent
+mechanics can't oversell a SKU: the database checks and decrements in one
+step, and a row that no longer has enough stock simply isn't updated.
+"""
+from datetime import datetime, timezone
+
+from sqlalchemy import bindparam, select, update
+
+from .extensions import db
+from .low_stock import record_stock_change
+from .models import Inventory
+
+
+class InsufficientStock(Exception):
+    """Not every requested quantity could be reserved"""
+
+    def __init__(self, quantities):
+        super().__init__('Insufficient stock')
+        self.quantities = quantities
+
+
+def reserve_stock(quantities):
+    """
+    Decrement stock for ``{inventory_id: quantity}`` in the caller's transaction.
+
+    One executemany of ``UPDATE ... SET quantity_in_stock = quantity_in_stock - :n
+    WHERE id = :id AND quantity_in_stock >= :n``. Raises ``InsufficientStock``
+    if any row was short; the caller must then roll back, since the rows that
+    did have enough stock have already been decremented.
+    """
+    table = Inventory.__table__
+    statement = (
+        update(table)
+        .where(table.c.id == bindparam('b_id'), table.c.quantity_in_stock >= bindparam('b_quantity'))
+        .values(quantity_in_stock=table.c.quantity_in_stock - bindparam('b_quantity'),
+                updated_at=bindparam('b_now'))
+    )
+    now = datetime.now(timezone.utc)
+    # Sorted so concurrent reservations lock rows in the same order
+    rows = [{'b_id': item_id, 'b_quantity': quantity, 'b_now': now}
+            for item_id, quantity in sorted(quantities.items())]
+
+    if db.session.get_bind().dialect.supports_sane_multi_rowcount:
+        updated = db.session.execute(statement, rows).rowcount
+    else:
+        updated = sum(db.session.execute(statement, row).rowcount for row in rows)
+
+    if updated != len(rows):
+        raise InsufficientStock(quantities)
+
+    for item_id, quantity, minimum in db.session.execute(
+        select(Inventory.id, Inventory.quantity_in_stock, Inventory.min_stock_level)
+        .where(Inventory.id.in_(quantities))
+    ):
+        record_stock_change(item_id, (quantity + quantities[item_id], minimum), (quantity, minimum))
+
+
+def stock_shortages(quantities):
+    """``[{inventory_id, requested, available}]`` for the items that can't cover ``quantities``"""
+    available = dict(db.session.execute(
+        select(Inventory.id, Inventory.quantity_in_stock).where(Inventory.id.in_(quantities))
+    ).all())
+    return [
+        {'inventory_id': item_id, 'requested': quantity, 'available': available.get(item_id, 0)}
+        for item_id, quantity in sorted(quantities.items())
+        if available.get(item_id, 0) < quantity
+    ]
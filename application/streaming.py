@@ -0,0 +1,49 @@
+# application/streaming.py
+"""
+Newline-delimited JSON streaming for large collections.
+
+Rows are fetched in batches with ``yield_per`` and written to the client
+as they arrive, so memory use stays flat no matter how large the table is.
+Clients opt in with ``Accept: application/x-ndjson`` or ``?stream=1``.
+"""
+from flask import Response, current_app, request, stream_with_context
+
+from .serialization import column_query
+
+NDJSON_MIMETYPE = 'application/x-ndjson'
+STREAM_BATCH_SIZE = 500
+
+
+def wants_stream():
+    if request.args.get('stream', '').lower() in ('1', 'true', 'yes'):
+        return True
+    best = request.accept_mimetypes.best_match(['application/json', NDJSON_MIMETYPE])
+    return best == NDJSON_MIMETYPE
+
+
+def stream_query(query, model, fields=None, batch_size=STREAM_BATCH_SIZE, columns=None):
+    """
+    Stream ``query`` as one JSON object per line: the ``fields`` of ``model``,
+    or ``columns``, a ``{name: column expression}`` dict, for records that
+    take columns from joined tables too.
+    """
+    if columns is None:
+        fields = tuple(fields or model.serialized_fields)
+        rows = column_query(query, model, fields)
+    else:
+        fields = tuple(columns)
+        rows = query.with_entities(*columns.values())
+    rows = rows.yield_per(batch_size)
+    dumps = current_app.json.dumps
+
+    def generate():
+        chunk = []
+        for row in rows:
+            chunk.append(dumps(dict(zip(fields, row))))
+            if len(chunk) >= batch_size:
+                yield '\n'.join(chunk) + '\n'
+                chunk = []
+        if chunk:
+            yield '\n'.join(chunk) + '\n'
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
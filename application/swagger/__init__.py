@@ -1,77 +1,74 @@
-from flasgger import Swagger
-from flask import Blueprint
+# application/swagger/__init__.py
+"""
+The API spec, served at /apispec.json.
 
-def init_swagger(app):
-    """
-    Initialize Swagger documentation
-    """
-    swagger_bp = Blueprint('swagger', __name__)
-    
-    swagger_config = {
-        "headers": [],
-        "specs": [
-            {
-                "endpoint": 'apispec',
-                "route": '/apispec.json',
-                "rule_filter": lambda rule: True,
-                "model_filter": lambda tag: True,
-            }
-        ],
-        "static_url_path": "/flasgger_static",
-        "swagger_ui": True,
-        "specs_route": "/apidocs/",
-        "title": "Mechanic API Documentation",
-        "uiversion": 3,
-        "version": "1.0.0",
-        "description": "A comprehensive API for managing auto repair shop operations"
-    }
-    
-    Swagger(app, config=swagger_config, template=swagger_template)
-    
-    return swagger_bp
+The spec is built from the YAML in view docstrings and
+``template.swagger_template`` by ``flask apispec build``, and committed as
+apispec.json next to this module. The app reads that file once, on the
+first request for it, and keeps it compacted, a gzip-compressed copy and
+an ETag of their hash in memory, so a request is a lookup rather than a parse
+of every docstring. ``flask apispec check`` fails when the file is stale or
+when swagger.yalm documents an operation the views don't.
 
-# Swagger template with definitions
-swagger_template = {
-    "swagger": "2.0",
-    "info": {
-        "title": "Mechanic API",
-        "description": "API for managing mechanics, customers, inventory, and service tickets",
-        "contact": {
-            "email": "support@mechanicapi.com"
-        },
-        "version": "1.0.0"
-    },
-    "host": "localhost:5000",
-    "basePath": "/",
-    "schemes": ["http", "https"],
-    "securityDefinitions": {
-        "BearerAuth": {
-            "type": "apiKey",
-            "name": "Authorization",
-            "in": "header",
-            "description": "JWT Authorization header using the Bearer scheme. Example: \"Authorization: Bearer {token}\""
-        }
-    },
-    "tags": [
-        {
-            "name": "Authentication",
-            "description": "User authentication and token management"
-        },
-        {
-            "name": "Mechanics",
-            "description": "Mechanic management endpoints"
-        },
-        {
-            "name": "Customers",
-            "description": "Customer management endpoints"
-        },
-        {
-            "name": "Inventory",
-            "description": "Inventory management endpoints"
-        },
-        {
-            "name": "Service Tickets",
-            "description": "Service ticket management endpoints"
-        }
-    ]
-}
\ No newline at end of file
+Without the file (a fresh checkout before the first build), the spec is
+built from the views on first request instead.
+"""
+import gzip
+import hashlib
+import json
+import os
+
+from flask import current_app, request
+from werkzeug.http import is_resource_modified
+
+from ..extensions import limiter
+
+SPEC_PATH = os.path.join(os.path.dirname(__file__), 'apispec.json')
+MAX_AGE = 300
+
+
+class SpecArtifact:
+    def __init__(self, body):
+        # The file is indented for readable diffs; clients get it compact
+        self.body = json.dumps(json.loads(body), separators=(',', ':'), sort_keys=True,
+                               ensure_ascii=False).encode('utf-8')
+        self.gzipped = gzip.compress(self.body, compresslevel=9, mtime=0)
+        self.etag = hashlib.sha256(self.body).hexdigest()[:32]
+
+
+def load_spec(app):
+    artifact = app.extensions.get('apispec')
+    if artifact is None:
+        try:
+            with open(SPEC_PATH, 'rb') as f:
+                body = f.read()
+        except FileNotFoundError:
+            from .spec import build_spec, dump_spec
+            body = dump_spec(build_spec(app))
+        artifact = app.extensions['apispec'] = SpecArtifact(body)
+    return artifact
+
+
+@limiter.exempt
+def apispec_view():
+    artifact = load_spec(current_app)
+    compressed = 'gzip' in request.accept_encodings
+    # Each encoding is its own representation, so it gets its own strong ETag
+    etag = artifact.etag + ('-gzip' if compressed else '')
+
+    if not is_resource_modified(request.environ, etag=etag):
+        response = current_app.response_class(status=304)
+    elif compressed:
+        response = current_app.response_class(artifact.gzipped, mimetype='application/json')
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        response = current_app.response_class(artifact.body, mimetype='application/json')
+    response.set_etag(etag)
+    response.vary.add('Accept-Encoding')
+    response.cache_control.public = True
+    response.cache_control.max_age = MAX_AGE
+    return response
+
+
+def init_app(app):
+    app.add_url_rule('/apispec.json', 'apispec', apispec_view)
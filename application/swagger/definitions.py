@@ -135,35 +135,6 @@ mechanic_response_definition = {
     }
 }
 
-# Customer Definitions
-customer_registration_definition = {
-    "type": "object",
-    "required": ["name", "email"],
-    "properties": {
-        "name": {
-            "type": "string",
-            "example": "Jane Smith"
-        },
-        "email": {
-            "type": "string",
-            "format": "email",
-            "example": "jane@example.com"
-        },
-        "phone": {
-            "type": "string",
-            "example": "555-123-4567"
-        },
-        "address": {
-            "type": "string",
-            "example": "789 Pine St, City, State"
-        },
-        "vehicle_info": {
-            "type": "string",
-            "example": "2020 Toyota Camry"
-        }
-    }
-}
-
 # Error Definitions
 error_definition = {
     "type": "object",
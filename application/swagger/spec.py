@@ -0,0 +1,99 @@
+# application/swagger/spec.py
+"""
+Builds the API spec from the YAML in view docstrings.
+
+Only ``flask apispec build``/``check`` and a missing artifact need this
+module: it imports PyYAML and walks every view, which is what serving the
+precomputed apispec.json avoids.
+
+A view is documented when its docstring has a ``---`` line. The text above
+it becomes the summary (first line) and description (the rest), and the
+YAML below it the operation. Everything else comes from
+``template.swagger_template``.
+"""
+import copy
+import inspect
+import json
+import os
+import re
+
+import yaml
+
+from . import SPEC_PATH
+from .template import swagger_template
+
+REFERENCE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'swagger.yalm')
+METHODS = ('get', 'put', 'post', 'delete', 'options', 'head', 'patch')
+
+_CONVERTER = re.compile(r'<(?:[^:<>]+:)?([^<>]+)>')
+
+
+def _operation(view):
+    docstring = inspect.getdoc(view) or ''
+    text, separator, body = docstring.partition('\n---')
+    if not separator:
+        return None
+    operation = yaml.safe_load(body) or {}
+    summary, _, description = text.strip().partition('\n')
+    if summary:
+        operation.setdefault('summary', summary.strip())
+    if description.strip():
+        operation.setdefault('description', description.strip())
+    return operation
+
+
+def build_spec(app):
+    """The spec for every documented route of ``app``"""
+    spec = copy.deepcopy(swagger_template)
+    paths = spec['paths'] = {}
+    for rule in sorted(app.url_map.iter_rules(), key=lambda rule: (rule.rule, rule.endpoint)):
+        operation = _operation(app.view_functions[rule.endpoint])
+        if operation is None:
+            continue
+        path = _CONVERTER.sub(r'{\1}', rule.rule)
+        for method in sorted(rule.methods - {'HEAD', 'OPTIONS'}):
+            paths.setdefault(path, {})[method.lower()] = operation
+    return spec
+
+
+def dump_spec(spec):
+    """Serialized spec; stable, so equal specs give equal bytes and ETags"""
+    return (json.dumps(spec, indent=2, sort_keys=True, ensure_ascii=False) + '\n').encode('utf-8')
+
+
+def operations(spec):
+    """``{(path, method), ...}`` documented in an OpenAPI/Swagger spec"""
+    return {(path, method) for path, item in spec.get('paths', {}).items() for method in item if method in METHODS}
+
+
+def check_spec(app, spec_path=SPEC_PATH, reference_path=REFERENCE_PATH):
+    """
+    Problems with the committed artifact, as messages; empty when in sync.
+
+    The artifact must match a fresh build, and every operation in
+    swagger.yalm, the hand-written reference, must exist in the spec.
+    """
+    problems = []
+    built = dump_spec(build_spec(app))
+    try:
+        with open(spec_path, 'rb') as f:
+            current = f.read()
+    except FileNotFoundError:
+        current = None
+    if current != built:
+        problems.append(f'{os.path.basename(spec_path)} is out of date; run `flask apispec build`')
+
+    with open(reference_path, encoding='utf-8') as f:
+        reference = yaml.safe_load(f)
+    documented = operations(json.loads(built))
+    for path, method in sorted(operations(reference) - documented):
+        problems.append(f'{os.path.basename(reference_path)} documents {method.upper()} {path}, '
+                        f'which no view documents')
+    return problems
+
+
+def write_spec(app, spec_path=SPEC_PATH):
+    body = dump_spec(build_spec(app))
+    with open(spec_path, 'wb') as f:
+        f.write(body)
+    return body
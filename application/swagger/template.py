@@ -45,7 +45,6 @@ swagger_template = {
         "InventoryCreate": inventory_create_definition,
         "InventoryUpdate": inventory_update_definition,
         "Customer": customer_definition,
-        "CustomerRegistration": customer_registration_definition,
         "CustomerUpdate": customer_update_definition,
     }
 }
\ No newline at end of file
@@ -0,0 +1,229 @@
+# application/ticket_stats.py
+"""
+Per-mechanic ticket counters (``mechanic_ticket_stats``).
+
+The counters are maintained inside the same flush that changes them:
+``before_flush`` works out how assignments and ticket statuses are about to
+change, ``after_flush_postexec`` applies the result as ``count = count + :delta``
+UPDATEs, so the rollup commits or rolls back with the data it summarises.
+
+Only ORM unit-of-work changes are seen. Bulk ``update()``/``delete()``
+statements must adjust the counters themselves (see
+``subtract_ticket_assignments``) or be followed by ``rebuild_mechanic_stats``.
+"""
+from collections import Counter, defaultdict
+
+from sqlalchemy import and_, case, delete, event, func, insert, inspect, or_, select, update
+from sqlalchemy.orm import Session
+
+from .extensions import db
+from .models import Mechanic, MechanicTicketStats, ServiceTicket, ServiceTicketMechanic
+
+OPEN_STATUSES = ('open', 'pending')
+TICKET_STATUSES = OPEN_STATUSES + ('in_progress', 'completed', 'cancelled')
+COUNTER_COLUMNS = ('open_count', 'in_progress_count', 'completed_count', 'total_count')
+
+_PENDING_KEY = 'mechanic_ticket_stats'
+
+
+def status_bucket(status):
+    """Counter column a ticket status is counted under, besides ``total_count``"""
+    if status is None or status in OPEN_STATUSES:
+        return 'open_count'
+    if status == 'in_progress':
+        return 'in_progress_count'
+    if status == 'completed':
+        return 'completed_count'
+    return None
+
+
+def _bucket_conditions(status):
+    return {
+        'open_count': or_(status.is_(None), status.in_(OPEN_STATUSES)),
+        'in_progress_count': status == 'in_progress',
+        'completed_count': status == 'completed',
+    }
+
+
+def _add(deltas, mechanic_id, status, sign):
+    if mechanic_id is None:
+        return
+    bucket = status_bucket(status)
+    if bucket:
+        deltas[mechanic_id][bucket] += sign
+    deltas[mechanic_id]['total_count'] += sign
+
+
+def _committed(session, obj, attr):
+    """Value of ``attr`` as it is in the database, before this flush"""
+    state = inspect(obj)
+    history = state.attrs[attr].history
+    if history.deleted:
+        return history.deleted[0]
+    if history.unchanged:
+        return history.unchanged[0]
+    if history.added and state.has_identity:
+        # Set while expired, so the old value was never loaded
+        cls = type(obj)
+        return session.execute(select(getattr(cls, attr)).where(cls.id == obj.id)).scalar()
+    return getattr(obj, attr)
+
+
+def _ticket(session, assignment, ticket_id):
+    ticket = assignment.ticket
+    if ticket is None or ticket.id != ticket_id:
+        ticket = session.get(ServiceTicket, ticket_id)
+    return ticket
+
+
+def _committed_status(session, assignment):
+    ticket = _ticket(session, assignment, _committed(session, assignment, 'ticket_id'))
+    return _committed(session, ticket, 'status') if ticket is not None else None
+
+
+@event.listens_for(Session, 'before_flush')
+def _collect_ticket_stat_changes(session, flush_context, instances):
+    deltas = defaultdict(Counter)
+    handled = set()  # assignment ids whose old contribution is already removed
+
+    with session.no_autoflush:
+        for obj in session.deleted:
+            if isinstance(obj, ServiceTicketMechanic):
+                _add(deltas, _committed(session, obj, 'mechanic_id'), _committed_status(session, obj), -1)
+                handled.add(obj.id)
+
+        for obj in session.dirty:
+            if not isinstance(obj, ServiceTicketMechanic):
+                continue
+            # Re-pointed, or removed from a ticket's collection (a delete-orphan)
+            attrs = inspect(obj).attrs
+            if any(attrs[name].history.has_changes() for name in ('mechanic_id', 'ticket_id', 'mechanic', 'ticket')):
+                _add(deltas, _committed(session, obj, 'mechanic_id'), _committed_status(session, obj), -1)
+                handled.add(obj.id)
+
+        for obj in session.dirty:
+            if not isinstance(obj, ServiceTicket) or obj in session.deleted:
+                continue
+            history = inspect(obj).attrs.status.history
+            if not history.has_changes():
+                continue
+            old, new = _committed(session, obj, 'status'), obj.status
+            if status_bucket(old) == status_bucket(new):
+                continue
+            rows = session.execute(
+                select(ServiceTicketMechanic.id, ServiceTicketMechanic.mechanic_id)
+                .where(ServiceTicketMechanic.ticket_id == obj.id)
+            )
+            for assignment_id, mechanic_id in rows:
+                if assignment_id in handled:
+                    continue
+                _add(deltas, mechanic_id, old, -1)
+                _add(deltas, mechanic_id, new, +1)
+
+    # New and re-pointed assignments are counted after the flush, once every
+    # mechanic and ticket they reference has an id.
+    added = [obj for obj in session.new if isinstance(obj, ServiceTicketMechanic)]
+    added += [obj for obj in session.dirty
+              if isinstance(obj, ServiceTicketMechanic) and obj.id in handled]
+    session.info[_PENDING_KEY] = (deltas, added)
+
+
+@event.listens_for(Session, 'after_flush_postexec')
+def _apply_ticket_stat_changes(session, flush_context):
+    pending = session.info.pop(_PENDING_KEY, None)
+    if pending is None:
+        return
+    deltas, added = pending
+
+    for assignment in added:
+        state = inspect(assignment)
+        if state.deleted or state.was_deleted:
+            continue
+        ticket = _ticket(session, assignment, assignment.ticket_id)
+        _add(deltas, assignment.mechanic_id, ticket.status if ticket is not None else None, +1)
+
+    connection = session.connection()
+    for mechanic_id, changes in deltas.items():
+        changes = {column: delta for column, delta in changes.items() if delta}
+        if changes:
+            _apply_delta(connection, mechanic_id, changes)
+
+
+def _apply_delta(connection, mechanic_id, changes):
+    table = MechanicTicketStats.__table__
+    result = connection.execute(
+        update(table)
+        .where(table.c.mechanic_id == mechanic_id)
+        .values({column: table.c[column] + delta for column, delta in changes.items()})
+    )
+    if result.rowcount == 0:
+        connection.execute(insert(table).values(
+            mechanic_id=mechanic_id,
+            **{column: max(changes.get(column, 0), 0) for column in COUNTER_COLUMNS}
+        ))
+
+
+def subtract_ticket_assignments(ticket_ids):
+    """
+    Take the tickets selected by ``ticket_ids`` out of the counters.
+
+    For bulk DELETEs that bypass the unit of work; call it before the
+    assignments are deleted. One UPDATE however many tickets are involved.
+    """
+    stats = MechanicTicketStats.__table__
+    assignments = ServiceTicketMechanic.__table__
+    tickets = ServiceTicket.__table__
+
+    def removed(condition=None):
+        query = (
+            select(func.count())
+            .select_from(assignments.join(tickets, tickets.c.id == assignments.c.ticket_id))
+            .where(assignments.c.mechanic_id == stats.c.mechanic_id,
+                   assignments.c.ticket_id.in_(ticket_ids))
+        )
+        if condition is not None:
+            query = query.where(condition)
+        return query.scalar_subquery()
+
+    values = {column: stats.c[column] - removed(condition)
+              for column, condition in _bucket_conditions(tickets.c.status).items()}
+    values['total_count'] = stats.c.total_count - removed()
+
+    db.session.execute(
+        update(stats)
+        .where(stats.c.mechanic_id.in_(
+            select(assignments.c.mechanic_id).where(assignments.c.ticket_id.in_(ticket_ids))
+        ))
+        .values(values)
+    )
+
+
+def rebuild_mechanic_stats(mechanic_ids=None):
+    """
+    Recompute the counters from ``service_ticket_mechanics`` (all mechanics,
+    or just ``mechanic_ids``). Runs in the caller's transaction.
+    """
+    stats = MechanicTicketStats.__table__
+    assignments = ServiceTicketMechanic.__table__
+    tickets = ServiceTicket.__table__
+
+    counts = [
+        func.coalesce(func.sum(case((and_(tickets.c.id.isnot(None), condition), 1), else_=0)), 0).label(column)
+        for column, condition in _bucket_conditions(tickets.c.status).items()
+    ]
+    query = (
+        select(Mechanic.id, *counts, func.count(assignments.c.id).label('total_count'))
+        .select_from(Mechanic.__table__)
+        .outerjoin(assignments, assignments.c.mechanic_id == Mechanic.id)
+        .outerjoin(tickets, tickets.c.id == assignments.c.ticket_id)
+        .group_by(Mechanic.id)
+    )
+    clear = delete(stats)
+    if mechanic_ids is not None:
+        query = query.where(Mechanic.id.in_(mechanic_ids))
+        clear = clear.where(stats.c.mechanic_id.in_(mechanic_ids))
+
+    db.session.execute(clear)
+    db.session.execute(
+        insert(stats).from_select(['mechanic_id', *COUNTER_COLUMNS], query)
+    )
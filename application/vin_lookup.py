@@ -0,0 +1,103 @@
+# application/vin_lookup.py
+"""
+VIN lookups for the front desk, served from a small per-worker cache.
+
+Entries are serialized vehicles keyed by normalized VIN. A miss is one probe
+of the unique ``vin`` index, or one ``IN`` query per chunk of a batch.
+Committed writes evict the VINs they touch from this worker right away:
+ORM changes through the unit of work, and bulk ``update()``/``delete()``
+statements on vehicles, whose VINs are read before they run. Other workers
+catch up when the entry expires after ``VIN_CACHE_TTL`` seconds. Misses
+aren't cached, so a newly registered vehicle is found immediately.
+"""
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from .models import Vehicle, normalize_vin
+from .serialization import serialize_query
+from .ttl_cache import TTLCache
+
+VIN_CACHE_SIZE = 4096
+VIN_CACHE_TTL = 30
+LOOKUP_CHUNK = 500
+
+_PENDING_KEY = 'vin_cache_evictions'
+
+_vehicles_by_vin = TTLCache(maxsize=VIN_CACHE_SIZE, ttl=VIN_CACHE_TTL)
+
+
+def lookup_vins(vins):
+    """``{normalized VIN: vehicle dict or None}`` for ``vins``, in request order without duplicates"""
+    normalized = list(dict.fromkeys(normalize_vin(vin) for vin in vins))
+    found = {}
+    for vin in normalized:
+        vehicle = _vehicles_by_vin.get(vin)
+        if vehicle is not None:
+            found[vin] = vehicle
+
+    missing = [vin for vin in normalized if vin not in found]
+    for offset in range(0, len(missing), LOOKUP_CHUNK):
+        chunk = missing[offset:offset + LOOKUP_CHUNK]
+        for vehicle in serialize_query(Vehicle.query.filter(Vehicle.vin.in_(chunk)), Vehicle):
+            _vehicles_by_vin.set(vehicle['vin'], vehicle)
+            found[vehicle['vin']] = vehicle
+
+    return {vin: found.get(vin) for vin in normalized}
+
+
+def lookup_vin(vin):
+    """The serialized vehicle with this VIN, or None"""
+    return lookup_vins([vin])[normalize_vin(vin)]
+
+
+def clear_vin_cache():
+    _vehicles_by_vin.clear()
+
+
+def vin_cache_stats():
+    return _vehicles_by_vin.stats()
+
+
+@event.listens_for(Session, 'before_flush')
+def _collect_changed_vins(session, flush_context, instances):
+    vins = session.info.setdefault(_PENDING_KEY, set())
+    with session.no_autoflush:
+        for obj in (*session.dirty, *session.deleted):
+            if isinstance(obj, Vehicle):
+                # The old VIN if it changed, and the current one for any change
+                vins.update(inspect(obj).attrs.vin.history.deleted)
+                vins.add(obj.vin)
+
+
+@event.listens_for(Session, 'do_orm_execute')
+def _collect_bulk_vins(orm_execute_state):
+    # Bulk statements bypass the flush; read the VINs of the rows they will touch
+    if not (orm_execute_state.is_update or orm_execute_state.is_delete):
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is None or not issubclass(mapper.class_, Vehicle):
+        return
+
+    if orm_execute_state.is_executemany:
+        # UPDATE by primary key, one parameter set per row
+        query = select(Vehicle.vin).where(Vehicle.id.in_(
+            [params['id'] for params in orm_execute_state.parameters if 'id' in params]
+        ))
+    else:
+        query = select(Vehicle.vin)
+        whereclause = orm_execute_state.statement.whereclause
+        if whereclause is not None:
+            query = query.where(whereclause)
+    session = orm_execute_state.session
+    session.info.setdefault(_PENDING_KEY, set()).update(session.scalars(query))
+
+
+@event.listens_for(Session, 'after_commit')
+def _evict_committed_vins(session):
+    for vin in session.info.pop(_PENDING_KEY, ()):
+        _vehicles_by_vin.pop(vin)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_changed_vins(session):
+    session.info.pop(_PENDING_KEY, None)
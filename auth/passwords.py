@@ -0,0 +1,373 @@
+# auth/passwords.py
+"""
+Pluggable password hashing.
+
+The algorithm and work factor come from ``PASSWORD_HASH_ALGORITHM`` and
+``PASSWORD_HASH_WORK_FACTOR`` in the app config. Hashes made with any
+supported algorithm keep verifying after the configuration changes;
+``needs_rehash`` tells callers when a stored hash should be upgraded.
+
+With ``PASSWORD_HASH_POOL_WORKERS`` set, hashing runs in a bounded process
+pool instead of on the request thread (see :class:`HashPool`).
+"""
+import abc
+import base64
+import hashlib
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import bcrypt
+from flask import current_app, has_app_context
+from werkzeug.security import check_password_hash, generate_password_hash
+
+DEFAULT_ALGORITHM = 'pbkdf2:sha256'
+
+# Workers must not fork from a threaded server process (locks held by other
+# threads would be copied in their locked state)
+POOL_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+
+class HashPoolSaturated(Exception):
+    """Raised instead of queueing when the hashing pool is full"""
+
+
+class PasswordHasher(abc.ABC):
+    """Base class; ``work_factor`` means whatever the algorithm's cost knob is"""
+
+    algorithm = None
+    default_work_factor = None
+
+    def __init__(self, work_factor=None):
+        self.work_factor = int(work_factor or self.default_work_factor)
+
+    @abc.abstractmethod
+    def hash(self, password):
+        """Hash ``password`` with this algorithm and work factor"""
+
+    @abc.abstractmethod
+    def verify(self, pw_hash, password):
+        """True if ``password`` matches ``pw_hash``"""
+
+    @abc.abstractmethod
+    def identifies(self, pw_hash):
+        """True if ``pw_hash`` was produced by this algorithm family"""
+
+    @abc.abstractmethod
+    def needs_rehash(self, pw_hash):
+        """True if ``pw_hash`` uses another algorithm or work factor"""
+
+
+class _WerkzeugHasher(PasswordHasher):
+    """Algorithms understood by ``werkzeug.security``"""
+
+    @property
+    @abc.abstractmethod
+    def method(self):
+        """The werkzeug ``method`` string, work factor included"""
+
+    def hash(self, password):
+        return generate_password_hash(password, method=self.method)
+
+    def verify(self, pw_hash, password):
+        return check_password_hash(pw_hash, password)
+
+    def needs_rehash(self, pw_hash):
+        return pw_hash.split('$', 1)[0] != self.method
+
+
+class Pbkdf2Hasher(_WerkzeugHasher):
+    """PBKDF2-HMAC-SHA256; work factor is the iteration count"""
+
+    algorithm = 'pbkdf2:sha256'
+    default_work_factor = 600000
+
+    @property
+    def method(self):
+        return f'pbkdf2:sha256:{self.work_factor}'
+
+    def identifies(self, pw_hash):
+        return pw_hash.startswith('pbkdf2:')
+
+
+class ScryptHasher(_WerkzeugHasher):
+    """scrypt; work factor is the CPU/memory cost ``N`` (a power of two)"""
+
+    algorithm = 'scrypt'
+    default_work_factor = 32768
+
+    @property
+    def method(self):
+        return f'scrypt:{self.work_factor}:8:1'
+
+    def identifies(self, pw_hash):
+        return pw_hash.startswith('scrypt:')
+
+
+class BcryptHasher(PasswordHasher):
+    """bcrypt; work factor is the log2 cost (``rounds``)
+
+    bcrypt only reads 72 bytes of input (and bcrypt 5 refuses more), so
+    longer passwords are reduced to the base64 of their SHA-256 first.
+    Shorter ones are hashed as they are, so existing hashes keep verifying.
+    """
+
+    algorithm = 'bcrypt'
+    default_work_factor = 12
+    max_password_bytes = 72
+
+    def _secret(self, password):
+        secret = password.encode('utf-8')
+        if len(secret) > self.max_password_bytes:
+            secret = base64.b64encode(hashlib.sha256(secret).digest())
+        return secret
+
+    def hash(self, password):
+        salt = bcrypt.gensalt(rounds=self.work_factor)
+        return bcrypt.hashpw(self._secret(password), salt).decode('ascii')
+
+    def verify(self, pw_hash, password):
+        try:
+            return bcrypt.checkpw(self._secret(password), pw_hash.encode('ascii'))
+        except ValueError:
+            return False
+
+    def identifies(self, pw_hash):
+        return pw_hash.startswith(('$2a$', '$2b$', '$2y$'))
+
+    def needs_rehash(self, pw_hash):
+        try:
+            return int(pw_hash.split('$')[2]) != self.work_factor
+        except (IndexError, ValueError):
+            return True
+
+
+HASHERS = {
+    Pbkdf2Hasher.algorithm: Pbkdf2Hasher,
+    ScryptHasher.algorithm: ScryptHasher,
+    BcryptHasher.algorithm: BcryptHasher,
+}
+
+_hasher_cache = {}
+
+
+def get_hasher(algorithm=None, work_factor=None):
+    """Return the configured hasher (or the one named by the arguments)"""
+    if algorithm is None and has_app_context():
+        algorithm = current_app.config.get('PASSWORD_HASH_ALGORITHM')
+        work_factor = current_app.config.get('PASSWORD_HASH_WORK_FACTOR')
+    algorithm = algorithm or DEFAULT_ALGORITHM
+
+    if algorithm not in HASHERS:
+        raise ValueError(f'Unsupported password hash algorithm: {algorithm}')
+
+    key = (algorithm, work_factor)
+    if key not in _hasher_cache:
+        _hasher_cache[key] = HASHERS[algorithm](work_factor)
+    return _hasher_cache[key]
+
+
+def _hasher_for(pw_hash):
+    for hasher_class in HASHERS.values():
+        hasher = hasher_class()
+        if hasher.identifies(pw_hash):
+            return hasher
+    return None
+
+
+def _timed_call(func, *args):
+    """Runs inside a pool worker; reports when work started and how long it took"""
+    started_at = time.time()
+    start = time.perf_counter()
+    result = func(*args)
+    return result, started_at, time.perf_counter() - start
+
+
+class HashPool:
+    """
+    Process pool for password hashing.
+
+    Processes sidestep the GIL, so a burst of logins no longer stalls the
+    request threads serving other endpoints. At most ``workers + max_queue``
+    hashes may be in flight; beyond that :meth:`run` raises
+    :class:`HashPoolSaturated` immediately so the caller can shed load.
+
+    A worker dying breaks a ``ProcessPoolExecutor`` for good, so the pool
+    replaces its executor when that happens (counted in ``restarts``) and
+    retries the hash once on the new one.
+    """
+
+    def __init__(self, workers, max_queue):
+        self.workers = workers
+        self.max_queue = max_queue
+        self._executor = self._new_executor()
+        self._slots = threading.BoundedSemaphore(workers + max_queue)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+        self.restarts = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+        self.hash_time_total = 0.0
+
+    def _new_executor(self):
+        return ProcessPoolExecutor(max_workers=self.workers,
+                                   mp_context=multiprocessing.get_context(POOL_START_METHOD))
+
+    def _replace_broken(self, executor):
+        with self._lock:
+            # Another thread may already have replaced it
+            if self._executor is executor:
+                self._executor = self._new_executor()
+                self.restarts += 1
+        executor.shutdown(wait=False)
+
+    def _submit(self, func, *args):
+        executor = self._executor
+        try:
+            return executor.submit(_timed_call, func, *args).result()
+        except BrokenProcessPool:
+            self._replace_broken(executor)
+            executor = self._executor
+            try:
+                return executor.submit(_timed_call, func, *args).result()
+            except BrokenProcessPool:
+                self._replace_broken(executor)
+                raise
+
+    def run(self, func, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise HashPoolSaturated('Password hashing pool is saturated')
+
+        with self._lock:
+            self.submitted += 1
+            self._in_flight += 1
+        submitted_at = time.time()
+        try:
+            result, started_at, hash_seconds = self._submit(func, *args)
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            self._slots.release()
+
+        queue_wait = max(0.0, started_at - submitted_at)
+        with self._lock:
+            self.completed += 1
+            self.queue_wait_total += queue_wait
+            self.queue_wait_max = max(self.queue_wait_max, queue_wait)
+            self.hash_time_total += hash_seconds
+        return result
+
+    def stats(self):
+        with self._lock:
+            completed = self.completed or 1
+            return {
+                'workers': self.workers,
+                'max_queue': self.max_queue,
+                'in_flight': self._in_flight,
+                'submitted': self.submitted,
+                'completed': self.completed,
+                'rejected': self.rejected,
+                'restarts': self.restarts,
+                'queue_wait_avg_ms': 1000 * self.queue_wait_total / completed,
+                'queue_wait_max_ms': 1000 * self.queue_wait_max,
+                'hash_time_avg_ms': 1000 * self.hash_time_total / completed,
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=True)
+
+
+_pool_lock = threading.Lock()
+
+
+def get_hash_pool():
+    """The current app's :class:`HashPool`, or None when hashing runs inline.
+
+    The pool is created on first use; its workers start from a fork server
+    (or spawn), never by forking the threaded server process.
+    """
+    if not has_app_context():
+        return None
+    workers = current_app.config.get('PASSWORD_HASH_POOL_WORKERS') or 0
+    if workers <= 0:
+        return None
+
+    pool = current_app.extensions.get('password_hash_pool')
+    if pool is None:
+        with _pool_lock:
+            pool = current_app.extensions.get('password_hash_pool')
+            if pool is None:
+                max_queue = current_app.config.get('PASSWORD_HASH_POOL_MAX_QUEUE')
+                if max_queue is None:
+                    max_queue = workers * 4
+                pool = HashPool(workers, max_queue)
+                current_app.extensions['password_hash_pool'] = pool
+    return pool
+
+
+def hash_pool_stats():
+    pool = get_hash_pool()
+    return pool.stats() if pool is not None else None
+
+
+def _run(func, *args):
+    pool = get_hash_pool()
+    if pool is None:
+        return func(*args)
+    return pool.run(func, *args)
+
+
+def hash_password(password):
+    return _run(get_hasher().hash, password)
+
+
+def verify_password(pw_hash, password):
+    """Check ``password`` against a hash made by any supported algorithm"""
+    if not pw_hash:
+        return False
+    hasher = _hasher_for(pw_hash)
+    return hasher is not None and _run(hasher.verify, pw_hash, password)
+
+
+def needs_rehash(pw_hash):
+    """True if ``pw_hash`` doesn't match the configured algorithm and cost"""
+    hasher = get_hasher()
+    return not hasher.identifies(pw_hash) or hasher.needs_rehash(pw_hash)
+
+
+def benchmark(hasher, seconds=2.0, password='benchmark-password'):
+    """
+    Hash repeatedly on the calling thread for about ``seconds``.
+
+    Returns a dict with the single-core rate and the machine-wide estimate
+    (``per_core * cpu_count``), which is the login capacity of one host.
+    """
+    iterations = 0
+    start = time.perf_counter()
+    deadline = start + seconds
+    while True:
+        hasher.hash(password)
+        iterations += 1
+        if time.perf_counter() >= deadline:
+            break
+    elapsed = time.perf_counter() - start
+
+    per_core = iterations / elapsed
+    cores = os.cpu_count() or 1
+    return {
+        'algorithm': hasher.algorithm,
+        'work_factor': hasher.work_factor,
+        'iterations': iterations,
+        'seconds': elapsed,
+        'hashes_per_sec_per_core': per_core,
+        'cores': cores,
+        'estimated_hashes_per_sec': per_core * cores,
+    }
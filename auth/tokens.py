@@ -3,14 +3,25 @@ import pytz
 
 jwt_manager = JWTManager()
 
+import hashlib
+import time
 import jwt
 from datetime import datetime, timedelta, timezone
 from functools import wraps
 from flask import request, jsonify
+from application.ttl_cache import TTLCache
 
 SECRET_KEY = "your-super-secret-key-change-in-production"
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30
+TOKEN_CACHE_SIZE = 4096
+
+class TokenRevokedError(jwt.InvalidTokenError):
+    """Raised when a revocation hook rejects an otherwise valid token"""
+
+# Decoded claims of already-verified tokens, keyed by token digest
+_verified_tokens = TTLCache(maxsize=TOKEN_CACHE_SIZE)
+_revocation_hooks = []
 
 def encode_token(customer_id):
     try:
@@ -37,7 +48,51 @@ def encode_mechanic_token(mechanic_id):
     }
     return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
 
-def token_required(f):
+def register_revocation_hook(hook):
+    """
+    Register ``hook(claims) -> bool``; returning True rejects the token.
+
+    Hooks run on every request, including cache hits, so a revoked token
+    stops working immediately even while its claims are still cached.
+    """
+    _revocation_hooks.append(hook)
+    return hook
+
+def revoke_token(token):
+    """Drop a token's cached claims so the next use is fully re-verified"""
+    _verified_tokens.pop(_token_digest(token))
+
+def clear_token_cache():
+    _verified_tokens.clear()
+
+def token_cache_stats():
+    """Hit/miss counters of the verified-token cache"""
+    return _verified_tokens.stats()
+
+def _token_digest(token):
+    return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+def _decode_token(token):
+    """
+    Verify ``token`` and return its claims.
+
+    Verified claims are cached under the token's digest until the token's
+    own ``exp``, so repeat requests skip HMAC verification entirely.
+    """
+    key = _token_digest(token)
+    payload = _verified_tokens.get(key)
+    if payload is None:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+        ttl = payload.get('exp', 0) - time.time()
+        if ttl > 0:
+            _verified_tokens.set(key, payload, ttl=ttl)
+
+    if any(hook(payload) for hook in _revocation_hooks):
+        _verified_tokens.pop(key)
+        raise TokenRevokedError('Token has been revoked')
+    return payload
+
+def _authenticate(f, token_type):
     @wraps(f)
     def decorated(*args, **kwargs):
         token = None
@@ -52,41 +107,22 @@ def token_required(f):
             return jsonify({'message': 'Token is missing'}), 401
         
         try:
-            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-            if payload.get('type') != 'customer':
+            payload = _decode_token(token)
+            if payload.get('type') != token_type:
                 return jsonify({'message': 'Invalid token type'}), 401
-            customer_id = payload.get('sub')
+            subject_id = payload.get('sub')
         except jwt.ExpiredSignatureError:
             return jsonify({'message': 'Token has expired'}), 401
+        except TokenRevokedError:
+            return jsonify({'message': 'Token has been revoked'}), 401
         except jwt.InvalidTokenError:
             return jsonify({'message': 'Token is invalid'}), 401
         
-        return f(customer_id, *args, **kwargs)
+        return f(subject_id, *args, **kwargs)
     return decorated
 
+def token_required(f):
+    return _authenticate(f, 'customer')
+
 def mechanic_token_required(f):
-    @wraps(f)
-    def decorated(*args, **kwargs):
-        token = None
-        if 'Authorization' in request.headers:
-            auth_header = request.headers['Authorization']
-            try:
-                token = auth_header.split(" ")[1]
-            except IndexError:
-                return jsonify({'message': 'Invalid token format'}), 401
-        
-        if not token:
-            return jsonify({'message': 'Token is missing'}), 401
-        
-        try:
-            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
-            if payload.get('type') != 'mechanic':
-                return jsonify({'message': 'Invalid token type'}), 401
-            mechanic_id = payload.get('sub')
-        except jwt.ExpiredSignatureError:
-            return jsonify({'message': 'Token has expired'}), 401
-        except jwt.InvalidTokenError:
-            return jsonify({'message': 'Token is invalid'}), 401
-        
-        return f(mechanic_id, *args, **kwargs)
-    return decorated
\ No newline at end of file
+    return _authenticate(f, 'mechanic')
@@ -0,0 +1,57 @@
+# benchmarks/bench_apispec.py
+"""
+/apispec.json as Flasgger serves it (parsing every view's docstring on the
+first request, and on every request in debug mode) against the precomputed
+artifact served from memory.
+
+    python -m benchmarks.bench_apispec
+"""
+import time
+
+from flasgger import Swagger
+
+from application import create_app
+from application.swagger.template import swagger_template
+from config import TestConfig
+
+REQUESTS = 200
+
+
+def first_request_ms(client, path):
+    start = time.perf_counter()
+    client.get(path)
+    return (time.perf_counter() - start) * 1000
+
+
+def per_request_ms(client, path, headers=None):
+    client.get(path, headers=headers)
+    start = time.perf_counter()
+    for _ in range(REQUESTS):
+        response = client.get(path, headers=headers)
+    return (time.perf_counter() - start) / REQUESTS * 1000, response
+
+
+def main():
+    flasgger_app = create_app(TestConfig)
+    Swagger(flasgger_app, template=swagger_template)
+    flasgger_client = flasgger_app.test_client()
+    flasgger_first_ms = first_request_ms(flasgger_client, '/apispec_1.json')
+    flasgger_ms, response = per_request_ms(flasgger_client, '/apispec_1.json')
+    flasgger_bytes = len(response.data)
+
+    client = create_app(TestConfig).test_client()
+    first_ms = first_request_ms(client, '/apispec.json')
+    plain_ms, plain = per_request_ms(client, '/apispec.json')
+    gzip_ms, gzipped = per_request_ms(client, '/apispec.json', {'Accept-Encoding': 'gzip'})
+    etag = gzipped.headers['ETag']
+    revalidate_ms, _ = per_request_ms(client, '/apispec.json', {'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+
+    print(f"first request: flasgger {flasgger_first_ms:.1f} ms, precomputed {first_ms:.1f} ms")
+    print(f"flasgger                      {flasgger_ms:8.2f} ms  {flasgger_bytes:7d} bytes")
+    print(f"precomputed                   {plain_ms:8.2f} ms  {len(plain.data):7d} bytes")
+    print(f"precomputed, gzip             {gzip_ms:8.2f} ms  {len(gzipped.data):7d} bytes")
+    print(f"precomputed, 304              {revalidate_ms:8.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
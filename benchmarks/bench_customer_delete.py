@@ -0,0 +1,102 @@
+# benchmarks/bench_customer_delete.py
+"""
+Time deleting a fleet customer (50 vehicles, 2,000 tickets, 2 parts each)
+with the old per-object loop vs. the set-based delete_customer_cascade.
+
+    python -m benchmarks.bench_customer_delete
+"""
+import os
+import tempfile
+import time
+
+from sqlalchemy import event
+
+from application import create_app, db
+from application.blueprints.customer.routes import delete_customer_cascade
+from application.models import Customer, Inventory, ServiceTicket, TicketPart, Vehicle
+from config import TestConfig
+
+VEHICLES = 50
+TICKETS = 2000
+PARTS_PER_TICKET = 2
+
+
+def seed():
+    customer = Customer(first_name="Fleet", last_name="Owner", email=f"fleet{time.time_ns()}@example.com")
+    db.session.add(customer)
+    part = Inventory(name="Oil Filter", price=9.99, quantity_in_stock=100)
+    db.session.add(part)
+    db.session.flush()
+
+    vehicle_ids = []
+    for i in range(VEHICLES):
+        vehicle = Vehicle(customer_id=customer.id, make="Ford", model="Transit", year=2020,
+                          vin=f"FLEET{customer.id:04d}{i:08d}"[:17])
+        db.session.add(vehicle)
+        db.session.flush()
+        vehicle_ids.append(vehicle.id)
+
+    for i in range(TICKETS):
+        ticket = ServiceTicket(customer_id=customer.id, vehicle_id=vehicle_ids[i % VEHICLES],
+                               issue_description="Scheduled service")
+        db.session.add(ticket)
+        db.session.flush()
+        for _ in range(PARTS_PER_TICKET):
+            db.session.add(TicketPart(ticket_id=ticket.id, inventory_id=part.id, quantity_used=1))
+    db.session.commit()
+    return customer.id
+
+
+def legacy_delete(customer_id):
+    """The pre-cascade implementation: one query/DELETE per object"""
+    customer = db.session.get(Customer, customer_id)
+    for vehicle in customer.vehicles:
+        for ticket in ServiceTicket.query.filter_by(vehicle_id=vehicle.id).all():
+            for part in TicketPart.query.filter_by(ticket_id=ticket.id).all():
+                db.session.delete(part)
+            db.session.delete(ticket)
+        db.session.delete(vehicle)
+    for ticket in ServiceTicket.query.filter_by(customer_id=customer_id).all():
+        for part in TicketPart.query.filter_by(ticket_id=ticket.id).all():
+            db.session.delete(part)
+        db.session.delete(ticket)
+    db.session.delete(customer)
+
+
+def measure(label, delete):
+    customer_id = seed()
+    statements = []
+    listener = lambda *args: statements.append(1)
+    event.listen(db.engine, 'before_cursor_execute', listener)
+    start = time.perf_counter()
+    delete(customer_id)
+    db.session.commit()
+    elapsed = time.perf_counter() - start
+    event.remove(db.engine, 'before_cursor_execute', listener)
+    db.session.expunge_all()
+    print(f"{label:<12} {elapsed * 1000:9.1f} ms  {len(statements):6d} statements")
+
+
+def main():
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+
+    class BenchConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{path}'
+
+    app = create_app(BenchConfig)
+    try:
+        with app.app_context():
+            db.create_all()
+            print(f"customer with {VEHICLES} vehicles, {TICKETS} tickets, "
+                  f"{TICKETS * PARTS_PER_TICKET} ticket parts")
+            measure('legacy loop', legacy_delete)
+            measure('set-based', delete_customer_cascade)
+            db.session.remove()
+            db.engine.dispose()
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
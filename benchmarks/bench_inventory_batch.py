@@ -0,0 +1,68 @@
+# benchmarks/bench_inventory_batch.py
+"""
+Receive a 500-line parts delivery through POST /inventory/ one item at a
+time vs. a single POST /inventory/batch, and report items/sec for each.
+
+    python -m benchmarks.bench_inventory_batch
+"""
+import os
+import tempfile
+import time
+
+from application import create_app, db
+from application.models import Inventory, Mechanic
+from auth.tokens import encode_mechanic_token
+from config import TestConfig
+
+ITEMS = 500
+
+
+def delivery(tag):
+    return [{'item_name': f'{tag} part {i}', 'price': 4.25, 'quantity': 12,
+             'description': 'Delivered', 'category': f'Bin {i % 20}'} for i in range(ITEMS)]
+
+
+def measure(label, send):
+    before = Inventory.query.count()
+    start = time.perf_counter()
+    send()
+    elapsed = time.perf_counter() - start
+    assert Inventory.query.count() - before == ITEMS
+    print(f"{label:<18} {elapsed * 1000:9.1f} ms  {ITEMS / elapsed:9.0f} items/sec")
+
+
+def main():
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+
+    class BenchConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{path}'
+
+    app = create_app(BenchConfig)
+    try:
+        with app.app_context():
+            db.create_all()
+            mechanic = Mechanic(first_name="Bench", last_name="Mark", email="bench@example.com")
+            db.session.add(mechanic)
+            db.session.commit()
+            headers = {'Authorization': f'Bearer {encode_mechanic_token(mechanic.id)}'}
+            client = app.test_client()
+
+            def one_by_one():
+                for item in delivery('single'):
+                    assert client.post('/inventory/', headers=headers, json=item).status_code == 201
+
+            def batch():
+                assert client.post('/inventory/batch', headers=headers, json=delivery('batch')).status_code == 201
+
+            print(f"delivery of {ITEMS} items, file-backed SQLite")
+            measure('POST /inventory/', one_by_one)
+            measure('POST /batch', batch)
+            db.session.remove()
+            db.engine.dispose()
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+# benchmarks/bench_json_serialization.py
+"""
+Rows/sec for serializing 10k inventory rows:
+
+* orm + stdlib: ``Inventory.query.all()`` -> ``to_dict()`` -> stdlib json
+* orm + orjson: same dicts through FastJSONProvider
+* columns + orjson: ``with_entities`` tuples -> dicts -> FastJSONProvider
+
+    python -m benchmarks.bench_json_serialization
+"""
+import json
+import time
+
+from application import create_app, db
+from application.models import Inventory
+from application.serialization import serialize_query
+from config import TestConfig
+
+ROWS = 10_000
+ROUNDS = 5
+
+
+def seed():
+    db.session.bulk_insert_mappings(Inventory, [
+        {'name': f'Part {i}', 'description': 'Benchmark part', 'category': f'Category {i % 20}',
+         'price': 9.99, 'quantity_in_stock': i % 50}
+        for i in range(ROWS)
+    ])
+    db.session.commit()
+
+
+def run(label, build):
+    best = float('inf')
+    for _ in range(ROUNDS):
+        db.session.expunge_all()
+        start = time.perf_counter()
+        body = build()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<18} {ROWS / best:12,.0f} rows/sec  ({best * 1000:.1f} ms, {len(body):,} bytes)")
+
+
+def main():
+    app = create_app(TestConfig)
+    with app.app_context():
+        db.create_all()
+        seed()
+
+        run('orm + stdlib', lambda: json.dumps([item.to_dict() for item in Inventory.query.all()]))
+        run('orm + orjson', lambda: app.json.dumps([item.to_dict() for item in Inventory.query.all()]))
+        run('columns + orjson', lambda: app.json.dumps(serialize_query(Inventory.query, Inventory)))
+
+
+if __name__ == '__main__':
+    main()
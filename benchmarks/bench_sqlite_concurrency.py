@@ -0,0 +1,115 @@
+# benchmarks/bench_sqlite_concurrency.py
+"""
+Concurrent reads and writes against a file SQLite database, with the
+SQLite defaults (rollback journal, synchronous=FULL) and with the
+SQLITE_PRAGMAS from config.
+
+Reader threads run the low-stock query while one writer thread commits
+stock updates, through the app's own engine and pool. In the rollback
+journal a write locks out readers until it commits; in WAL they carry on
+against the last committed snapshot.
+
+    python -m benchmarks.bench_sqlite_concurrency
+"""
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+from sqlalchemy import select, update
+from sqlalchemy.exc import OperationalError
+
+from application import create_app, db
+from application.models import Inventory
+from config import TestConfig
+
+ITEMS = 5_000
+READERS = 4
+SECONDS = 5
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+def run(name, pragmas, directory):
+    class BenchConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(directory, f'{name}.db')
+        SQLITE_PRAGMAS = pragmas
+        DB_POOL_SIZE = READERS + 1
+        SQL_SLOW_QUERY_MS = 10_000  # lock waits would otherwise flood the log
+
+    app = create_app(BenchConfig)
+    with app.app_context():
+        db.create_all()
+        db.session.add_all(Inventory(name=f'Part {i}', price=1.0, quantity_in_stock=i % 50, min_stock_level=10)
+                           for i in range(ITEMS))
+        db.session.commit()
+        db.session.remove()
+
+    stop = threading.Event()
+    reads, writes, locked, read_latencies = [0], [0], [0], []
+    counter_lock = threading.Lock()
+
+    def reader():
+        with app.app_context():
+            query = select(Inventory.id).where(Inventory.quantity_in_stock <= Inventory.min_stock_level)
+            while not stop.is_set():
+                start = time.perf_counter()
+                try:
+                    db.session.execute(query).all()
+                    db.session.rollback()
+                except OperationalError:
+                    db.session.rollback()
+                    with counter_lock:
+                        locked[0] += 1
+                    continue
+                with counter_lock:
+                    reads[0] += 1
+                    read_latencies.append(time.perf_counter() - start)
+            db.session.remove()
+
+    def writer():
+        with app.app_context():
+            item = 0
+            while not stop.is_set():
+                item = item % ITEMS + 1
+                try:
+                    db.session.execute(update(Inventory).where(Inventory.id == item)
+                                       .values(quantity_in_stock=Inventory.quantity_in_stock + 1))
+                    db.session.commit()
+                except OperationalError:
+                    db.session.rollback()
+                    with counter_lock:
+                        locked[0] += 1
+                    continue
+                writes[0] += 1
+            db.session.remove()
+
+    threads = [threading.Thread(target=reader) for _ in range(READERS)] + [threading.Thread(target=writer)]
+    for thread in threads:
+        thread.start()
+    time.sleep(SECONDS)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    with app.app_context():
+        db.engine.dispose()
+
+    print(f"{name:<9} reads/s {reads[0] / SECONDS:9.1f}   writes/s {writes[0] / SECONDS:8.1f}   "
+          f"read p99 {percentile(read_latencies, 0.99) * 1000:7.2f} ms   locked errors {locked[0]}")
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    try:
+        run('default', {}, directory)
+        run('tuned', TestConfig.SQLITE_PRAGMAS, directory)
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+# benchmarks/bench_startup.py
+"""
+Cold start: from a fresh interpreter to the first response.
+
+Each run is a new process that imports the app, calls create_app and
+serves one request, timing each phase. Process start-up noise is large on
+shared machines, so medians over RUNS are reported. The slowest imports
+come from one more run under ``python -X importtime``.
+
+    python -m benchmarks.bench_startup
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+RUNS = 15
+TOP_IMPORTS = 12
+
+CHILD = """
+import time
+start = time.perf_counter()
+from application import create_app
+imported = time.perf_counter()
+app = create_app()
+created = time.perf_counter()
+app.test_client().get('/metrics')
+served = time.perf_counter()
+print(imported - start, created - imported, served - created)
+"""
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ENV = {**os.environ, 'TESTING': '1'}
+
+
+def run_once():
+    start = time.perf_counter()
+    output = subprocess.run([sys.executable, '-c', CHILD], cwd=ROOT, env=ENV, check=True,
+                            capture_output=True, text=True).stdout
+    wall = time.perf_counter() - start
+    imports, create, first_request = map(float, output.split()[-3:])
+    return {'import application': imports, 'create_app()': create, 'first request': first_request,
+            'process wall time': wall}
+
+
+def slowest_imports():
+    stderr = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'from application import create_app'],
+                            cwd=ROOT, env=ENV, check=True, capture_output=True, text=True).stderr
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        # Top-level packages and two levels of what they import
+        if depth <= 2:
+            rows.append((int(cumulative), name.rstrip()))
+    return sorted(rows, reverse=True)[:TOP_IMPORTS]
+
+
+def main():
+    runs = [run_once() for _ in range(RUNS)]
+    print(f"median of {RUNS} cold starts")
+    for phase in runs[0]:
+        print(f"  {phase:<20} {statistics.median(run[phase] for run in runs) * 1000:8.1f} ms")
+
+    print("slowest imports (cumulative, -X importtime)")
+    for cumulative, name in slowest_imports():
+        print(f"  {cumulative / 1000:8.1f} ms {name}")
+
+
+if __name__ == '__main__':
+    main()
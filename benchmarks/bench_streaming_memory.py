@@ -0,0 +1,62 @@
+# benchmarks/bench_streaming_memory.py
+"""
+Peak Python heap while serving GET /inventory/ as a JSON array vs. as an
+NDJSON stream, for growing table sizes. The stream's peak should stay flat.
+
+    python -m benchmarks.bench_streaming_memory
+"""
+import os
+import tempfile
+import tracemalloc
+
+from application import create_app, db
+from application.models import Inventory
+from config import TestConfig
+
+SIZES = (10_000, 50_000, 100_000)
+
+
+def peak_kib(client, url, **kwargs):
+    tracemalloc.start()
+    response = client.get(url, **kwargs)
+    for _ in response.response:  # drain the body like a WSGI server would
+        pass
+    response.close()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def main():
+    fd, path = tempfile.mkstemp(suffix='.db')
+    os.close(fd)
+
+    class BenchConfig(TestConfig):
+        SQLALCHEMY_DATABASE_URI = f'sqlite:///{path}'
+
+    app = create_app(BenchConfig)
+    client = app.test_client()
+    try:
+        with app.app_context():
+            db.create_all()
+            loaded = 0
+            for size in SIZES:
+                db.session.bulk_insert_mappings(Inventory, [
+                    {'name': f'Part {i}', 'description': 'Benchmark part', 'price': 9.99,
+                     'quantity_in_stock': 5}
+                    for i in range(loaded, size)
+                ])
+                db.session.commit()
+                loaded = size
+
+                array = peak_kib(client, '/inventory/')
+                stream = peak_kib(client, '/inventory/?stream=1')
+                print(f"{size:>8,} rows   array peak {array:10,.0f} KiB   stream peak {stream:8,.0f} KiB")
+            db.session.remove()
+            db.engine.dispose()
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,5 @@
 import os
 from datetime import timedelta
-import redis
 
 basedir = os.path.abspath(os.path.dirname(__file__))
 
@@ -9,10 +8,30 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or \
         'sqlite:///' + os.path.join(basedir, 'app.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Connection pool, per engine (see application/engine_tuning.py)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE') or 5)
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW') or 10)
+    DB_POOL_TIMEOUT = 30  # seconds to wait for a free connection
+    DB_POOL_RECYCLE = 1800  # seconds; below typical server/proxy idle timeouts
+
+    # Read replicas: GET requests read from these (see application/db_routing.py)
+    SQLALCHEMY_REPLICAS = [uri for uri in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if uri]
+    # How long a client keeps reading from the primary after it wrote
+    REPLICA_STICKY_SECONDS = 5
+
+    # Applied to every new SQLite connection
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',  # readers and the writer don't block each other
+        'synchronous': 'NORMAL',  # fsync at checkpoints only; durable enough with WAL
+        'busy_timeout': 5000,  # ms to wait for a lock before "database is locked"
+        'mmap_size': 268435456,  # 256 MiB of the file memory-mapped for reads
+        'cache_size': -65536,  # 64 MiB page cache (negative means KiB)
+    }
     
     # Redis configuration for rate limiting
+    # The client is created on first use: application.extensions.get_redis()
     REDIS_URL = os.environ.get('REDIS_URL') or 'redis://localhost:6379/0'
-    REDIS_CLIENT = redis.StrictRedis(host='localhost', port=6379, db=0, decode_responses=True)
     
     # Rate limiting configuration
     RATELIMIT_STORAGE_URI = REDIS_URL
@@ -23,11 +42,27 @@ class Config:
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(days=30)
     
+    # Password hashing (see auth/passwords.py for supported algorithms)
+    PASSWORD_HASH_ALGORITHM = os.environ.get('PASSWORD_HASH_ALGORITHM') or 'pbkdf2:sha256'
+    PASSWORD_HASH_WORK_FACTOR = int(os.environ.get('PASSWORD_HASH_WORK_FACTOR') or 0) or None
+    # Worker processes for hashing; 0 hashes inline on the request thread
+    PASSWORD_HASH_POOL_WORKERS = int(os.environ.get('PASSWORD_HASH_POOL_WORKERS') or 0)
+    # Hashes allowed to wait for a worker before requests get a 503
+    PASSWORD_HASH_POOL_MAX_QUEUE = None
+    
     # Cache configuration
     CACHE_TYPE = 'RedisCache' if os.environ.get('REDIS_URL') else 'SimpleCache'
     CACHE_REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/0')
     CACHE_DEFAULT_TIMEOUT = 300  # 5 minutes
 
+    # SQL instrumentation (see application/instrumentation.py)
+    SQL_SLOW_QUERY_MS = float(os.environ.get('SQL_SLOW_QUERY_MS') or 100)
+    SQL_STATS_HEADERS = None  # None: response headers in debug mode, a log line otherwise
+    SQL_LOG_LEVEL = os.environ.get('SQL_LOG_LEVEL') or 'INFO'  # application.sql; WARNING keeps only slow queries
+
+    # Prometheus-style request metrics at /metrics (see application/metrics.py)
+    METRICS_ENABLED = True
+
     # Flasgger settings
     SWAGGER = {
         'title': 'Mechanic API',
@@ -37,5 +72,6 @@ class Config:
 class TestConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
-    # Disable rate limiting for tests
-    RATELIMIT_ENABLED = False
\ No newline at end of file
+    # Disable rate limiting for tests; per-process counters for those that enable it
+    RATELIMIT_ENABLED = False
+    RATELIMIT_STORAGE_URI = 'memory://'
\ No newline at end of file
@@ -51,6 +51,17 @@ def get_metadata():
     return target_db.metadata
 
 
+# The FTS5 vehicle search index (application/search.py) and the shadow
+# tables SQLite keeps for it are created by its own migration and triggers;
+# autogenerate would otherwise offer to drop them
+SEARCH_INDEX_TABLES = {'vehicle_search', *(f'vehicle_search_{suffix}' for suffix in
+                                           ('data', 'idx', 'config', 'docsize', 'content'))}
+
+
+def include_object(object, name, type_, reflected, compare_to):
+    return not (type_ == 'table' and name in SEARCH_INDEX_TABLES)
+
+
 def run_migrations_offline():
     """Run migrations in 'offline' mode.
 
@@ -65,7 +76,8 @@ def run_migrations_offline():
     """
     url = config.get_main_option("sqlalchemy.url")
     context.configure(
-        url=url, target_metadata=get_metadata(), literal_binds=True
+        url=url, target_metadata=get_metadata(), literal_binds=True,
+        include_object=include_object
     )
 
     with context.begin_transaction():
@@ -97,6 +109,7 @@ def run_migrations_online():
             connection=connection,
             target_metadata=get_metadata(),
             process_revision_directives=process_revision_directives,
+            include_object=include_object,
             **current_app.extensions['migrate'].configure_args
         )
 
@@ -0,0 +1,45 @@
+"""Widen password hash columns
+
+Revision ID: 3787823095a9
+Revises: 08e271330d76
+Create Date: 2026-10-18 09:12:41.520331
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3787823095a9'
+down_revision = '08e271330d76'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # scrypt hashes are longer than the previous 128 character limit
+    with op.batch_alter_table('customers', schema=None) as batch_op:
+        batch_op.alter_column('password_hash',
+               existing_type=sa.String(length=128),
+               type_=sa.String(length=255),
+               existing_nullable=True)
+
+    with op.batch_alter_table('mechanics', schema=None) as batch_op:
+        batch_op.alter_column('password_hash',
+               existing_type=sa.String(length=128),
+               type_=sa.String(length=255),
+               existing_nullable=True)
+
+
+def downgrade():
+    with op.batch_alter_table('mechanics', schema=None) as batch_op:
+        batch_op.alter_column('password_hash',
+               existing_type=sa.String(length=255),
+               type_=sa.String(length=128),
+               existing_nullable=True)
+
+    with op.batch_alter_table('customers', schema=None) as batch_op:
+        batch_op.alter_column('password_hash',
+               existing_type=sa.String(length=255),
+               type_=sa.String(length=128),
+               existing_nullable=True)
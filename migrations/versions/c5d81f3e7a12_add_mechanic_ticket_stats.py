@@ -0,0 +1,48 @@
+"""Add mechanic ticket stats rollup
+
+Revision ID: c5d81f3e7a12
+Revises: b41c7e2a9d03
+Create Date: 2026-10-18 11:42:09.513208
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5d81f3e7a12'
+down_revision = 'b41c7e2a9d03'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('mechanic_ticket_stats',
+    sa.Column('mechanic_id', sa.Integer(), nullable=False),
+    sa.Column('open_count', sa.Integer(), nullable=False),
+    sa.Column('in_progress_count', sa.Integer(), nullable=False),
+    sa.Column('completed_count', sa.Integer(), nullable=False),
+    sa.Column('total_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['mechanic_id'], ['mechanics.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('mechanic_id')
+    )
+
+    # Backfill; `flask rebuild-mechanic-stats` does the same from the app
+    op.execute("""
+        INSERT INTO mechanic_ticket_stats
+            (mechanic_id, open_count, in_progress_count, completed_count, total_count)
+        SELECT m.id,
+               COALESCE(SUM(CASE WHEN t.id IS NOT NULL AND (t.status IS NULL OR t.status IN ('open', 'pending'))
+                                 THEN 1 ELSE 0 END), 0),
+               COALESCE(SUM(CASE WHEN t.status = 'in_progress' THEN 1 ELSE 0 END), 0),
+               COALESCE(SUM(CASE WHEN t.status = 'completed' THEN 1 ELSE 0 END), 0),
+               COUNT(a.id)
+        FROM mechanics m
+        LEFT JOIN service_ticket_mechanics a ON a.mechanic_id = m.id
+        LEFT JOIN service_tickets t ON t.id = a.ticket_id
+        GROUP BY m.id
+    """)
+
+
+def downgrade():
+    op.drop_table('mechanic_ticket_stats')
@@ -0,0 +1,38 @@
+"""Add inventory min_stock_level and low-stock partial index
+
+Revision ID: d7e4a2b91c05
+Revises: c5d81f3e7a12
+Create Date: 2026-10-18 14:20:51.907342
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd7e4a2b91c05'
+down_revision = 'c5d81f3e7a12'
+branch_labels = None
+depends_on = None
+
+
+LOW_STOCK = 'quantity_in_stock <= min_stock_level'
+
+
+def upgrade():
+    with op.batch_alter_table('inventory', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('min_stock_level', sa.Integer(), server_default='0', nullable=False))
+        batch_op.create_index(batch_op.f('ix_inventory_quantity_in_stock'), ['quantity_in_stock'], unique=False)
+
+    # Partial index holding only the low-stock rows; outside the batch so it
+    # isn't rebuilt from reflection without its WHERE clause
+    op.create_index('ix_inventory_low_stock', 'inventory', ['id'], unique=False,
+                    sqlite_where=sa.text(LOW_STOCK), postgresql_where=sa.text(LOW_STOCK))
+
+
+def downgrade():
+    op.drop_index('ix_inventory_low_stock', table_name='inventory')
+
+    with op.batch_alter_table('inventory', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_inventory_quantity_in_stock'))
+        batch_op.drop_column('min_stock_level')
@@ -0,0 +1,62 @@
+"""Add vehicle license_plate and search index
+
+Revision ID: e3b9c6d40f18
+Revises: d7e4a2b91c05
+Create Date: 2026-10-18 15:06:32.118540
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3b9c6d40f18'
+down_revision = 'd7e4a2b91c05'
+branch_labels = None
+depends_on = None
+
+
+COLUMNS = ('make', 'model', 'vin', 'license_plate')
+
+
+def upgrade():
+    with op.batch_alter_table('vehicles', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('license_plate', sa.String(length=20), nullable=True))
+
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        # Kept in step with application/search.py
+        columns = ', '.join(COLUMNS)
+        new = ', '.join(f'new.{name}' for name in COLUMNS)
+        old = ', '.join(f'old.{name}' for name in COLUMNS)
+        op.execute(f"CREATE VIRTUAL TABLE vehicle_search USING fts5("
+                   f"{columns}, content='vehicles', content_rowid='id', tokenize='trigram')")
+        op.execute(f"CREATE TRIGGER vehicle_search_ai AFTER INSERT ON vehicles BEGIN "
+                   f"INSERT INTO vehicle_search(rowid, {columns}) VALUES (new.id, {new}); END")
+        op.execute(f"CREATE TRIGGER vehicle_search_ad AFTER DELETE ON vehicles BEGIN "
+                   f"INSERT INTO vehicle_search(vehicle_search, rowid, {columns}) "
+                   f"VALUES ('delete', old.id, {old}); END")
+        op.execute(f"CREATE TRIGGER vehicle_search_au AFTER UPDATE ON vehicles BEGIN "
+                   f"INSERT INTO vehicle_search(vehicle_search, rowid, {columns}) "
+                   f"VALUES ('delete', old.id, {old}); "
+                   f"INSERT INTO vehicle_search(rowid, {columns}) VALUES (new.id, {new}); END")
+        # Index the existing rows
+        op.execute("INSERT INTO vehicle_search(vehicle_search) VALUES ('rebuild')")
+    elif dialect == 'postgresql':
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for name in COLUMNS:
+            op.execute(f"CREATE INDEX ix_vehicles_{name}_trgm ON vehicles USING gin ({name} gin_trgm_ops)")
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+    if dialect == 'sqlite':
+        for trigger in ('vehicle_search_ai', 'vehicle_search_ad', 'vehicle_search_au'):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+        op.execute("DROP TABLE IF EXISTS vehicle_search")
+    elif dialect == 'postgresql':
+        for name in COLUMNS:
+            op.execute(f"DROP INDEX IF EXISTS ix_vehicles_{name}_trgm")
+
+    with op.batch_alter_table('vehicles', schema=None) as batch_op:
+        batch_op.drop_column('license_plate')
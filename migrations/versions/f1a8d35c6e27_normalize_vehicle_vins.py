@@ -0,0 +1,44 @@
+"""Normalize stored vehicle VINs
+
+Revision ID: f1a8d35c6e27
+Revises: e3b9c6d40f18
+Create Date: 2026-10-18 16:12:40.551903
+
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1a8d35c6e27'
+down_revision = 'e3b9c6d40f18'
+branch_labels = None
+depends_on = None
+
+
+def _duplicate_vins(connection):
+    """Rows whose VINs only differ in case or surrounding whitespace"""
+    return connection.execute(sa.text(
+        "SELECT id, vin FROM vehicles WHERE upper(trim(vin)) IN ("
+        "SELECT upper(trim(vin)) FROM vehicles GROUP BY upper(trim(vin)) HAVING count(*) > 1"
+        ") ORDER BY upper(trim(vin)), id"
+    )).all()
+
+
+def upgrade():
+    # Normalizing these would violate the unique index halfway through the
+    # UPDATE; they have to be merged or corrected by hand first
+    if not context.is_offline_mode():
+        duplicates = _duplicate_vins(op.get_bind())
+        if duplicates:
+            rows = ', '.join(f'{vehicle_id}: {vin!r}' for vehicle_id, vin in duplicates)
+            raise RuntimeError(f'vehicles with VINs that normalize to the same value: {rows}')
+
+    # Lookups normalize to upper case without surrounding whitespace; make
+    # the stored values match so the unique vin index answers them
+    op.execute("UPDATE vehicles SET vin = upper(trim(vin)) WHERE vin != upper(trim(vin))")
+
+
+def downgrade():
+    # The original spelling isn't kept; normalized VINs are valid either way
+    pass
@@ -1,4 +1,6 @@
 from application.models import Inventory
+from contextlib import contextmanager
+from sqlalchemy import event
 import pytest
 import sys
 import os
@@ -29,6 +31,50 @@ def app():
         db.session.remove()
         db.drop_all()
 
+class QueryCounter:
+    """Collects the SQL statements run on ``engine`` while active"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+
+    def _record(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._record)
+        return self
+
+    def __exit__(self, *exc_info):
+        event.remove(self.engine, 'before_cursor_execute', self._record)
+
+    def __len__(self):
+        return len(self.statements)
+
+    def report(self):
+        return '\n'.join(f'{i}. {statement}' for i, statement in enumerate(self.statements, 1))
+
+@pytest.fixture
+def assert_max_queries():
+    """
+    ``with assert_max_queries(3): ...`` fails if the block runs more than 3
+    SQL statements, listing them. Needs an app context. A bound that holds
+    for both a few rows and many catches N+1 regressions.
+
+    unittest.TestCase classes can take it with an autouse fixture method::
+
+        @pytest.fixture(autouse=True)
+        def _fixtures(self, assert_max_queries):
+            self.assert_max_queries = assert_max_queries
+    """
+    @contextmanager
+    def check(limit):
+        with QueryCounter(db.engine) as queries:
+            yield queries
+        assert len(queries) <= limit, \
+            f'{len(queries)} SQL statements, expected at most {limit}:\n{queries.report()}'
+    return check
+
 @staticmethod
 def create_test_inventory():
     """Create test inventory items"""
@@ -0,0 +1,72 @@
+# tests/test_apispec.py
+import gzip
+import json
+import os
+import re
+import tempfile
+import unittest
+from unittest import mock
+
+from application import create_app, swagger
+from application.swagger.spec import build_spec, check_spec, dump_spec
+from config import TestConfig
+
+
+class TestApiSpec(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+
+    def test_artifact_is_in_sync(self):
+        # Fails after editing a view's docstring: run `flask apispec build`
+        self.assertEqual(check_spec(self.app), [])
+
+    def test_every_reference_resolves(self):
+        with open(swagger.SPEC_PATH) as f:
+            spec = json.load(f)
+        refs = set(re.findall(r'#/definitions/(\w+)', json.dumps(spec)))
+        self.assertEqual(refs - set(spec['definitions']), set())
+
+    def test_served_gzipped_with_etag(self):
+        response = self.client.get('/apispec.json', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response.vary)
+        with open(swagger.SPEC_PATH, 'rb') as f:
+            self.assertEqual(json.loads(gzip.decompress(response.data)), json.loads(f.read()))
+
+        etag = response.headers['ETag']
+        response = self.client.get('/apispec.json', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.data, b'')
+
+    def test_identity_encoding_has_its_own_etag(self):
+        plain = self.client.get('/apispec.json')
+        gzipped = self.client.get('/apispec.json', headers={'Accept-Encoding': 'gzip'})
+        self.assertNotIn('Content-Encoding', plain.headers)
+        self.assertEqual(plain.get_json()['swagger'], '2.0')
+        self.assertNotEqual(plain.headers['ETag'], gzipped.headers['ETag'])
+        # Both encodings carry the same compact body
+        self.assertEqual(gzip.decompress(gzipped.data), plain.data)
+        response = self.client.get('/apispec.json', headers={'If-None-Match': gzipped.headers['ETag']})
+        self.assertEqual(response.status_code, 200)
+
+    def test_built_from_views_without_the_artifact(self):
+        with mock.patch.object(swagger, 'SPEC_PATH', os.path.join(tempfile.gettempdir(), 'no-such-apispec.json')):
+            response = self.client.get('/apispec.json')
+        self.assertEqual(response.get_json(), json.loads(dump_spec(build_spec(self.app))))
+
+    def test_check_reports_drift_from_the_reference(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.yalm', delete=False) as reference:
+            reference.write('openapi: 3.0.0\npaths:\n  /inventory/:\n    get: {}\n  /health:\n    get: {}\n')
+        try:
+            problems = check_spec(self.app, reference_path=reference.name)
+        finally:
+            os.unlink(reference.name)
+        self.assertEqual(len(problems), 1)
+        self.assertIn('GET /health', problems[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+# tests/test_cache_tags.py
+import unittest
+
+from sqlalchemy import event
+
+from application import create_app, db
+from application.blueprints.customer import routes as customer_routes
+from application.caching import invalidate_tags, tagged_key
+from application.extensions import limiter
+from application.models import Customer, Mechanic, ServiceTicket, Vehicle
+from auth.tokens import encode_token
+from config import TestConfig
+
+
+class TestTaggedCache(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        customers = [Customer(first_name=f"Cache{i}", last_name="Tag", email=f"c{i}@example.com")
+                     for i in range(2)]
+        db.session.add_all(customers)
+        db.session.commit()
+        self.customer_ids = [c.id for c in customers]
+        self.headers = [{'Authorization': f'Bearer {encode_token(i)}'} for i in self.customer_ids]
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _get(self, url, headers=None):
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            response = self.client.get(url, headers=headers)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+        self.assertEqual(response.status_code, 200)
+        return response.get_json(), len(statements)
+
+    def test_invalidating_a_tag_changes_the_key(self):
+        key = tagged_key('k', ['a', 'b'])
+        self.assertEqual(key, tagged_key('k', ['b', 'a']))
+        invalidate_tags('b')
+        self.assertNotEqual(key, tagged_key('k', ['a', 'b']))
+
+    def test_customer_read_is_cached_until_update_commits(self):
+        cid = self.customer_ids[0]
+        first, queries = self._get(f'/customers/{cid}')
+        self.assertGreater(queries, 0)
+        again, queries = self._get(f'/customers/{cid}')
+        self.assertEqual((again, queries), (first, 0))
+
+        response = self.client.put(f'/customers/{cid}', headers=self.headers[0], json={'first_name': 'Renamed'})
+        self.assertEqual(response.status_code, 200)
+        updated, _ = self._get(f'/customers/{cid}')
+        self.assertEqual(updated['first_name'], 'Renamed')
+
+    def test_write_to_one_customer_keeps_others_cached(self):
+        other = self.customer_ids[1]
+        self._get(f'/customers/{other}')
+        self.client.put(f'/customers/{self.customer_ids[0]}', headers=self.headers[0], json={'phone': '555'})
+        _, queries = self._get(f'/customers/{other}')
+        self.assertEqual(queries, 0)
+
+    def test_my_tickets_cached_per_caller(self):
+        a, b = self.customer_ids
+        vehicle = Vehicle(customer_id=a, make="VW", model="Golf", year=2015, vin="WVWZZZ1KZ6W000001")
+        db.session.add(vehicle)
+        db.session.flush()
+        db.session.add(ServiceTicket(customer_id=a, vehicle_id=vehicle.id, issue_description="Leak"))
+        db.session.commit()
+
+        mine, _ = self._get('/customers/my-tickets', self.headers[0])
+        theirs, _ = self._get('/customers/my-tickets', self.headers[1])
+        self.assertEqual((len(mine), len(theirs)), (1, 0))
+
+        db.session.add(ServiceTicket(customer_id=a, vehicle_id=vehicle.id, issue_description="Knock"))
+        db.session.commit()
+        mine, _ = self._get('/customers/my-tickets', self.headers[0])
+        self.assertEqual(len(mine), 2)
+
+    def test_rollback_does_not_invalidate(self):
+        cid = self.customer_ids[0]
+        self._get(f'/customers/{cid}')
+        db.session.get(Customer, cid).first_name = 'Nope'
+        db.session.flush()
+        db.session.rollback()
+        _, queries = self._get(f'/customers/{cid}')
+        self.assertEqual(queries, 0)
+
+    def test_bulk_customer_delete_invalidates(self):
+        cid = self.customer_ids[0]
+        listing, _ = self._get('/customers/')
+        self.assertEqual(listing['total'], 2)
+
+        response = self.client.delete(f'/customers/{cid}', headers=self.headers[0])
+        self.assertEqual(response.status_code, 204)
+        listing, _ = self._get('/customers/')
+        self.assertEqual(listing['total'], 1)
+
+    def test_mechanics_list_invalidated_by_any_mechanic_write(self):
+        mechanics, _ = self._get('/mechanic/cached')
+        self.assertEqual(mechanics, [])
+        db.session.add(Mechanic(first_name="New", last_name="Hire", email="hire@example.com"))
+        db.session.commit()
+        mechanics, _ = self._get('/mechanic/cached')
+        self.assertEqual(len(mechanics), 1)
+
+
+class RateLimitedConfig(TestConfig):
+    RATELIMIT_ENABLED = True
+
+
+class TestSharedLimiter(unittest.TestCase):
+
+    def setUp(self):
+        # create_app() reconfigures the shared limiter; undo that for the tests that follow
+        self.addCleanup(setattr, limiter, 'enabled', limiter.enabled)
+        self.addCleanup(limiter.reset)
+
+    def test_customer_login_uses_the_shared_limiter(self):
+        self.assertIs(customer_routes.limiter, limiter)
+
+        app = create_app(RateLimitedConfig)
+        with app.app_context():
+            db.create_all()
+            client = app.test_client()
+            statuses = [client.post('/customers/login', json={'email': 'x@example.com', 'password': 'pw'}).status_code
+                        for _ in range(11)]
+            db.drop_all()
+        self.assertEqual(statuses[:10], [401] * 10)
+        self.assertEqual(statuses[10], 429)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,167 @@
+# tests/test_conditional_get.py
+import time
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest import mock
+
+from sqlalchemy import event
+from werkzeug.http import http_date
+
+from application import create_app, db
+from application.models import Customer, Mechanic, Vehicle
+from auth.tokens import encode_mechanic_token, encode_token
+from config import TestConfig
+
+
+class TestConditionalGet(unittest.TestCase):
+
+    def setUp(self):
+        # Tag versions issued a minute ago, so Last-Modified isn't the current second
+        self.clock = mock.patch('application.caching.time').start().time
+        self.clock.return_value = time.time() - 60
+        self.addCleanup(mock.patch.stopall)
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        customers = [Customer(first_name=f"Cond{i}", last_name="Itional", email=f"cond{i}@example.com")
+                     for i in range(3)]
+        mechanic = Mechanic(first_name="Etag", last_name="Mech", email="etag@example.com")
+        db.session.add_all([*customers, mechanic])
+        db.session.flush()
+        db.session.add(Vehicle(customer_id=customers[0].id, make="Audi", model="A4", year=2016,
+                               vin="WAUZZZ8K9GA000001"))
+        db.session.commit()
+        self.customer_id = customers[0].id
+        self.mechanic_id = mechanic.id
+        self.customer_headers = {'Authorization': f'Bearer {encode_token(self.customer_id)}'}
+        self.mechanic_headers = {'Authorization': f'Bearer {encode_mechanic_token(self.mechanic_id)}'}
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _get(self, url, **headers):
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            response = self.client.get(url, headers=headers)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+        return response, statements
+
+    def _touch_customer(self, first_name):
+        customer = db.session.get(Customer, self.customer_id)
+        customer.first_name = first_name
+        customer.updated_at = datetime.now(timezone.utc) + timedelta(seconds=5)
+        db.session.commit()
+
+    def test_single_item_etag_round_trip(self):
+        url = f'/customers/{self.customer_id}'
+        first, _ = self._get(url)
+        self.assertEqual(first.status_code, 200)
+        etag = first.headers['ETag']
+        self.assertTrue(etag.startswith('W/'))
+        self.assertIn('Last-Modified', first.headers)
+
+        response, statements = self._get(url, **{'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.get_data(), b'')
+        self.assertEqual(statements, [])
+        self.assertEqual(response.headers['ETag'], etag)
+
+        self._touch_customer('Changed')
+        response, _ = self._get(url, **{'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['first_name'], 'Changed')
+
+    def test_if_modified_since(self):
+        url = f'/customers/{self.customer_id}'
+        first, _ = self._get(url)
+        response, _ = self._get(url, **{'If-Modified-Since': first.headers['Last-Modified']})
+        self.assertEqual(response.status_code, 304)
+
+        past = http_date(datetime.now(timezone.utc) - timedelta(days=1))
+        response, _ = self._get(url, **{'If-Modified-Since': past})
+        self.assertEqual(response.status_code, 200)
+
+    def test_no_last_modified_within_the_current_second(self):
+        self.clock.return_value = time.time()
+        url = f'/customers/{self.customer_id}'
+        self._touch_customer('Now')
+        first, _ = self._get(url)
+        self.assertNotIn('Last-Modified', first.headers)
+
+        # Another write within the same second would leave the date unchanged
+        response, _ = self._get(url, **{'If-Modified-Since': http_date(datetime.now(timezone.utc))})
+        self.assertEqual(response.status_code, 200)
+
+    def test_collection_changes_on_update_insert_and_delete(self):
+        etag = self._get('/customers/')[0].headers['ETag']
+        self.assertEqual(self._get('/customers/', **{'If-None-Match': etag})[0].status_code, 304)
+
+        db.session.add(Customer(first_name="New", last_name="One", email="new@example.com"))
+        db.session.commit()
+        response, _ = self._get('/customers/', **{'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers['ETag']
+
+        # Deleting a row that isn't the newest leaves max(updated_at) alone
+        db.session.delete(Customer.query.filter_by(email='cond2@example.com').one())
+        db.session.commit()
+        response, _ = self._get('/customers/', **{'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        etag = response.headers['ETag']
+
+        # Same row count and newest updated_at as before
+        db.session.delete(Customer.query.filter_by(email='cond1@example.com').one())
+        db.session.add(Customer(first_name="Old", last_name="Row", email="old@example.com",
+                                updated_at=datetime(2000, 1, 1, tzinfo=timezone.utc)))
+        db.session.commit()
+        self.assertEqual(self._get('/customers/', **{'If-None-Match': etag})[0].status_code, 200)
+
+    def test_query_string_and_caller_are_part_of_the_etag(self):
+        page1 = self._get('/customers/?page=1&per_page=1')[0].headers['ETag']
+        page2 = self._get('/customers/?page=2&per_page=1')[0].headers['ETag']
+        self.assertNotEqual(page1, page2)
+        response, _ = self._get('/customers/?page=2&per_page=1', **{'If-None-Match': page1})
+        self.assertEqual(response.status_code, 200)
+
+    def test_errors_carry_no_validators(self):
+        response, _ = self._get('/customers/9999')
+        self.assertNotEqual(response.status_code, 200)
+        self.assertNotIn('ETag', response.headers)
+
+    def test_mechanic_resources(self):
+        for url, headers in ((f'/mechanic/{self.mechanic_id}', self.customer_headers),
+                             ('/mechanic/', self.customer_headers),
+                             ('/mechanic/profile', self.mechanic_headers)):
+            first, _ = self._get(url, **headers)
+            self.assertEqual(first.status_code, 200, url)
+            response, _ = self._get(url, **headers, **{'If-None-Match': first.headers['ETag']})
+            self.assertEqual(response.status_code, 304, url)
+
+    def test_vehicle_list_filters(self):
+        url = f'/vehicles/vehicles?stream=1&customer_id={self.customer_id}'
+        first, _ = self._get(url, **self.customer_headers)
+        self.assertEqual(first.status_code, 200)
+        response, statements = self._get(url, **self.customer_headers, **{'If-None-Match': first.headers['ETag']})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(statements, [])
+
+    def test_vehicle_etags_cover_the_owner(self):
+        url = f'/vehicles/vehicles/{Vehicle.query.one().id}'
+        etag = self._get(url, **self.customer_headers)[0].headers['ETag']
+        db.session.get(Customer, self.customer_id).email = 'renamed@example.com'
+        db.session.commit()
+        response, _ = self._get(url, **self.customer_headers, **{'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['customer_email'], 'renamed@example.com')
+
+
+if __name__ == '__main__':
+    unittest.main()
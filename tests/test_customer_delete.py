@@ -0,0 +1,104 @@
+# tests/test_customer_delete.py
+import unittest
+
+from sqlalchemy import event
+
+from application import create_app, db
+from application.models import (Customer, Inventory, Mechanic, ServiceTicket, ServiceTicketMechanic,
+                                TicketPart, Vehicle)
+from auth.tokens import encode_token
+from config import TestConfig
+
+
+class TestCustomerCascadeDelete(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        self.part = Inventory(name="Spark Plug", price=4.99, quantity_in_stock=10)
+        self.mechanic = Mechanic(first_name="Mech", last_name="Anic", email="mech@example.com")
+        db.session.add_all([self.part, self.mechanic])
+        db.session.commit()
+
+        self.customer_id = self._create_customer_graph("owner@example.com", vehicles=3, tickets_per_vehicle=4)
+        self.other_id = self._create_customer_graph("other@example.com", vehicles=1, tickets_per_vehicle=2)
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _create_customer_graph(self, email, vehicles, tickets_per_vehicle):
+        customer = Customer(first_name="Fleet", last_name="Owner", email=email)
+        db.session.add(customer)
+        db.session.flush()
+        for v in range(vehicles):
+            vehicle = Vehicle(customer_id=customer.id, make="Ford", model="F-150", year=2020,
+                              vin=f"{email[:5].upper()}{v:012d}")
+            db.session.add(vehicle)
+            db.session.flush()
+            for _ in range(tickets_per_vehicle):
+                ticket = ServiceTicket(customer_id=customer.id, vehicle_id=vehicle.id,
+                                       issue_description="Noise")
+                db.session.add(ticket)
+                db.session.flush()
+                db.session.add(TicketPart(ticket_id=ticket.id, inventory_id=self.part.id, quantity_used=1))
+                db.session.add(ServiceTicketMechanic(ticket_id=ticket.id, mechanic_id=self.mechanic.id))
+        db.session.commit()
+        return customer.id
+
+    def _delete(self, customer_id):
+        token = encode_token(customer_id)
+        return self.client.delete(f'/customers/{customer_id}', headers={'Authorization': f'Bearer {token}'})
+
+    def test_deletes_whole_graph_and_nothing_else(self):
+        response = self._delete(self.customer_id)
+        self.assertEqual(response.status_code, 204)
+
+        self.assertIsNone(db.session.get(Customer, self.customer_id))
+        self.assertEqual(Vehicle.query.filter_by(customer_id=self.customer_id).count(), 0)
+        self.assertEqual(ServiceTicket.query.filter_by(customer_id=self.customer_id).count(), 0)
+
+        # The other customer's graph is untouched
+        self.assertEqual(ServiceTicket.query.count(), 2)
+        self.assertEqual(TicketPart.query.count(), 2)
+        self.assertEqual(ServiceTicketMechanic.query.count(), 2)
+        self.assertIsNotNone(db.session.get(Customer, self.other_id))
+
+    def test_statement_count_does_not_grow_with_tickets(self):
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            self._delete(self.customer_id)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+
+        deletes = [sql for sql in statements if sql.lstrip().upper().startswith('DELETE')]
+        self.assertEqual(len(deletes), 5)
+        # plus the mechanic ticket counter UPDATE and the VINs to evict from the lookup cache
+        self.assertEqual(len(statements), 7)
+
+    def test_invalidates_other_customers_tickets_on_the_deleted_vehicles(self):
+        vehicle = Vehicle.query.filter_by(customer_id=self.customer_id).first()
+        db.session.add(ServiceTicket(customer_id=self.other_id, vehicle_id=vehicle.id,
+                                     issue_description="Borrowed truck"))
+        db.session.commit()
+        headers = {'Authorization': f'Bearer {encode_token(self.other_id)}'}
+        self.assertEqual(len(self.client.get('/customers/my-tickets', headers=headers).get_json()), 3)
+
+        self._delete(self.customer_id)
+        self.assertEqual(len(self.client.get('/customers/my-tickets', headers=headers).get_json()), 2)
+
+    def test_missing_customer_returns_404(self):
+        token = encode_token(9999)
+        response = self.client.delete('/customers/9999', headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+# tests/test_db_routing.py
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from sqlalchemy import select, text
+
+from application import create_app, db
+from application.models import Inventory, Mechanic
+from auth.tokens import encode_mechanic_token, encode_token
+from config import TestConfig
+
+
+class TestReadReplicaRouting(unittest.TestCase):
+    """Primary and replica are two SQLite files holding different rows, so
+    each response shows which database it was read from."""
+
+    sticky_seconds = 60
+    cache_type = 'NullCache'
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+        class ReplicaConfig(TestConfig):
+            SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(self.directory, 'primary.db')
+            SQLALCHEMY_REPLICAS = ['sqlite:///' + os.path.join(self.directory, 'replica.db')]
+            REPLICA_STICKY_SECONDS = self.sticky_seconds
+            CACHE_TYPE = self.cache_type
+
+        self.app = create_app(ReplicaConfig)
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        self.replica = self.app.extensions['db_replica_engines'][0]
+
+        db.create_all()
+        mechanic = Mechanic(first_name="Read", last_name="Write", email="rw@example.com")
+        db.session.add_all([mechanic, Inventory(name="Primary part", price=1.0)])
+        db.session.commit()
+        self.headers = {'Authorization': f'Bearer {encode_mechanic_token(mechanic.id)}'}
+
+        db.metadata.create_all(self.replica)
+        with self.replica.begin() as connection:
+            connection.execute(Inventory.__table__.insert(), [{'name': "Replica part", 'price': 1.0}])
+
+    def tearDown(self):
+        db.session.remove()
+        db.engine.dispose()
+        self.replica.dispose()
+        self.app_context.pop()
+        shutil.rmtree(self.directory)
+
+    def names(self, client=None):
+        response = (client or self.client).get('/inventory/')
+        self.assertEqual(response.status_code, 200)
+        return sorted(item['name'] for item in response.get_json())
+
+    def create_item(self, name):
+        response = self.client.post('/inventory/', headers=self.headers, json={'item_name': name, 'price': 2.0})
+        self.assertEqual(response.status_code, 201)
+
+    def test_reads_go_to_the_replica(self):
+        self.assertEqual(self.names(), ["Replica part"])
+
+    def test_client_reads_its_own_writes(self):
+        self.create_item("New part")
+        self.assertEqual(self.names(), ["New part", "Primary part"])
+
+        # Another client hasn't written, so it still reads from the replica
+        self.assertEqual(self.names(self.app.test_client()), ["Replica part"])
+
+    def test_write_within_a_read_request_moves_it_to_the_primary(self):
+        with self.app.test_request_context('/inventory/'):
+            self.app.preprocess_request()
+            self.assertEqual(db.session.scalars(select(Inventory.name)).all(), ["Replica part"])
+
+            db.session.add(Inventory(name="Flushed part", price=1.0))
+            db.session.flush()
+            self.assertEqual(db.session.scalars(select(Inventory.name).order_by(Inventory.id)).all(),
+                             ["Primary part", "Flushed part"])
+            db.session.rollback()
+
+    def test_locking_and_textual_statements_use_the_primary(self):
+        with self.app.test_request_context('/inventory/'):
+            self.app.preprocess_request()
+            self.assertEqual(db.session.scalars(select(Inventory.name).with_for_update()).all(), ["Primary part"])
+            self.assertEqual(db.session.scalars(text('SELECT name FROM inventory')).all(), ["Primary part"])
+
+
+class TestStickinessExpires(TestReadReplicaRouting):
+    sticky_seconds = 0
+
+    def test_client_reads_its_own_writes(self):
+        self.create_item("New part")
+        self.assertEqual(self.names(), ["Replica part"])
+
+
+class TestCachedReplicaReads(TestReadReplicaRouting):
+    cache_type = 'SimpleCache'
+
+    def test_replica_read_is_not_served_to_the_writer(self):
+        self.create_item("New part")
+        # Cached under the tag version the write just bumped
+        self.assertEqual(self.names(self.app.test_client()), ["Replica part"])
+        self.assertEqual(self.names(), ["New part", "Primary part"])
+
+
+    def test_no_validators_while_the_replica_may_lag(self):
+        headers = {'Authorization': f'Bearer {encode_token(1)}'}
+        # Clients that haven't written, so they read from the replica
+        get = lambda: self.app.test_client().get('/mechanic/', headers=headers)
+        with mock.patch('application.caching.time') as clock:
+            clock.time.return_value = time.time() - 120
+            Mechanic.query.one().first_name = "Earlier"
+            db.session.commit()
+            response = get()
+            self.assertIn('ETag', response.headers)
+
+            clock.time.return_value = time.time()
+            Mechanic.query.one().first_name = "Renamed"
+            db.session.commit()
+            # The replica's body may predate the write the new version stands for
+            response = get()
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('ETag', response.headers)
+            self.assertNotIn('Last-Modified', response.headers)
+
+
+class TestWithoutReplicas(unittest.TestCase):
+
+    def test_nothing_is_registered(self):
+        app = create_app(TestConfig)
+        self.assertNotIn('db_replicas', app.extensions)
+        with app.app_context():
+            db.create_all()
+            self.assertEqual(app.test_client().get('/inventory/').status_code, 200)
+            self.assertNotIn('replica', db.session.info)
+            db.session.remove()
+            db.drop_all()
+
+
+if __name__ == '__main__':
+    unittest.main()
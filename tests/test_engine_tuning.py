@@ -0,0 +1,87 @@
+# tests/test_engine_tuning.py
+import os
+import shutil
+import tempfile
+import unittest
+
+from flask import Flask
+from sqlalchemy import text
+
+from application import create_app, db
+from application.engine_tuning import configure_engines, engine_options
+from config import TestConfig
+
+
+class TestEngineOptions(unittest.TestCase):
+    config = {'DB_POOL_SIZE': 7, 'DB_MAX_OVERFLOW': 3, 'DB_POOL_TIMEOUT': 10, 'DB_POOL_RECYCLE': 600}
+
+    def test_server_databases_get_a_checked_recycled_pool(self):
+        self.assertEqual(engine_options('postgresql://u:p@db/shop', self.config), {
+            'pool_size': 7, 'max_overflow': 3, 'pool_timeout': 10, 'pool_recycle': 600, 'pool_pre_ping': True,
+        })
+        self.assertTrue(engine_options('mysql+pymysql://u:p@db/shop', self.config)['pool_pre_ping'])
+
+    def test_sqlite(self):
+        self.assertEqual(engine_options('sqlite:////tmp/shop.db', self.config), {'pool_size': 7, 'max_overflow': 3})
+        self.assertEqual(engine_options('sqlite:///:memory:', self.config), {})
+        self.assertEqual(engine_options('sqlite://', self.config), {})
+
+    def test_explicit_options_win(self):
+        # A bare app: binds registered on the shared db would outlive this test
+        app = Flask(__name__)
+        app.config.update(
+            SQLALCHEMY_DATABASE_URI='sqlite:////tmp/shop.db',
+            SQLALCHEMY_ENGINE_OPTIONS={'pool_size': 1},
+            SQLALCHEMY_BINDS={'reports': 'sqlite:////tmp/reports.db', 'mem': {'url': 'sqlite://', 'echo': True}},
+        )
+        configure_engines(app)
+        self.assertEqual(app.config['SQLALCHEMY_ENGINE_OPTIONS'], {'pool_size': 1, 'max_overflow': 10})
+        self.assertEqual(app.config['SQLALCHEMY_BINDS'], {
+            'reports': {'url': 'sqlite:////tmp/reports.db', 'pool_size': 5, 'max_overflow': 10},
+            'mem': {'url': 'sqlite://', 'echo': True},
+        })
+
+
+class TestSqlitePragmas(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+        class FileConfig(TestConfig):
+            SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(self.directory, 'shop.db')
+
+        self.app = create_app(FileConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+
+    def tearDown(self):
+        db.session.remove()
+        db.engine.dispose()
+        self.app_context.pop()
+        shutil.rmtree(self.directory)
+
+    def pragma(self, name):
+        return db.session.execute(text(f'PRAGMA {name}')).scalar()
+
+    def test_applied_on_connect(self):
+        self.assertEqual(self.pragma('journal_mode'), 'wal')
+        self.assertEqual(self.pragma('synchronous'), 1)  # NORMAL
+        self.assertEqual(self.pragma('busy_timeout'), 5000)
+        self.assertEqual(self.pragma('mmap_size'), 268435456)
+        self.assertEqual(self.pragma('cache_size'), -65536)
+
+    def test_every_pooled_connection_is_tuned(self):
+        with db.engine.connect() as first, db.engine.connect() as second:
+            for connection in (first, second):
+                self.assertEqual(connection.execute(text('PRAGMA busy_timeout')).scalar(), 5000)
+
+    def test_in_memory_database_skips_wal(self):
+        app = create_app(TestConfig)
+        with app.app_context():
+            self.assertEqual(db.session.execute(text('PRAGMA journal_mode')).scalar(), 'memory')
+            self.assertEqual(db.session.execute(text('PRAGMA busy_timeout')).scalar(), 5000)
+            db.session.remove()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+# tests/test_hash_pool.py
+import os
+import unittest
+from concurrent.futures.process import BrokenProcessPool
+
+from application import create_app, db
+from application.models import Customer, Mechanic
+from auth.passwords import HashPool, HashPoolSaturated, Pbkdf2Hasher, get_hash_pool, hash_pool_stats
+from auth.tokens import encode_mechanic_token, encode_token
+from config import TestConfig
+
+
+class PooledHashConfig(TestConfig):
+    PASSWORD_HASH_WORK_FACTOR = 1000
+    PASSWORD_HASH_POOL_WORKERS = 1
+    PASSWORD_HASH_POOL_MAX_QUEUE = 0
+
+
+class TestHashPool(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(PooledHashConfig)
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        customer = Customer(first_name="Pool", last_name="Test", email="pool@example.com")
+        customer.set_password("password123")
+        db.session.add(customer)
+        db.session.commit()
+
+    def tearDown(self):
+        pool = self.app.extensions.pop('password_hash_pool', None)
+        if pool is not None:
+            pool.shutdown()
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _login(self):
+        return self.client.post('/customers/login', json={
+            'email': 'pool@example.com',
+            'password': 'password123'
+        })
+
+    def test_login_hashes_in_pool(self):
+        response = self._login()
+        self.assertEqual(response.status_code, 200)
+
+        stats = hash_pool_stats()
+        # One hash for set_password in setUp, one verify for the login
+        self.assertEqual(stats['completed'], 2)
+        self.assertEqual(stats['rejected'], 0)
+        self.assertGreater(stats['hash_time_avg_ms'], 0)
+        self.assertIn('queue_wait_avg_ms', stats)
+
+    def test_saturated_pool_fails_fast_with_503(self):
+        pool = get_hash_pool()
+        # Occupy the only slot as if another login were mid-hash
+        pool._slots.acquire()
+        try:
+            response = self._login()
+        finally:
+            pool._slots.release()
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.headers['Retry-After'], '1')
+        self.assertEqual(hash_pool_stats()['rejected'], 1)
+
+    def test_saturated_pool_during_a_password_change(self):
+        mechanic = Mechanic(first_name="Pool", last_name="Mech", email="poolmech@example.com")
+        db.session.add(mechanic)
+        db.session.commit()
+        requests = [
+            ('/mechanic/profile', encode_mechanic_token(mechanic.id)),
+            (f'/mechanic/{mechanic.id}', encode_token(mechanic.id)),
+        ]
+
+        pool = get_hash_pool()
+        pool._slots.acquire()
+        try:
+            responses = [self.client.put(url, headers={'Authorization': f'Bearer {token}'},
+                                         json={'password': 'new-password'})
+                         for url, token in requests]
+        finally:
+            pool._slots.release()
+
+        for response in responses:
+            self.assertEqual(response.status_code, 503)
+            self.assertEqual(response.headers['Retry-After'], '1')
+
+    def test_pool_disabled_by_default(self):
+        app = create_app(TestConfig)
+        with app.app_context():
+            self.assertIsNone(get_hash_pool())
+            self.assertIsNone(hash_pool_stats())
+
+
+class TestHashPoolDirect(unittest.TestCase):
+
+    def test_run_returns_worker_result(self):
+        pool = HashPool(workers=1, max_queue=1)
+        try:
+            hasher = Pbkdf2Hasher(1000)
+            pw_hash = pool.run(hasher.hash, 'secret')
+            self.assertTrue(pool.run(hasher.verify, pw_hash, 'secret'))
+        finally:
+            pool.shutdown()
+
+    def test_rejects_beyond_capacity(self):
+        pool = HashPool(workers=1, max_queue=0)
+        try:
+            pool._slots.acquire()
+            with self.assertRaises(HashPoolSaturated):
+                pool.run(Pbkdf2Hasher(1000).hash, 'secret')
+        finally:
+            pool._slots.release()
+            pool.shutdown()
+
+    def test_recovers_when_a_worker_dies(self):
+        pool = HashPool(workers=1, max_queue=1)
+        try:
+            # Kills the worker both times: the first attempt and its retry
+            with self.assertRaises(BrokenProcessPool):
+                pool.run(os._exit, 1)
+            self.assertEqual(pool.stats()['restarts'], 2)
+
+            hasher = Pbkdf2Hasher(1000)
+            self.assertTrue(pool.run(hasher.verify, hasher.hash('secret'), 'secret'))
+        finally:
+            pool.shutdown()
+
+    def test_workers_are_not_forked_from_the_server(self):
+        pool = HashPool(workers=1, max_queue=0)
+        try:
+            self.assertIn(pool._executor._mp_context.get_start_method(), ('forkserver', 'spawn'))
+        finally:
+            pool.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
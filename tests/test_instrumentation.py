@@ -0,0 +1,105 @@
+# tests/test_instrumentation.py
+import json
+import logging
+import unittest
+
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from application import create_app, db
+from application.models import Inventory
+from config import TestConfig
+
+
+class InstrumentedConfig(TestConfig):
+    SQL_STATS_HEADERS = True
+
+
+class InstrumentationTestCase(unittest.TestCase):
+    config = TestConfig
+
+    def setUp(self):
+        self.app = create_app(self.config)
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        db.session.add_all([Inventory(name=f"Part {i}", price=1.0, quantity_in_stock=i) for i in range(3)])
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+
+class TestDebugHeaders(InstrumentationTestCase):
+    config = InstrumentedConfig
+
+    def test_headers_report_statement_count_and_time(self):
+        response = self.client.get('/inventory/low-stock?threshold=1')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers['X-SQL-Queries'], '1')
+        self.assertGreater(float(response.headers['X-SQL-Time-Ms']), 0)
+        self.assertEqual(response.headers['X-SQL-Slow'], '0')
+
+        # Served from the cache: no SQL at all
+        response = self.client.get('/inventory/low-stock?threshold=1')
+        self.assertEqual(response.headers['X-SQL-Queries'], '0')
+
+    def test_slow_statements_are_logged(self):
+        self.app.config['SQL_SLOW_QUERY_MS'] = 0
+        with self.assertLogs('application.sql', 'WARNING') as logs:
+            response = self.client.get('/inventory/low-stock?threshold=2')
+        self.assertEqual(response.headers['X-SQL-Slow'], '1')
+        self.assertIn('slow query', logs.output[0])
+        self.assertIn('FROM inventory', logs.output[0])
+
+    def test_failed_statements_do_not_skew_timings(self):
+        with self.assertRaises(OperationalError):
+            db.session.execute(text('SELECT * FROM no_such_table'))
+        db.session.rollback()
+        self.assertEqual(db.session.connection().info.get('instrumentation_started'), [])
+
+        response = self.client.get('/inventory/low-stock?threshold=0')
+        self.assertEqual(response.headers['X-SQL-Queries'], '1')
+
+
+class TestRequestLogLine(InstrumentationTestCase):
+
+    def test_one_json_line_per_request(self):
+        with self.assertLogs('application.sql', 'INFO') as logs:
+            response = self.client.get('/inventory/low-stock?threshold=1')
+        self.assertNotIn('X-SQL-Queries', response.headers)
+
+        line = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(line['event'], 'request_sql')
+        self.assertEqual(line['path'], '/inventory/low-stock')
+        self.assertEqual(line['status'], 200)
+        self.assertEqual(line['queries'], 1)
+        self.assertEqual(line['slow'], [])
+
+    def test_lines_reach_the_app_log_handlers(self):
+        # assertLogs lowers the logger's level itself; a plain handler doesn't
+        records = []
+        handler = logging.Handler()
+        handler.emit = records.append
+        self.app.logger.addHandler(handler)
+        try:
+            self.client.get('/inventory/low-stock?threshold=1')
+        finally:
+            self.app.logger.removeHandler(handler)
+        self.assertEqual([json.loads(record.getMessage())['event'] for record in records
+                          if record.name == 'application.sql'], ['request_sql'])
+
+    def test_slow_statements_are_logged(self):
+        self.app.config['SQL_SLOW_QUERY_MS'] = 0
+        with self.assertLogs('application.sql', 'INFO') as logs:
+            self.client.get('/inventory/low-stock?threshold=2')
+        line = json.loads(logs.records[-1].getMessage())
+        self.assertEqual(len(line['slow']), 1)
+        self.assertIn('FROM inventory', line['slow'][0]['statement'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+# tests/test_inventory_batch.py
+import unittest
+
+from sqlalchemy import event
+
+from application import create_app, db
+from application.models import Inventory, Mechanic
+from auth.tokens import encode_mechanic_token
+from config import TestConfig
+
+
+class TestInventoryBatch(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        mechanic = Mechanic(first_name="Bulk", last_name="Loader", email="bulk@example.com")
+        db.session.add(mechanic)
+        db.session.commit()
+        self.headers = {'Authorization': f'Bearer {encode_mechanic_token(mechanic.id)}'}
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _send(self, method, payload):
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            response = self.client.open('/inventory/batch', method=method, headers=self.headers, json=payload)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+        return response, statements
+
+    def test_create_batch_in_one_insert(self):
+        payload = [{'item_name': f'Bolt {i}', 'price': 0.5, 'quantity': i, 'category': 'Fasteners'}
+                   for i in range(250)]
+        response, statements = self._send('POST', payload)
+        self.assertEqual(response.status_code, 201)
+        data = response.get_json()
+        self.assertEqual((data['succeeded'], data['failed']), (250, 0))
+
+        inserts = [sql for sql in statements if sql.lstrip().upper().startswith('INSERT')]
+        self.assertEqual(len(inserts), 1)
+
+        ids = [result['id'] for result in data['results']]
+        self.assertEqual(db.session.get(Inventory, ids[7]).name, 'Bolt 7')
+        self.assertEqual(db.session.get(Inventory, ids[7]).quantity_in_stock, 7)
+        self.assertIsNotNone(db.session.get(Inventory, ids[0]).created_at)
+
+    def test_create_batch_reports_invalid_rows(self):
+        response, _ = self._send('POST', [
+            {'item_name': 'Good', 'price': 1.0},
+            {'price': 2.0},
+            {'item_name': 'Negative', 'quantity': -1},
+            {'item_name': 'Also good'},
+        ])
+        self.assertEqual(response.status_code, 207)
+        results = response.get_json()['results']
+        self.assertEqual([r['status'] for r in results], ['created', 'invalid', 'invalid', 'created'])
+        self.assertIn('item_name', results[1]['errors'])
+        self.assertEqual(Inventory.query.count(), 2)
+
+        response, _ = self._send('POST', [{'price': 2.0}])
+        self.assertEqual(response.status_code, 422)
+
+    def test_rejects_non_array_and_oversized_bodies(self):
+        self.assertEqual(self._send('POST', {'item_name': 'x'})[0].status_code, 400)
+        self.assertEqual(self._send('POST', [])[0].status_code, 400)
+        self.assertEqual(self._send('POST', [{'item_name': 'x'}] * 1001)[0].status_code, 413)
+
+    def test_patch_batch(self):
+        created = self._send('POST', [{'item_name': f'Fuse {i}', 'price': 1.0, 'quantity': 1}
+                                      for i in range(3)])[0].get_json()['results']
+        ids = [r['id'] for r in created]
+        before = db.session.get(Inventory, ids[0]).updated_at
+        db.session.expire_all()
+
+        response, statements = self._send('PATCH', [
+            {'id': ids[0], 'quantity': 9},
+            {'id': ids[1], 'quantity': 8},
+            {'id': ids[2], 'item_name': 'Renamed', 'price': 3.0},
+            {'id': 99999, 'quantity': 1},
+            {'quantity': 1},
+            {'id': ids[0], 'quantity': -5},
+        ])
+        self.assertEqual(response.status_code, 207)
+        results = response.get_json()['results']
+        self.assertEqual([r['status'] for r in results],
+                         ['updated', 'updated', 'updated', 'not_found', 'invalid', 'invalid'])
+        self.assertEqual(len([s for s in statements if s.lstrip().upper().startswith('UPDATE')]), 2)
+
+        db.session.expire_all()
+        first = db.session.get(Inventory, ids[0])
+        self.assertEqual(first.quantity_in_stock, 9)
+        self.assertGreater(first.updated_at, before)
+        self.assertEqual(db.session.get(Inventory, ids[2]).name, 'Renamed')
+
+    def test_numbers_sent_as_strings_are_converted(self):
+        response, _ = self._send('POST', [{'item_name': 'Fuse', 'price': '1.25', 'quantity': '7',
+                                           'min_stock_level': '2'}])
+        self.assertEqual(response.status_code, 201)
+        item = db.session.get(Inventory, response.get_json()['results'][0]['id'])
+        self.assertEqual((item.price, item.quantity_in_stock, item.min_stock_level), (1.25, 7, 2))
+
+        response, _ = self._send('PATCH', [{'id': item.id, 'quantity': '1'}])
+        self.assertEqual(response.status_code, 200)
+        db.session.expire_all()
+        self.assertEqual(db.session.get(Inventory, item.id).quantity_in_stock, 1)
+
+    def test_batch_writes_invalidate_cached_reads(self):
+        self.assertEqual(self.client.get('/inventory/').get_json(), [])
+        created = self._send('POST', [{'item_name': 'Cable', 'category': 'Electrical'}])[0].get_json()
+        self.assertEqual(len(self.client.get('/inventory/').get_json()), 1)
+
+        item_id = created['results'][0]['id']
+        self.assertEqual(len(self.client.get('/inventory/category/Electrical').get_json()), 1)
+        self._send('PATCH', [{'id': item_id, 'category': 'Wiring'}])
+        self.assertEqual(self.client.get('/inventory/category/Electrical').get_json(), [])
+        self.assertEqual(self.client.get(f'/inventory/{item_id}').get_json()['category'], 'Wiring')
+
+    def test_requires_mechanic_token(self):
+        response = self.client.post('/inventory/batch', json=[{'item_name': 'x'}])
+        self.assertEqual(response.status_code, 401)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+# tests/test_inventory_cache.py
+import unittest
+
+from sqlalchemy import event
+
+from application import create_app, db
+from application.models import Inventory, Mechanic
+from auth.tokens import encode_mechanic_token
+from config import TestConfig
+
+
+class TestInventoryCache(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        mechanic = Mechanic(first_name="Stock", last_name="Keeper", email="stock@example.com")
+        self.oil = Inventory(name="Engine Oil", category="Lubricants", price=29.99, quantity_in_stock=50)
+        self.pads = Inventory(name="Brake Pads", category="Brakes", price=89.99, quantity_in_stock=25)
+        db.session.add_all([mechanic, self.oil, self.pads])
+        db.session.commit()
+        self.oil_id, self.pads_id = self.oil.id, self.pads.id
+        self.headers = {'Authorization': f'Bearer {encode_mechanic_token(mechanic.id)}'}
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _get(self, url, **headers):
+        db.session.expire_all()
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            response = self.client.get(url, headers=headers)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+        return response, len(statements)
+
+    def test_reads_are_served_from_cache(self):
+        for url in ('/inventory/', f'/inventory/{self.oil_id}', '/inventory/category/Lubricants'):
+            first, queries = self._get(url)
+            self.assertEqual(first.status_code, 200)
+            self.assertGreater(queries, 0)
+            second, queries = self._get(url)
+            self.assertEqual(queries, 0, url)
+            self.assertEqual(second.get_json(), first.get_json())
+
+    def test_if_none_match_returns_304(self):
+        first, _ = self._get('/inventory/')
+        etag = first.headers['ETag']
+        response, queries = self._get('/inventory/', **{'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.get_data(), b'')
+        self.assertEqual(queries, 0)
+
+        response, _ = self._get('/inventory/', **{'If-None-Match': '"stale"'})
+        self.assertEqual(response.status_code, 200)
+
+    def test_update_invalidates_item_list_and_both_categories(self):
+        etag = self._get('/inventory/')[0].headers['ETag']
+        self._get(f'/inventory/{self.oil_id}')
+        self._get(f'/inventory/{self.pads_id}')
+        self._get('/inventory/category/Lubricants')
+        self._get('/inventory/category/Brakes')
+
+        response = self.client.put(f'/inventory/{self.oil_id}', headers=self.headers,
+                                   json={'category': 'Brakes', 'quantity': 40})
+        self.assertEqual(response.status_code, 200)
+
+        response, _ = self._get('/inventory/', **{'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        item, _ = self._get(f'/inventory/{self.oil_id}')
+        self.assertEqual(item.get_json()['quantity_in_stock'], 40)
+        self.assertEqual(self._get('/inventory/category/Lubricants')[0].get_json(), [])
+        self.assertEqual(len(self._get('/inventory/category/Brakes')[0].get_json()), 2)
+
+        # Untouched item stays cached
+        self.assertEqual(self._get(f'/inventory/{self.pads_id}')[1], 0)
+
+    def test_create_and_delete_invalidate(self):
+        self._get('/inventory/')
+        self._get('/inventory/category/Filters')
+        response = self.client.post('/inventory/', headers=self.headers,
+                                    json={'item_name': 'Air Filter', 'category': 'Filters',
+                                          'price': 24.99, 'quantity': 10})
+        self.assertEqual(response.status_code, 201)
+        new_id = response.get_json()['id']
+        self.assertEqual(len(self._get('/inventory/')[0].get_json()), 3)
+        self.assertEqual(len(self._get('/inventory/category/Filters')[0].get_json()), 1)
+
+        response = self.client.delete(f'/inventory/{new_id}', headers=self.headers)
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(len(self._get('/inventory/')[0].get_json()), 2)
+        self.assertEqual(self._get('/inventory/category/Filters')[0].get_json(), [])
+
+    def test_streamed_responses_are_not_cached(self):
+        response, _ = self._get('/inventory/?stream=1')
+        self.assertTrue(response.is_streamed)
+        self.assertNotIn('ETag', response.headers)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+# tests/test_json_provider.py
+import json
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+from application import create_app, db
+from application import json_provider
+from application.models import Inventory
+from application.serialization import serialize_query
+from config import TestConfig
+
+
+class TestFastJSONProvider(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        for i in range(3):
+            db.session.add(Inventory(name=f"Part {i}", category="Filters", price=2.5, quantity_in_stock=i))
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_column_serializer_matches_to_dict(self):
+        expected = [item.to_dict() for item in Inventory.query.order_by(Inventory.id)]
+        rows = serialize_query(Inventory.query.order_by(Inventory.id), Inventory)
+        self.assertEqual(json.loads(self.app.json.dumps(rows)), expected)
+
+    def test_inventory_list_response(self):
+        response = self.client.get('/inventory/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'application/json')
+        expected = [item.to_dict() for item in Inventory.query.order_by(Inventory.id)]
+        self.assertEqual(response.get_json(), expected)
+
+    def test_stdlib_fallback_produces_same_document(self):
+        value = {'when': datetime(2025, 1, 2, 3, 4, 5, 6), 'n': 1}
+        fast = self.app.json.dumps(value)
+        with patch.object(json_provider, 'orjson', None):
+            slow = self.app.json.dumps(value)
+        self.assertEqual(json.loads(fast), json.loads(slow))
+        self.assertEqual(json.loads(fast)['when'], '2025-01-02T03:04:05.000006')
+
+    def test_values_orjson_cannot_encode_fall_back(self):
+        self.assertEqual(json.loads(self.app.json.dumps({'big': 2 ** 70})), {'big': 2 ** 70})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,178 @@
+# tests/test_low_stock.py
+import unittest
+
+from sqlalchemy import delete
+
+from application import create_app, db
+from application.low_stock import low_stock_changed
+from application.models import Inventory, Mechanic
+from application.stock import reserve_stock
+from auth.tokens import encode_mechanic_token
+from config import TestConfig
+
+
+class TestLowStock(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        mechanic = Mechanic(first_name="Stock", last_name="Keeper", email="stock@example.com")
+        self.pads = Inventory(name="Brake Pads", category="Brakes", price=39.99,
+                              quantity_in_stock=6, min_stock_level=5)
+        self.wipers = Inventory(name="Wiper Blade", category="Wipers", price=12.99,
+                                quantity_in_stock=2, min_stock_level=3)
+        self.bulbs = Inventory(name="Bulb", category="Lighting", price=3.99, quantity_in_stock=0)
+        db.session.add_all([mechanic, self.pads, self.wipers, self.bulbs])
+        db.session.commit()
+
+        self.pads_id, self.wipers_id, self.bulbs_id = self.pads.id, self.wipers.id, self.bulbs.id
+        self.headers = {'Authorization': f'Bearer {encode_mechanic_token(mechanic.id)}'}
+
+        self.events = []
+        low_stock_changed.connect(self._record, weak=False)
+
+    def tearDown(self):
+        low_stock_changed.disconnect(self._record)
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _record(self, app, **kwargs):
+        self.events.append(kwargs)
+
+    def low_stock_ids(self, query=''):
+        response = self.client.get(f'/inventory/low-stock{query}')
+        self.assertEqual(response.status_code, 200)
+        return sorted(item['id'] for item in response.get_json())
+
+    def test_endpoint_uses_each_items_min_stock_level(self):
+        self.assertEqual(self.low_stock_ids(), [self.wipers_id, self.bulbs_id])
+        self.assertEqual(self.low_stock_ids('?threshold=6'), [self.pads_id, self.wipers_id, self.bulbs_id])
+        self.assertEqual(self.low_stock_ids('?threshold=0'), [self.bulbs_id])
+
+    def test_endpoint_reflects_writes(self):
+        self.assertEqual(self.low_stock_ids(), [self.wipers_id, self.bulbs_id])
+        self.pads.quantity_in_stock = 5
+        db.session.commit()
+        self.assertEqual(self.low_stock_ids(), [self.pads_id, self.wipers_id, self.bulbs_id])
+
+    def test_orm_update_crossing_the_threshold_sends_signal(self):
+        self.pads.quantity_in_stock = 4
+        db.session.commit()
+        self.assertEqual(self.events, [{'item_id': self.pads_id, 'low': True,
+                                        'quantity_in_stock': 4, 'min_stock_level': 5}])
+
+        self.events.clear()
+        self.pads.min_stock_level = 2
+        db.session.commit()
+        self.assertEqual(self.events, [{'item_id': self.pads_id, 'low': False,
+                                        'quantity_in_stock': 4, 'min_stock_level': 2}])
+
+    def test_no_signal_without_a_membership_change(self):
+        self.pads.quantity_in_stock = 20
+        self.wipers.quantity_in_stock = 1
+        db.session.commit()
+        self.assertEqual(self.events, [])
+
+        # Dips below and back within one transaction
+        self.pads.quantity_in_stock = 1
+        db.session.flush()
+        self.pads.quantity_in_stock = 20
+        db.session.commit()
+        self.assertEqual(self.events, [])
+
+    def test_no_signal_on_rollback(self):
+        self.pads.quantity_in_stock = 1
+        db.session.flush()
+        db.session.rollback()
+        db.session.commit()
+        self.assertEqual(self.events, [])
+
+    def test_new_low_stock_item_sends_signal(self):
+        db.session.add(Inventory(name="Fuse", price=0.5, quantity_in_stock=1, min_stock_level=10))
+        db.session.add(Inventory(name="Relay", price=5.0, quantity_in_stock=10, min_stock_level=1))
+        db.session.commit()
+        self.assertEqual([event['low'] for event in self.events], [True])
+
+    def test_reserve_stock_sends_signal(self):
+        reserve_stock({self.pads_id: 2, self.wipers_id: 1})
+        db.session.commit()
+        self.assertEqual(self.events, [{'item_id': self.pads_id, 'low': True,
+                                        'quantity_in_stock': 4, 'min_stock_level': 5}])
+
+    def test_batch_endpoints_send_signals(self):
+        response = self.client.patch('/inventory/batch', headers=self.headers, json=[
+            {'id': self.pads_id, 'quantity': 1},
+            {'id': self.wipers_id, 'min_stock_level': 0},
+        ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual({(event['item_id'], event['low']) for event in self.events},
+                         {(self.pads_id, True), (self.wipers_id, False)})
+
+        self.events.clear()
+        response = self.client.post('/inventory/batch', headers=self.headers, json=[
+            {'item_name': 'Fuse', 'price': 0.5, 'quantity': 1, 'min_stock_level': 10},
+            {'item_name': 'Relay', 'price': 5.0, 'quantity': 10},
+        ])
+        self.assertEqual(response.status_code, 201)
+        fuse_id = response.get_json()['results'][0]['id']
+        self.assertEqual([(event['item_id'], event['low']) for event in self.events], [(fuse_id, True)])
+
+    def test_deleting_a_low_stock_item_sends_signal(self):
+        response = self.client.delete(f'/inventory/{self.wipers_id}', headers=self.headers)
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.events, [{'item_id': self.wipers_id, 'low': False,
+                                        'quantity_in_stock': None, 'min_stock_level': None}])
+
+        self.events.clear()
+        db.session.delete(self.pads)
+        db.session.commit()
+        self.assertEqual(self.events, [])
+
+    def test_bulk_delete_sends_signals(self):
+        db.session.execute(delete(Inventory).where(Inventory.category != 'Wipers')
+                           .execution_options(synchronize_session=False))
+        db.session.commit()
+        self.assertEqual(self.events, [{'item_id': self.bulbs_id, 'low': False,
+                                        'quantity_in_stock': None, 'min_stock_level': None}])
+
+    def test_create_and_update_accept_min_stock_level(self):
+        response = self.client.post('/inventory/', headers=self.headers, json={
+            'item_name': 'Fuse', 'price': 0.5, 'quantity': 3, 'min_stock_level': 4
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.get_json()['min_stock_level'], 4)
+
+        response = self.client.post('/inventory/', headers=self.headers, json={
+            'item_name': 'Fuse', 'price': 0.5, 'min_stock_level': -1
+        })
+        self.assertEqual(response.status_code, 400)
+
+    def test_numbers_sent_as_strings(self):
+        response = self.client.post('/inventory/', headers=self.headers, json={
+            'item_name': 'Fuse', 'price': '0.5', 'quantity': '7', 'min_stock_level': '10'
+        })
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.events, [{'item_id': response.get_json()['id'], 'low': True,
+                                        'quantity_in_stock': 7, 'min_stock_level': 10}])
+
+    def test_failing_receiver_does_not_fail_the_write(self):
+        def broken(app, **kwargs):
+            raise RuntimeError('reorder service down')
+        low_stock_changed.connect(broken, weak=False)
+        try:
+            with self.assertLogs(self.app.logger, 'ERROR'):
+                self.pads.quantity_in_stock = 1
+                db.session.commit()
+        finally:
+            low_stock_changed.disconnect(broken)
+        db.session.expire_all()
+        self.assertEqual(db.session.get(Inventory, self.pads_id).quantity_in_stock, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+# tests/test_mechanic_stats.py
+import unittest
+
+from application import create_app, db
+from application.models import (Customer, Mechanic, MechanicTicketStats, ServiceTicket, ServiceTicketMechanic,
+                                Vehicle)
+from application.ticket_stats import rebuild_mechanic_stats
+from auth.tokens import encode_mechanic_token, encode_token
+from config import TestConfig
+
+
+class TestMechanicTicketStats(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        customer = Customer(first_name="Stat", last_name="S", email="stats@example.com")
+        self.mechanics = [Mechanic(first_name=f"Mech{i}", last_name="Anic", email=f"s{i}@example.com")
+                          for i in range(2)]
+        db.session.add_all([customer, *self.mechanics])
+        db.session.flush()
+        vehicle = Vehicle(customer_id=customer.id, make="Kia", model="Rio", year=2017, vin="KNADM4A39H6000001")
+        db.session.add(vehicle)
+        db.session.commit()
+        self.customer_id = customer.id
+        self.vehicle_id = vehicle.id
+        self.mechanic_ids = [m.id for m in self.mechanics]
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _ticket(self, *mechanic_ids, status='open'):
+        ticket = ServiceTicket(customer_id=self.customer_id, vehicle_id=self.vehicle_id,
+                               issue_description="Rattle", status=status)
+        ticket.mechanic_assignments = [ServiceTicketMechanic(mechanic_id=m) for m in mechanic_ids]
+        db.session.add(ticket)
+        db.session.commit()
+        return ticket
+
+    def counts(self, mechanic_id):
+        db.session.expire_all()
+        stats = db.session.get(MechanicTicketStats, mechanic_id)
+        return stats.to_dict() if stats else None
+
+    def assertMatchesRebuild(self):
+        maintained = {m: self.counts(m) for m in self.mechanic_ids}
+        rebuild_mechanic_stats()
+        db.session.commit()
+        self.assertEqual(maintained, {m: self.counts(m) for m in self.mechanic_ids})
+
+    def test_assignment_and_status_changes_update_counters(self):
+        a, b = self.mechanic_ids
+        ticket = self._ticket(a, b)
+        self._ticket(a, status='completed')
+        self.assertEqual(self.counts(a), {'open': 1, 'in_progress': 0, 'completed': 1, 'total': 2})
+
+        ticket.status = 'in_progress'
+        db.session.commit()
+        self.assertEqual(self.counts(b), {'open': 0, 'in_progress': 1, 'completed': 0, 'total': 1})
+
+        ticket.status = 'cancelled'
+        db.session.commit()
+        self.assertEqual(self.counts(b), {'open': 0, 'in_progress': 0, 'completed': 0, 'total': 1})
+        self.assertMatchesRebuild()
+
+    def test_unassign_and_delete_ticket(self):
+        a, b = self.mechanic_ids
+        ticket = self._ticket(a, b, status='in_progress')
+        ticket.mechanic_assignments = [m for m in ticket.mechanic_assignments if m.mechanic_id == a]
+        db.session.commit()
+        self.assertEqual(self.counts(b)['total'], 0)
+
+        db.session.delete(ticket)
+        db.session.commit()
+        self.assertEqual(self.counts(a), {'open': 0, 'in_progress': 0, 'completed': 0, 'total': 0})
+        self.assertMatchesRebuild()
+
+    def test_status_change_and_new_assignment_in_one_flush(self):
+        a, b = self.mechanic_ids
+        ticket = self._ticket(a)
+        ticket.status = 'completed'
+        ticket.mechanic_assignments.append(ServiceTicketMechanic(mechanic_id=b))
+        db.session.commit()
+        self.assertEqual(self.counts(a)['completed'], 1)
+        self.assertEqual(self.counts(b), {'open': 0, 'in_progress': 0, 'completed': 1, 'total': 1})
+        self.assertMatchesRebuild()
+
+    def test_rollback_discards_counter_changes(self):
+        a, _ = self.mechanic_ids
+        self._ticket(a)
+        ticket = ServiceTicket(customer_id=self.customer_id, vehicle_id=self.vehicle_id,
+                               issue_description="Squeak")
+        ticket.mechanic_assignments = [ServiceTicketMechanic(mechanic_id=a)]
+        db.session.add(ticket)
+        db.session.flush()
+        db.session.rollback()
+        self.assertEqual(self.counts(a)['total'], 1)
+
+    def test_customer_bulk_delete_subtracts_tickets(self):
+        a, b = self.mechanic_ids
+        self._ticket(a, b)
+        self._ticket(a, status='completed')
+        token = encode_token(self.customer_id)
+        response = self.client.delete(f'/customers/{self.customer_id}',
+                                      headers={'Authorization': f'Bearer {token}'})
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(self.counts(a), {'open': 0, 'in_progress': 0, 'completed': 0, 'total': 0})
+        self.assertMatchesRebuild()
+
+    def test_stats_endpoint_reads_counters(self):
+        a, _ = self.mechanic_ids
+        self._ticket(a)
+        self._ticket(a, status='in_progress')
+        response = self.client.get('/mechanic/stats')
+        self.assertEqual(response.status_code, 200)
+        by_id = {row['mechanic']['id']: row for row in response.get_json()}
+        self.assertEqual(by_id[a]['ticket_count'], 2)
+        self.assertEqual(by_id[a]['in_progress'], 1)
+        self.assertEqual(by_id[self.mechanic_ids[1]]['ticket_count'], 0)
+
+    def test_ticket_update_endpoint_moves_counts(self):
+        a, _ = self.mechanic_ids
+        ticket_id = self._ticket(a).id
+        token = encode_mechanic_token(a)
+        response = self.client.put(f'/service-tickets/api/service-tickets/{ticket_id}',
+                                   headers={'Authorization': f'Bearer {token}'}, json={'status': 'completed'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.counts(a), {'open': 0, 'in_progress': 0, 'completed': 1, 'total': 1})
+
+    def test_rebuild_command(self):
+        a, _ = self.mechanic_ids
+        self._ticket(a)
+        db.session.query(MechanicTicketStats).delete()
+        db.session.commit()
+
+        result = self.app.test_cli_runner().invoke(args=['rebuild-mechanic-stats'])
+        self.assertEqual(result.exit_code, 0, result.output)
+        self.assertEqual(self.counts(a)['open'], 1)
+        self.assertEqual(self.counts(self.mechanic_ids[1])['total'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,135 @@
+# tests/test_metrics.py
+import re
+import unittest
+
+from application import create_app, db
+from application.extensions import limiter
+from application.metrics import Histogram, registry, request_db_queries, request_duration, requests_in_flight, \
+    requests_total
+from application.models import Inventory
+from config import TestConfig
+
+SAMPLE = re.compile(r'^[a-zA-Z_:][a-zA-Z0-9_:]*(\{([a-zA-Z_][a-zA-Z0-9_]*="([^"\\]|\\.)*",?)*\})? \S+$')
+
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        registry.clear()
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        db.session.add(Inventory(name="Gasket", price=3.0, quantity_in_stock=1))
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+        registry.clear()
+
+    def test_records_latency_status_and_db_time_per_endpoint(self):
+        for _ in range(3):
+            self.assertEqual(self.client.get('/inventory/low-stock?threshold=5').status_code, 200)
+        missing = self.client.get('/inventory/999').status_code
+
+        labels = ('inventory', 'inventory.get_low_stock_items')
+        self.assertEqual(request_duration.count(labels), 3)
+        self.assertEqual(requests_total.value((*labels, 'GET', '200')), 3)
+        self.assertEqual(requests_total.value(('inventory', 'inventory.get_inventory_item', 'GET', str(missing))), 1)
+        # The first request ran the query; the other two came from the cache
+        self.assertEqual(request_db_queries.value(labels), 1)
+        self.assertEqual(requests_in_flight.value(('inventory',)), 0)
+
+    def test_unmatched_paths_share_one_label(self):
+        self.client.get('/no/such/path')
+        self.client.get('/or/this/one')
+        self.assertEqual(requests_total.value(('app', '<unmatched>', 'GET', '404')), 2)
+
+    def test_exposition_format(self):
+        self.client.get('/inventory/low-stock')
+        response = self.client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content_type, 'text/plain; version=0.0.4; charset=utf-8')
+
+        text = response.get_data(as_text=True)
+        self.assertTrue(text.endswith('\n'))
+        for line in text.splitlines():
+            if not line.startswith('#'):
+                self.assertRegex(line, SAMPLE)
+        self.assertIn('# TYPE http_request_duration_seconds histogram', text)
+        self.assertIn('http_request_duration_seconds_bucket{blueprint="inventory",'
+                      'endpoint="inventory.get_low_stock_items",le="+Inf"} 1', text)
+        self.assertIn('http_requests_total{blueprint="inventory",endpoint="inventory.get_low_stock_items",'
+                      'method="GET",status="200"} 1', text)
+        # Scrapes aren't counted
+        self.assertNotIn('endpoint="metrics"', text)
+
+    def test_rate_limited_requests_are_counted(self):
+        class Limited(TestConfig):
+            RATELIMIT_ENABLED = True
+
+        # create_app() reconfigures the shared limiter; undo that for the tests that follow
+        self.addCleanup(setattr, limiter, 'enabled', limiter.enabled)
+        self.addCleanup(limiter.reset)
+        app = create_app(Limited)
+        with app.app_context():
+            db.create_all()
+            client = app.test_client()
+            # Over the default limit (50 per hour), which is checked before the view runs
+            statuses = [client.get('/inventory/low-stock').status_code for _ in range(51)]
+            db.drop_all()
+        self.assertEqual(statuses[-1], 429)
+
+        labels = ('inventory', 'inventory.get_low_stock_items', 'GET')
+        self.assertEqual(requests_total.value((*labels, '200')), 50)
+        self.assertEqual(requests_total.value((*labels, '429')), 1)
+        self.assertEqual(requests_in_flight.value(('inventory',)), 0)
+
+    def test_pool_and_token_cache_stats(self):
+        text = self.client.get('/metrics').get_data(as_text=True)
+        self.assertIn('# TYPE token_cache_hits_total counter', text)
+        self.assertRegex(text, r'\ntoken_cache_entries \d+\n')
+        # Hashing runs inline unless PASSWORD_HASH_POOL_WORKERS is set
+        self.assertNotIn('password_hash_pool_', text)
+
+        self.app.config['PASSWORD_HASH_POOL_WORKERS'] = 1
+        try:
+            text = self.client.get('/metrics').get_data(as_text=True)
+        finally:
+            pool = self.app.extensions.pop('password_hash_pool', None)
+            if pool is not None:
+                pool.shutdown()
+        self.assertIn('password_hash_pool_workers 1\n', text)
+        self.assertIn('password_hash_pool_rejected_total 0\n', text)
+
+    def test_can_be_disabled(self):
+        class NoMetrics(TestConfig):
+            METRICS_ENABLED = False
+
+        app = create_app(NoMetrics)
+        self.assertEqual(app.test_client().get('/metrics').status_code, 404)
+
+
+class TestHistogram(unittest.TestCase):
+
+    def test_buckets_are_cumulative(self):
+        histogram = Histogram('latency_seconds', 'Latency', ('route',), buckets=(0.1, 1.0))
+        for value in (0.05, 0.1, 0.5, 3.0):
+            histogram.observe(value, ('a"b',))
+
+        self.assertEqual(histogram.render(), [
+            '# HELP latency_seconds Latency',
+            '# TYPE latency_seconds histogram',
+            'latency_seconds_bucket{route="a\\"b",le="0.1"} 2',
+            'latency_seconds_bucket{route="a\\"b",le="1.0"} 3',
+            'latency_seconds_bucket{route="a\\"b",le="+Inf"} 4',
+            'latency_seconds_sum{route="a\\"b"} 3.65',
+            'latency_seconds_count{route="a\\"b"} 4',
+        ])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,120 @@
+# tests/test_pagination.py
+import unittest
+
+from application import create_app, db
+from application.models import Customer, Inventory, ServiceTicket, Vehicle
+from application.pagination import InvalidCursor, decode_cursor, encode_cursor
+from auth.tokens import encode_token
+from config import TestConfig
+
+
+class TestKeysetPagination(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        for i in range(25):
+            db.session.add(Customer(
+                first_name=f"Customer{i}",
+                last_name="Test",
+                email=f"customer{i}@example.com"
+            ))
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_cursor_walks_every_customer_once(self):
+        seen = []
+        cursor = ''
+        while True:
+            response = self.client.get(f'/customers/?cursor={cursor}&per_page=10')
+            self.assertEqual(response.status_code, 200)
+            data = response.get_json()
+            seen.extend(customer['id'] for customer in data['customers'])
+            if not data['has_more']:
+                self.assertIsNone(data['next_cursor'])
+                break
+            cursor = data['next_cursor']
+
+        self.assertEqual(len(seen), 25)
+        self.assertEqual(seen, sorted(set(seen)))
+
+    def test_total_is_opt_in(self):
+        response = self.client.get('/customers/?cursor=')
+        self.assertNotIn('total', response.get_json())
+
+        response = self.client.get('/customers/?cursor=&include_total=1')
+        self.assertEqual(response.get_json()['total'], 25)
+
+    def test_total_counts_the_filtered_rows(self):
+        owner = db.session.get(Customer, 1)
+        db.session.add_all([Vehicle(customer_id=owner.id, make=make, model="Model", year=2020, vin=f"VIN{i:014d}")
+                            for i, make in enumerate(["Honda", "Honda", "Ford"])])
+        db.session.commit()
+        headers = {'Authorization': f'Bearer {encode_token(owner.id)}'}
+
+        response = self.client.get('/vehicles/vehicles?cursor=&include_total=1&make=honda', headers=headers)
+        self.assertEqual(response.get_json()['total'], 2)
+        response = self.client.get('/vehicles/vehicles?cursor=&include_total=1', headers=headers)
+        self.assertEqual(response.get_json()['total'], 3)
+
+    def test_my_tickets_total(self):
+        owner, other = db.session.get(Customer, 1), db.session.get(Customer, 2)
+        vehicle = Vehicle(customer_id=owner.id, make="Honda", model="Civic", year=2020, vin="VIN00000000000009")
+        db.session.add(vehicle)
+        db.session.flush()
+        db.session.add_all([ServiceTicket(customer_id=customer.id, vehicle_id=vehicle.id, issue_description="Noise")
+                            for customer in (owner, owner, other)])
+        db.session.commit()
+
+        response = self.client.get('/customers/my-tickets?cursor=&per_page=1&include_total=1',
+                                   headers={'Authorization': f'Bearer {encode_token(owner.id)}'})
+        data = response.get_json()
+        self.assertEqual(len(data['tickets']), 1)
+        self.assertEqual(data['total'], 2)
+
+    def test_offset_mode_still_supported(self):
+        response = self.client.get('/customers/?page=2&per_page=10')
+        data = response.get_json()
+        self.assertEqual(data['current_page'], 2)
+        self.assertEqual(len(data['customers']), 10)
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get('/customers/?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, 400)
+
+    def test_cursor_round_trip(self):
+        columns = [Inventory.created_at, Inventory.id]
+        token = encode_cursor(['2025-01-01T10:00:00', 7])
+        values = decode_cursor(token, columns)
+        self.assertEqual(values[1], 7)
+        self.assertEqual(values[0].year, 2025)
+
+        with self.assertRaises(InvalidCursor):
+            decode_cursor(token, [Inventory.id])
+
+    def test_inventory_list_uses_same_helper(self):
+        for i in range(3):
+            db.session.add(Inventory(name=f"Part {i}", price=1.0, quantity_in_stock=1))
+        db.session.commit()
+
+        response = self.client.get('/inventory/?cursor=&per_page=2')
+        data = response.get_json()
+        self.assertEqual(len(data['items']), 2)
+        self.assertTrue(data['has_more'])
+
+        response = self.client.get(f"/inventory/?cursor={data['next_cursor']}&per_page=2")
+        data = response.get_json()
+        self.assertEqual(len(data['items']), 1)
+        self.assertFalse(data['has_more'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+# tests/test_password_hashing.py
+import unittest
+
+from application import create_app, db
+from application.models import Customer
+from auth.passwords import BcryptHasher, PasswordHasher, Pbkdf2Hasher, ScryptHasher, benchmark, get_hasher
+from config import TestConfig
+
+
+class FastHashConfig(TestConfig):
+    PASSWORD_HASH_ALGORITHM = 'pbkdf2:sha256'
+    PASSWORD_HASH_WORK_FACTOR = 1000
+
+
+class TestPasswordHashing(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(FastHashConfig)
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_hash_uses_configured_work_factor(self):
+        customer = Customer(first_name="A", last_name="B", email="a@example.com")
+        customer.set_password("password123")
+        self.assertTrue(customer.password_hash.startswith('pbkdf2:sha256:1000$'))
+        self.assertTrue(customer.check_password("password123"))
+        self.assertFalse(customer.check_password("wrong"))
+
+    def test_stale_hash_is_upgraded_on_login(self):
+        customer = Customer(first_name="A", last_name="B", email="stale@example.com")
+        customer.password_hash = BcryptHasher(4).hash("password123")
+        db.session.add(customer)
+        db.session.commit()
+
+        response = self.client.post('/customers/login', json={
+            'email': 'stale@example.com',
+            'password': 'password123'
+        })
+        self.assertEqual(response.status_code, 200)
+
+        db.session.expire_all()
+        upgraded = db.session.get(Customer, customer.id)
+        self.assertTrue(upgraded.password_hash.startswith('pbkdf2:sha256:1000$'))
+
+    def test_failed_login_does_not_rehash(self):
+        customer = Customer(first_name="A", last_name="B", email="keep@example.com")
+        stale_hash = BcryptHasher(4).hash("password123")
+        customer.password_hash = stale_hash
+        self.assertFalse(customer.check_password("wrong"))
+        self.assertEqual(customer.password_hash, stale_hash)
+
+    def test_every_algorithm_round_trips(self):
+        for hasher in (Pbkdf2Hasher(1000), ScryptHasher(1024), BcryptHasher(4)):
+            with self.subTest(algorithm=hasher.algorithm):
+                pw_hash = hasher.hash("secret")
+                self.assertLessEqual(len(pw_hash), 255)
+                self.assertTrue(hasher.identifies(pw_hash))
+                self.assertTrue(hasher.verify(pw_hash, "secret"))
+                self.assertFalse(hasher.needs_rehash(pw_hash))
+
+    def test_bcrypt_accepts_passwords_over_72_bytes(self):
+        hasher = BcryptHasher(4)
+        password = "correct horse battery staple " * 4
+        pw_hash = hasher.hash(password)
+        self.assertTrue(hasher.verify(pw_hash, password))
+        # Without the pre-hash these would collide: bcrypt reads 72 bytes
+        self.assertFalse(hasher.verify(pw_hash, password[:72]))
+        self.assertFalse(hasher.verify(pw_hash, password + "!"))
+
+    def test_long_password_registration_succeeds_with_bcrypt(self):
+        self.app.config.update(PASSWORD_HASH_ALGORITHM='bcrypt', PASSWORD_HASH_WORK_FACTOR=4)
+        customer = Customer(first_name="A", last_name="B", email="long@example.com")
+        customer.set_password("p" * 100)
+        self.assertTrue(customer.password_hash.startswith('$2b$04$'))
+        self.assertTrue(customer.check_password("p" * 100))
+
+    def test_hashers_must_implement_the_interface(self):
+        class Incomplete(PasswordHasher):
+            algorithm = 'incomplete'
+
+        with self.assertRaises(TypeError):
+            Incomplete(1)
+
+    def test_unknown_algorithm_is_rejected(self):
+        with self.assertRaises(ValueError):
+            get_hasher('md5')
+
+    def test_benchmark_reports_per_core_rate(self):
+        result = benchmark(Pbkdf2Hasher(1000), seconds=0.05)
+        self.assertGreater(result['hashes_per_sec_per_core'], 0)
+        self.assertGreaterEqual(result['cores'], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
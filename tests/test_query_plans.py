@@ -0,0 +1,82 @@
+# tests/test_query_plans.py
+"""
+Query-plan regression tests: the hot filters and joins must be answered
+from an index, never by scanning the whole table.
+"""
+import unittest
+
+from sqlalchemy import text
+
+from application import create_app, db
+from application.models import Inventory, Mechanic, ServiceTicket, ServiceTicketMechanic, TicketPart, Vehicle
+from config import TestConfig
+
+
+class TestQueryPlans(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def explain(self, query):
+        sql = query.statement.compile(dialect=db.engine.dialect, compile_kwargs={'literal_binds': True})
+        rows = db.session.execute(text(f'EXPLAIN QUERY PLAN {sql}')).fetchall()
+        return [row[-1] for row in rows]
+
+    def assertUsesIndex(self, query, table, index_name):
+        plan = self.explain(query)
+        steps = [step for step in plan if f' {table} ' in f' {step} ']
+        self.assertTrue(steps, f'{table} not in plan: {plan}')
+        for step in steps:
+            self.assertNotRegex(step, rf'^SCAN {table}\b(?! USING)', f'full scan: {plan}')
+        self.assertTrue(any(index_name in step for step in steps), f'{index_name} not used: {plan}')
+
+    def test_my_tickets_uses_customer_index(self):
+        query = ServiceTicket.query.filter_by(customer_id=1).order_by(ServiceTicket.created_at)
+        self.assertUsesIndex(query, 'service_tickets', 'ix_service_tickets_customer_id_created_at')
+
+    def test_tickets_by_vehicle_and_status(self):
+        self.assertUsesIndex(ServiceTicket.query.filter_by(vehicle_id=1),
+                             'service_tickets', 'ix_service_tickets_vehicle_id')
+        self.assertUsesIndex(ServiceTicket.query.filter_by(status='open'),
+                             'service_tickets', 'ix_service_tickets_status')
+
+    def test_customer_vehicles_uses_customer_index(self):
+        self.assertUsesIndex(Vehicle.query.filter_by(customer_id=1),
+                             'vehicles', 'ix_vehicles_customer_id')
+
+    def test_inventory_by_category_uses_index(self):
+        self.assertUsesIndex(Inventory.query.filter_by(category='Filters'),
+                             'inventory', 'ix_inventory_category')
+
+    def test_low_stock_uses_partial_index(self):
+        query = Inventory.query.filter(Inventory.quantity_in_stock <= Inventory.min_stock_level)
+        self.assertUsesIndex(query, 'inventory', 'ix_inventory_low_stock')
+        self.assertUsesIndex(Inventory.query.filter(Inventory.quantity_in_stock <= 5),
+                             'inventory', 'ix_inventory_quantity_in_stock')
+
+    def test_ticket_parts_lookups_use_indexes(self):
+        self.assertUsesIndex(TicketPart.query.filter_by(ticket_id=1),
+                             'ticket_parts', 'ix_ticket_parts_ticket_id')
+        self.assertUsesIndex(TicketPart.query.filter_by(inventory_id=1),
+                             'ticket_parts', 'ix_ticket_parts_inventory_id')
+
+    def test_mechanic_assignment_join_uses_index(self):
+        query = db.session.query(Mechanic.id, db.func.count(ServiceTicketMechanic.id)) \
+            .join(ServiceTicketMechanic, ServiceTicketMechanic.mechanic_id == Mechanic.id) \
+            .filter(Mechanic.id == 1) \
+            .group_by(Mechanic.id)
+        self.assertUsesIndex(query, 'service_ticket_mechanics', 'ix_service_ticket_mechanics_mechanic_id')
+        self.assertUsesIndex(ServiceTicketMechanic.query.filter_by(ticket_id=1),
+                             'service_ticket_mechanics', 'ix_service_ticket_mechanics_ticket_id')
+
+
+if __name__ == '__main__':
+    unittest.main()
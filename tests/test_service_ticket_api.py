@@ -0,0 +1,160 @@
+# tests/test_service_ticket_api.py
+import unittest
+
+from sqlalchemy import event
+
+from application import create_app, db
+from application.models import (Customer, Inventory, Mechanic, ServiceTicket, ServiceTicketMechanic,
+                                TicketPart, Vehicle)
+from auth.tokens import encode_mechanic_token
+from config import TestConfig
+
+
+class TestServiceTicketAPI(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        self.customer = Customer(first_name="Tick", last_name="Et", email="ticket@example.com")
+        self.mechanics = [Mechanic(first_name=f"Mech{i}", last_name="Anic", email=f"m{i}@example.com")
+                          for i in range(2)]
+        self.parts = [Inventory(name=f"Part {i}", price=5.0, quantity_in_stock=10) for i in range(2)]
+        db.session.add_all([self.customer, *self.mechanics, *self.parts])
+        db.session.flush()
+        self.vehicle = Vehicle(customer_id=self.customer.id, make="Mazda", model="3", year=2018,
+                               vin="JM1BN1V75J1000001")
+        db.session.add(self.vehicle)
+        db.session.commit()
+
+        self.customer_id = self.customer.id
+        self.vehicle_id = self.vehicle.id
+        self.part_ids = [part.id for part in self.parts]
+        self.mechanic_ids = [mechanic.id for mechanic in self.mechanics]
+        token = encode_mechanic_token(self.mechanic_ids[0])
+        self.headers = {'Authorization': f'Bearer {token}'}
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _add_tickets(self, count):
+        for _ in range(count):
+            ticket = ServiceTicket(customer_id=self.customer_id, vehicle_id=self.vehicle_id,
+                                   issue_description="Check engine light")
+            db.session.add(ticket)
+            db.session.flush()
+            for part_id in self.part_ids:
+                db.session.add(TicketPart(ticket_id=ticket.id, inventory_id=part_id, quantity_used=1))
+            for mechanic_id in self.mechanic_ids:
+                db.session.add(ServiceTicketMechanic(ticket_id=ticket.id, mechanic_id=mechanic_id))
+        db.session.commit()
+        db.session.expunge_all()
+
+    def _count_statements(self, url):
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            response = self.client.get(url, headers=self.headers)
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+        self.assertEqual(response.status_code, 200)
+        return len(statements), response.get_json()
+
+    def test_list_includes_parts_and_mechanics(self):
+        self._add_tickets(2)
+        _, tickets = self._count_statements('/service-tickets/api/service-tickets')
+
+        self.assertEqual(len(tickets), 2)
+        self.assertEqual(len(tickets[0]['parts']), 2)
+        self.assertEqual(tickets[0]['parts'][0]['inventory_item']['name'], 'Part 0')
+        self.assertEqual({m['first_name'] for m in tickets[0]['mechanics']}, {'Mech0', 'Mech1'})
+
+    def test_statement_count_is_constant_as_tickets_grow(self):
+        self._add_tickets(2)
+        few, _ = self._count_statements('/service-tickets/api/service-tickets')
+
+        self._add_tickets(20)
+        many, tickets = self._count_statements('/service-tickets/api/service-tickets')
+
+        self.assertEqual(len(tickets), 22)
+        self.assertEqual(few, many)
+
+    def test_detail_endpoint(self):
+        self._add_tickets(1)
+        ticket_id = ServiceTicket.query.first().id
+        count, ticket = self._count_statements(f'/service-tickets/api/service-tickets/{ticket_id}')
+        self.assertEqual(ticket['id'], ticket_id)
+        self.assertEqual(len(ticket['mechanics']), 2)
+        self.assertLessEqual(count, 3)
+
+        response = self.client.get('/service-tickets/api/service-tickets/999', headers=self.headers)
+        self.assertEqual(response.status_code, 404)
+
+    def test_create_ticket_with_mechanics(self):
+        response = self.client.post('/service-tickets/api/service-tickets', headers=self.headers, json={
+            'customer_id': self.customer_id,
+            'vehicle_id': self.vehicle_id,
+            'issue_description': 'Brakes squeal',
+            'mechanic_ids': self.mechanic_ids
+        })
+        self.assertEqual(response.status_code, 201)
+        data = response.get_json()
+        self.assertEqual(data['status'], 'open')
+        self.assertEqual(len(data['mechanics']), 2)
+        self.assertEqual(data['parts'], [])
+
+    def test_create_rejects_unknown_mechanic(self):
+        response = self.client.post('/service-tickets/api/service-tickets', headers=self.headers, json={
+            'customer_id': self.customer_id,
+            'vehicle_id': self.vehicle_id,
+            'issue_description': 'Brakes squeal',
+            'mechanic_ids': [999]
+        })
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(ServiceTicket.query.count(), 0)
+
+    def test_create_rejects_another_customers_vehicle(self):
+        other = Customer(first_name="Other", last_name="Owner", email="other@example.com")
+        db.session.add(other)
+        db.session.commit()
+        response = self.client.post('/service-tickets/api/service-tickets', headers=self.headers, json={
+            'customer_id': other.id,
+            'vehicle_id': self.vehicle_id,
+            'issue_description': 'Brakes squeal'
+        })
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(ServiceTicket.query.count(), 0)
+
+    def test_rejects_unknown_status(self):
+        response = self.client.post('/service-tickets/api/service-tickets', headers=self.headers, json={
+            'customer_id': self.customer_id,
+            'vehicle_id': self.vehicle_id,
+            'issue_description': 'Brakes squeal',
+            'status': 'bogus'
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('status', response.get_json()['errors'])
+        self.assertEqual(ServiceTicket.query.count(), 0)
+
+        ticket = ServiceTicket(customer_id=self.customer_id, vehicle_id=self.vehicle_id, issue_description='Noise')
+        db.session.add(ticket)
+        db.session.commit()
+        response = self.client.put(f'/service-tickets/api/service-tickets/{ticket.id}', headers=self.headers,
+                                   json={'status': 'bogus'})
+        self.assertEqual(response.status_code, 400)
+        db.session.expire_all()
+        self.assertEqual(db.session.get(ServiceTicket, ticket.id).status, 'open')
+
+    def test_requires_mechanic_token(self):
+        response = self.client.get('/service-tickets/api/service-tickets')
+        self.assertEqual(response.status_code, 401)
+
+
+if __name__ == '__main__':
+    unittest.main()
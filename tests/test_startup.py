@@ -0,0 +1,53 @@
+# tests/test_startup.py
+import contextlib
+import io
+import os
+import subprocess
+import sys
+import unittest
+
+import click
+
+from application import create_app
+from application.extensions import get_redis
+from config import TestConfig
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestStartup(unittest.TestCase):
+
+    def test_heavy_optional_modules_are_not_imported(self):
+        script = ("import sys; from application import create_app; create_app(); "
+                  "print(sorted(m for m in ('redis', 'flask_migrate', 'alembic') if m in sys.modules))")
+        output = subprocess.run([sys.executable, '-c', script], cwd=ROOT, env={**os.environ, 'TESTING': '1'},
+                                check=True, capture_output=True, text=True).stdout
+        self.assertEqual(output.strip(), '[]')
+
+    def test_create_app_prints_nothing(self):
+        stdout = io.StringIO()
+        with contextlib.redirect_stdout(stdout):
+            create_app(TestConfig)
+        self.assertEqual(stdout.getvalue(), '')
+
+    def test_cli_still_gets_flask_migrate(self):
+        with click.Context(click.Command('flask')):
+            app = create_app(TestConfig)
+        self.assertIn('migrate', app.extensions)
+        self.assertIn('db', app.cli.commands)
+
+    def test_redis_client_is_created_on_first_use(self):
+        class RedisConfig(TestConfig):
+            REDIS_URL = 'redis://cache.internal:6380/2'
+
+        app = create_app(RedisConfig)
+        self.assertNotIn('redis', app.extensions)
+        with app.app_context():
+            client = get_redis()
+            self.assertIs(get_redis(), client)
+        kwargs = client.connection_pool.connection_kwargs
+        self.assertEqual((kwargs['host'], kwargs['port'], kwargs['db']), ('cache.internal', 6380, 2))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+# tests/test_streaming.py
+import json
+import unittest
+
+from application import create_app, db
+from application.models import Customer, Inventory, Vehicle
+from application.streaming import NDJSON_MIMETYPE
+from auth.tokens import encode_token
+from config import TestConfig
+
+
+class TestNDJSONStreaming(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        db.session.bulk_insert_mappings(Inventory, [
+            {'name': f'Part {i}', 'price': 1.0, 'quantity_in_stock': i} for i in range(1203)
+        ])
+        customer = Customer(first_name="Stream", last_name="Er", email="stream@example.com")
+        db.session.add(customer)
+        db.session.flush()
+        db.session.add(Vehicle(customer_id=customer.id, make="Honda", model="Civic", year=2019,
+                               vin="2HGFC2F59KH000001"))
+        db.session.commit()
+        self.token = encode_token(customer.id)
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def _lines(self, response):
+        return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+    def test_inventory_streams_every_row(self):
+        response = self.client.get('/inventory/?stream=1')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, NDJSON_MIMETYPE)
+        self.assertTrue(response.is_streamed)
+
+        rows = self._lines(response)
+        self.assertEqual(len(rows), 1203)
+        self.assertEqual([row['id'] for row in rows], sorted(row['id'] for row in rows))
+        self.assertEqual(set(rows[0]), set(Inventory.serialized_fields))
+
+    def test_accept_header_selects_streaming(self):
+        response = self.client.get('/inventory/', headers={'Accept': NDJSON_MIMETYPE})
+        self.assertEqual(response.mimetype, NDJSON_MIMETYPE)
+
+        response = self.client.get('/inventory/', headers={'Accept': '*/*'})
+        self.assertEqual(response.mimetype, 'application/json')
+
+    def test_cached_json_is_not_served_to_stream_requests(self):
+        response = self.client.get('/inventory/')
+        self.assertEqual(response.mimetype, 'application/json')
+        self.assertIn('Accept', response.vary)
+
+        response = self.client.get('/inventory/', headers={'Accept': NDJSON_MIMETYPE})
+        self.assertEqual(response.mimetype, NDJSON_MIMETYPE)
+        self.assertIn('Accept', response.vary)
+        self.assertEqual(len(self._lines(response)), 1203)
+
+    def test_vehicles_stream(self):
+        response = self.client.get('/vehicles/vehicles?stream=1',
+                                   headers={'Authorization': f'Bearer {self.token}'})
+        self.assertEqual(response.status_code, 200)
+        rows = self._lines(response)
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['vin'], '2HGFC2F59KH000001')
+
+    def test_streamed_vehicle_matches_the_json_record(self):
+        headers = {'Authorization': f'Bearer {self.token}'}
+        streamed = self._lines(self.client.get('/vehicles/vehicles?stream=1', headers=headers))
+        listed = self.client.get('/vehicles/vehicles', headers=headers).get_json()
+        self.assertEqual(streamed, listed)
+        self.assertEqual(streamed[0]['customer_name'], 'Stream Er')
+        self.assertEqual(streamed[0]['customer_email'], 'stream@example.com')
+
+
+if __name__ == '__main__':
+    unittest.main()
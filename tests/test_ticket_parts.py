@@ -0,0 +1,157 @@
+# tests/test_ticket_parts.py
+import os
+import tempfile
+import threading
+import unittest
+
+from sqlalchemy import event
+
+from application import create_app, db
+from application.models import Customer, Inventory, Mechanic, ServiceTicket, TicketPart, Vehicle
+from auth.tokens import encode_mechanic_token
+from config import TestConfig
+
+
+class TicketPartsTestCase(unittest.TestCase):
+    config = TestConfig
+
+    def setUp(self):
+        self.app = create_app(self.config)
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        customer = Customer(first_name="Parts", last_name="User", email="parts@example.com")
+        mechanic = Mechanic(first_name="Wrench", last_name="Hand", email="wrench@example.com")
+        self.plug = Inventory(name="Spark Plug", category="Ignition", price=4.99, quantity_in_stock=10)
+        self.filter = Inventory(name="Oil Filter", category="Filters", price=9.99, quantity_in_stock=2)
+        db.session.add_all([customer, mechanic, self.plug, self.filter])
+        db.session.flush()
+        vehicle = Vehicle(customer_id=customer.id, make="Subaru", model="Outback", year=2019,
+                          vin="4S4BSANC5K3000001")
+        db.session.add(vehicle)
+        db.session.flush()
+        ticket = ServiceTicket(customer_id=customer.id, vehicle_id=vehicle.id, issue_description="Tune-up")
+        db.session.add(ticket)
+        db.session.commit()
+
+        self.ticket_id = ticket.id
+        self.plug_id, self.filter_id = self.plug.id, self.filter.id
+        self.headers = {'Authorization': f'Bearer {encode_mechanic_token(mechanic.id)}'}
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def add_parts(self, parts, client=None):
+        return (client or self.client).post(f'/service-tickets/api/service-tickets/{self.ticket_id}/parts',
+                                            headers=self.headers, json={'parts': parts})
+
+    def stock(self, item_id):
+        db.session.expire_all()
+        return db.session.get(Inventory, item_id).quantity_in_stock
+
+
+class TestTicketParts(TicketPartsTestCase):
+
+    def test_parts_decrement_stock(self):
+        response = self.add_parts([{'inventory_id': self.plug_id, 'quantity': 4},
+                                   {'inventory_id': self.filter_id, 'quantity': 1}])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.get_json()['parts']), 2)
+        self.assertEqual(self.stock(self.plug_id), 6)
+        self.assertEqual(self.stock(self.filter_id), 1)
+
+    def test_batch_is_one_conditional_update(self):
+        statements = []
+        listener = lambda conn, cursor, sql, params, context, executemany: statements.append((sql, executemany))
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            self.add_parts([{'inventory_id': self.plug_id, 'quantity': 1},
+                            {'inventory_id': self.filter_id, 'quantity': 1}])
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+        updates = [(sql, many) for sql, many in statements if sql.lstrip().upper().startswith('UPDATE INVENTORY')]
+        self.assertEqual(len(updates), 1)
+        self.assertTrue(updates[0][1])
+        self.assertIn('quantity_in_stock >=', updates[0][0])
+
+    def test_insufficient_stock_is_409_and_changes_nothing(self):
+        response = self.add_parts([{'inventory_id': self.plug_id, 'quantity': 1},
+                                   {'inventory_id': self.filter_id, 'quantity': 3}])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.get_json()['shortages'],
+                         [{'inventory_id': self.filter_id, 'requested': 3, 'available': 2}])
+        self.assertEqual(self.stock(self.plug_id), 10)
+        self.assertEqual(self.stock(self.filter_id), 2)
+        self.assertEqual(TicketPart.query.count(), 0)
+
+    def test_repeated_lines_are_summed(self):
+        response = self.add_parts([{'inventory_id': self.filter_id, 'quantity': 1},
+                                   {'inventory_id': self.filter_id, 'quantity': 2}])
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(self.stock(self.filter_id), 2)
+
+    def test_validation_and_missing_rows(self):
+        self.assertEqual(self.add_parts([{'inventory_id': self.plug_id, 'quantity': 0}]).status_code, 400)
+        self.assertEqual(self.add_parts([]).status_code, 400)
+        self.assertEqual(self.add_parts([{'inventory_id': 999, 'quantity': 1}]).status_code, 404)
+        self.ticket_id = 999
+        self.assertEqual(self.add_parts([{'inventory_id': self.plug_id, 'quantity': 1}]).status_code, 404)
+
+    def test_cached_item_reflects_new_stock(self):
+        self.assertEqual(self.client.get(f'/inventory/{self.plug_id}').get_json()['quantity_in_stock'], 10)
+        self.add_parts([{'inventory_id': self.plug_id, 'quantity': 3}])
+        self.assertEqual(self.client.get(f'/inventory/{self.plug_id}').get_json()['quantity_in_stock'], 7)
+
+
+class TestConcurrentReservation(TicketPartsTestCase):
+    """Many mechanics drawing on one SKU at once, against a real database file"""
+
+    THREADS = 16
+    PER_REQUEST = 3
+
+    def setUp(self):
+        fd, self.db_path = tempfile.mkstemp(suffix='.db')
+        os.close(fd)
+
+        class FileConfig(TestConfig):
+            SQLALCHEMY_DATABASE_URI = f'sqlite:///{self.db_path}'
+            SQLALCHEMY_ENGINE_OPTIONS = {'connect_args': {'timeout': 30}}
+
+        self.config = FileConfig
+        super().setUp()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        db.engine.dispose()
+        self.app_context.pop()
+        os.remove(self.db_path)
+
+    def test_no_overselling_under_contention(self):
+        start = threading.Barrier(self.THREADS)
+        statuses = []
+
+        def worker():
+            client = self.app.test_client()
+            start.wait()
+            response = self.add_parts([{'inventory_id': self.plug_id, 'quantity': self.PER_REQUEST}], client)
+            statuses.append(response.status_code)
+
+        threads = [threading.Thread(target=worker) for _ in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        succeeded = 10 // self.PER_REQUEST
+        self.assertEqual(sorted(statuses), [201] * succeeded + [409] * (self.THREADS - succeeded))
+        self.assertEqual(self.stock(self.plug_id), 10 - succeeded * self.PER_REQUEST)
+        self.assertEqual(sum(p.quantity_used for p in TicketPart.query), succeeded * self.PER_REQUEST)
+
+
+if __name__ == '__main__':
+    unittest.main()
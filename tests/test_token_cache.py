@@ -0,0 +1,96 @@
+# tests/test_token_cache.py
+import unittest
+from unittest.mock import patch
+
+from application import create_app, db
+from application.models import Mechanic
+from application.ttl_cache import TTLCache
+from auth import tokens
+from auth.tokens import (clear_token_cache, encode_mechanic_token, register_revocation_hook,
+                         revoke_token, token_cache_stats)
+from config import TestConfig
+
+
+class TestVerifiedTokenCache(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        mechanic = Mechanic(first_name="Token", last_name="Cache", email="cache@example.com")
+        mechanic.set_password("password123")
+        db.session.add(mechanic)
+        db.session.commit()
+        self.token = encode_mechanic_token(mechanic.id)
+        self.headers = {'Authorization': f'Bearer {self.token}'}
+        clear_token_cache()
+
+    def tearDown(self):
+        tokens._revocation_hooks.clear()
+        clear_token_cache()
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def test_repeat_requests_skip_signature_verification(self):
+        with patch('auth.tokens.jwt.decode', wraps=tokens.jwt.decode) as decode:
+            for _ in range(3):
+                response = self.client.get('/mechanic/profile', headers=self.headers)
+                self.assertEqual(response.status_code, 200)
+            self.assertEqual(decode.call_count, 1)
+
+        stats = token_cache_stats()
+        self.assertEqual(stats['misses'], 1)
+        self.assertEqual(stats['hits'], 2)
+
+    def test_revocation_hook_rejects_cached_token(self):
+        self.client.get('/mechanic/profile', headers=self.headers)
+
+        revoked = set()
+        register_revocation_hook(lambda claims: claims['sub'] in revoked)
+        revoked.add(tokens.jwt.decode(self.token, tokens.SECRET_KEY, algorithms=[tokens.ALGORITHM])['sub'])
+
+        response = self.client.get('/mechanic/profile', headers=self.headers)
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.get_json()['message'], 'Token has been revoked')
+
+    def test_revoke_token_forces_reverification(self):
+        self.client.get('/mechanic/profile', headers=self.headers)
+        revoke_token(self.token)
+
+        with patch('auth.tokens.jwt.decode', wraps=tokens.jwt.decode) as decode:
+            self.client.get('/mechanic/profile', headers=self.headers)
+            self.assertEqual(decode.call_count, 1)
+
+    def test_invalid_token_is_not_cached(self):
+        headers = {'Authorization': 'Bearer not.a.token'}
+        response = self.client.get('/mechanic/profile', headers=headers)
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(token_cache_stats()['size'], 0)
+
+
+class TestTTLCache(unittest.TestCase):
+
+    def test_entries_expire(self):
+        now = [100.0]
+        cache = TTLCache(maxsize=2, clock=lambda: now[0])
+        cache.set('a', 1, ttl=10)
+        self.assertEqual(cache.get('a'), 1)
+        now[0] = 111.0
+        self.assertIsNone(cache.get('a'))
+
+    def test_least_recently_used_is_evicted(self):
+        cache = TTLCache(maxsize=2)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('a'), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+# tests/test_vehicle_responses.py
+import unittest
+
+import pytest
+
+from application import create_app, db
+from application.models import Customer, Vehicle
+from auth.tokens import encode_token
+from config import TestConfig
+
+
+class TestVehicleResponses(unittest.TestCase):
+
+    @pytest.fixture(autouse=True)
+    def _fixtures(self, assert_max_queries):
+        self.assert_max_queries = assert_max_queries
+
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        self.customers = [Customer(first_name=f"Owner{i}", last_name="Fleet", email=f"owner{i}@example.com")
+                          for i in range(3)]
+        db.session.add_all(self.customers)
+        db.session.commit()
+        self.customer_ids = [customer.id for customer in self.customers]
+        self.headers = {'Authorization': f'Bearer {encode_token(self.customer_ids[0])}'}
+        self.vehicle_count = 0
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def add_vehicles(self, per_customer):
+        for customer_id in self.customer_ids:
+            for _ in range(per_customer):
+                self.vehicle_count += 1
+                db.session.add(Vehicle(customer_id=customer_id, make="Ford", model="Transit", year=2020,
+                                       vin=f"1FTBW2CM0LKA{self.vehicle_count:05d}"))
+        db.session.commit()
+        db.session.expunge_all()
+
+    def get(self, url, limit):
+        with self.assert_max_queries(limit):
+            response = self.client.get(url, headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        return response.get_json()
+
+    def test_list_loads_owners_in_the_same_query(self):
+        self.add_vehicles(1)
+        vehicles = self.get('/vehicles/vehicles', limit=2)
+        self.assertEqual(len(vehicles), 3)
+        self.assertEqual(vehicles[0]['customer_name'], 'Owner0 Fleet')
+        self.assertEqual(vehicles[2]['customer_email'], 'owner2@example.com')
+        self.assertEqual(vehicles[0]['vin'], '1FTBW2CM0LKA00001')
+
+        self.add_vehicles(10)
+        self.assertEqual(len(self.get('/vehicles/vehicles', limit=2)), 33)
+        page = self.get('/vehicles/vehicles?cursor=&per_page=20', limit=2)
+        self.assertEqual(len(page['vehicles']), 20)
+        self.assertEqual(page['vehicles'][0]['customer_name'], 'Owner0 Fleet')
+
+    def test_customer_vehicles_reuse_the_loaded_customer(self):
+        self.add_vehicles(10)
+        vehicles = self.get(f'/vehicles/customers/{self.customer_ids[1]}/vehicles', limit=3)
+        self.assertEqual(len(vehicles), 10)
+        self.assertEqual({vehicle['customer_name'] for vehicle in vehicles}, {'Owner1 Fleet'})
+
+    def test_single_vehicle(self):
+        self.add_vehicles(1)
+        vehicle = self.get('/vehicles/vehicles/2', limit=3)
+        self.assertEqual(vehicle['customer_email'], 'owner1@example.com')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+# tests/test_vehicle_search.py
+import unittest
+
+from sqlalchemy import event, insert, update
+
+from application import create_app, db
+from application.models import Customer, Vehicle
+from application.search import edit_distance, matching_criteria, search_terms, search_vehicles, similarity
+from auth.tokens import encode_token
+from config import TestConfig
+
+
+class TestVehicleSearch(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+
+        customer = Customer(first_name="Search", last_name="Er", email="search@example.com")
+        db.session.add(customer)
+        db.session.flush()
+        self.customer_id = customer.id
+        self.camry, self.civic, self.corolla = (
+            Vehicle(customer_id=customer.id, make=make, model=model, year=2018, vin=vin, license_plate=plate)
+            for make, model, vin, plate in [
+                ('Toyota', 'Camry', '4T1BF1FK5CU000001', 'ABC-1234'),
+                ('Honda', 'Civic', '2HGFC2F59JH000002', 'XYZ 987'),
+                ('Toyota', 'Corolla', '2T1BURHE0JC000003', None),
+            ]
+        )
+        db.session.add_all([self.camry, self.civic, self.corolla])
+        db.session.commit()
+        self.headers = {'Authorization': f'Bearer {encode_token(self.customer_id)}'}
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def models(self, query, **kwargs):
+        vehicles, fuzzy = search_vehicles(query, **kwargs)
+        return [vehicle.model for vehicle in vehicles], fuzzy
+
+    def test_matches_substrings_of_every_column(self):
+        self.assertEqual(self.models('TOYOTA'), (['Camry', 'Corolla'], False))
+        self.assertEqual(self.models('orol'), (['Corolla'], False))
+        self.assertEqual(self.models('000002'), (['Civic'], False))
+        self.assertEqual(self.models('abc-12'), (['Camry'], False))
+
+    def test_every_term_must_match(self):
+        self.assertEqual(self.models('toyota cam'), (['Camry'], False))
+        self.assertEqual(self.models('honda camry'), ([], False))
+
+    def test_short_terms_match_prefixes(self):
+        self.assertEqual(self.models('to'), (['Camry', 'Corolla'], False))
+        self.assertEqual(self.models('ta'), ([], False))
+        self.assertEqual(self.models('toyota co'), (['Corolla'], False))
+
+    def test_typos_fall_back_to_near_misses(self):
+        self.assertEqual(self.models('camyr'), (['Camry'], True))
+        self.assertEqual(self.models('hnoda civc'), (['Civic'], True))
+        # No trigram in common with the word they misspell
+        self.assertEqual(self.models('hnoda'), (['Civic'], True))
+        self.assertEqual(self.models('cmary'), (['Camry'], True))
+        self.assertEqual(self.models('hondda'), (['Civic'], True))
+        self.assertEqual(self.models('toyta', limit=1), (['Camry'], True))
+        self.assertEqual(self.models('camyr', fuzzy=False), ([], False))
+        self.assertEqual(self.models('zzzzzz'), ([], False))
+
+    def test_index_follows_orm_and_bulk_writes(self):
+        self.camry.model = 'Supra'
+        db.session.delete(self.civic)
+        db.session.commit()
+        self.assertEqual(self.models('supra'), (['Supra'], False))
+        self.assertEqual(self.models('camry', fuzzy=False), ([], False))
+        self.assertEqual(self.models('civic', fuzzy=False), ([], False))
+
+        db.session.execute(insert(Vehicle), [{'customer_id': self.customer_id, 'make': 'Ford',
+                                              'model': 'Mustang', 'year': 1967, 'vin': '7R01C000000000004'}])
+        db.session.execute(update(Vehicle).where(Vehicle.make == 'Toyota').values(make='Lexus'))
+        db.session.commit()
+        self.assertEqual(self.models('mustang'), (['Mustang'], False))
+        self.assertEqual(self.models('lexus'), (['Supra', 'Corolla'], False))
+
+    def test_uses_the_search_index(self):
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            search_vehicles('toyota')
+            Vehicle.query.filter(*matching_criteria(['honda'], columns=('make',))).all()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+        self.assertEqual(len(statements), 2)
+        for statement in statements:
+            self.assertIn('vehicle_search MATCH', statement)
+            self.assertNotIn('lower(', statement)
+
+    def test_column_scoped_criteria(self):
+        by_make = Vehicle.query.filter(*matching_criteria(search_terms('hond'), columns=('make',))).all()
+        self.assertEqual([vehicle.model for vehicle in by_make], ['Civic'])
+        self.assertEqual(Vehicle.query.filter(*matching_criteria(['civic'], columns=('make',))).count(), 0)
+
+    def test_make_filter_matches_short_terms_anywhere(self):
+        db.session.add(Vehicle(customer_id=self.customer_id, make='VW', model='Golf', year=2015,
+                               vin='WVWZZZ1KZFW000004'))
+        db.session.commit()
+        response = self.client.get('/vehicles/vehicles?make=w', headers=self.headers)
+        self.assertEqual([vehicle['model'] for vehicle in response.get_json()], ['Golf'])
+
+    def test_search_endpoint(self):
+        response = self.client.get('/vehicles/vehicles/search?q=toyota+cor', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertFalse(data['fuzzy'])
+        self.assertEqual([vehicle['vin'] for vehicle in data['vehicles']], ['2T1BURHE0JC000003'])
+
+        response = self.client.get('/vehicles/vehicles/search?q=camyr', headers=self.headers)
+        self.assertTrue(response.get_json()['fuzzy'])
+
+        self.assertEqual(self.client.get('/vehicles/vehicles/search?q=+', headers=self.headers).status_code, 400)
+        self.assertEqual(self.client.get('/vehicles/vehicles/search?q=ford&limit=500',
+                                         headers=self.headers).status_code, 400)
+        self.assertEqual(self.client.get('/vehicles/vehicles/search?q=ford').status_code, 401)
+
+    def test_similarity_helpers(self):
+        self.assertEqual(edit_distance('hnoda', 'honda'), 1)
+        self.assertEqual(edit_distance('kitten', 'sitting'), 3)
+        self.assertEqual(similarity('toyota', 'toyota'), 1.0)
+        self.assertGreater(similarity('toyta', 'toyota'), 0.3)
+        self.assertEqual(similarity('', 'toyota'), 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+# tests/test_vin_lookup.py
+import unittest
+
+from sqlalchemy import event, update
+
+from application import create_app, db
+from application.models import Customer, Vehicle
+from application.vin_lookup import clear_vin_cache, lookup_vin, lookup_vins, vin_cache_stats
+from auth.tokens import encode_token
+from config import TestConfig
+
+
+class TestVinLookup(unittest.TestCase):
+
+    def setUp(self):
+        self.app = create_app(TestConfig)
+        self.client = self.app.test_client()
+        self.app_context = self.app.app_context()
+        self.app_context.push()
+        db.create_all()
+        clear_vin_cache()
+
+        customer = Customer(first_name="Front", last_name="Desk", email="desk@example.com")
+        db.session.add(customer)
+        db.session.flush()
+        self.customer_id = customer.id
+        self.vehicles = [
+            Vehicle(customer_id=customer.id, make="Honda", model="Accord", year=2003,
+                    vin=f" 1hgcm82633a00435{i} ")
+            for i in range(3)
+        ]
+        db.session.add_all(self.vehicles)
+        db.session.commit()
+        self.headers = {'Authorization': f'Bearer {encode_token(self.customer_id)}'}
+
+    def tearDown(self):
+        clear_vin_cache()
+        db.session.remove()
+        db.drop_all()
+        self.app_context.pop()
+
+    def count_statements(self, call):
+        statements = []
+        listener = lambda *args: statements.append(args[2])
+        event.listen(db.engine, 'before_cursor_execute', listener)
+        try:
+            result = call()
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', listener)
+        return len(statements), result
+
+    def test_vins_are_stored_normalized(self):
+        self.assertEqual(self.vehicles[0].vin, '1HGCM82633A004350')
+        self.assertEqual(Vehicle.get_by_vin('  1hgcm82633a004351').id, self.vehicles[1].id)
+        self.assertIsNone(Vehicle.get_by_vin('1HGCM82633A009999'))
+
+    def test_lookup_is_cached(self):
+        count, vehicle = self.count_statements(lambda: lookup_vin('1hgcm82633a004350'))
+        self.assertEqual((count, vehicle['make']), (1, 'Honda'))
+
+        count, again = self.count_statements(lambda: lookup_vin('1HGCM82633A004350 '))
+        self.assertEqual((count, again['id']), (0, vehicle['id']))
+        self.assertEqual(vin_cache_stats()['hits'], 1)
+
+    def test_misses_are_not_cached(self):
+        self.assertIsNone(lookup_vin('2T1BURHE0JC000009'))
+        db.session.add(Vehicle(customer_id=self.customer_id, make="Toyota", model="Corolla", year=2018,
+                               vin='2T1BURHE0JC000009'))
+        db.session.commit()
+        self.assertEqual(lookup_vin('2t1burhe0jc000009')['model'], 'Corolla')
+
+    def test_orm_writes_evict(self):
+        lookup_vins(['1HGCM82633A004350', '1HGCM82633A004351'])
+        db.session.expire_all()
+
+        self.vehicles[0].model = 'Civic'
+        self.vehicles[1].vin = '1HGCM82633A004359'
+        db.session.commit()
+
+        self.assertEqual(lookup_vin('1HGCM82633A004350')['model'], 'Civic')
+        self.assertIsNone(lookup_vin('1HGCM82633A004351'))
+        self.assertEqual(lookup_vin('1HGCM82633A004359')['id'], self.vehicles[1].id)
+
+        db.session.delete(self.vehicles[0])
+        db.session.commit()
+        self.assertIsNone(lookup_vin('1HGCM82633A004350'))
+
+    def test_bulk_writes_evict(self):
+        lookup_vins(['1HGCM82633A004350', '1HGCM82633A004351'])
+        db.session.execute(update(Vehicle).where(Vehicle.vin == '1HGCM82633A004350').values(model='Civic'))
+        db.session.commit()
+        self.assertEqual(lookup_vin('1HGCM82633A004350')['model'], 'Civic')
+
+        response = self.client.delete(f'/customers/{self.customer_id}', headers=self.headers)
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(lookup_vins(['1HGCM82633A004350', '1HGCM82633A004351']),
+                         {'1HGCM82633A004350': None, '1HGCM82633A004351': None})
+
+    def test_rolled_back_writes_keep_the_cache(self):
+        lookup_vin('1HGCM82633A004350')
+        self.vehicles[0].model = 'Civic'
+        db.session.flush()
+        db.session.rollback()
+        count, vehicle = self.count_statements(lambda: lookup_vin('1HGCM82633A004350'))
+        self.assertEqual((count, vehicle['model']), (0, 'Accord'))
+
+    def test_batch_lookup_queries_only_misses(self):
+        lookup_vin('1HGCM82633A004350')
+        count, results = self.count_statements(lambda: lookup_vins(
+            ['1hgcm82633a004351', '1HGCM82633A004350', '1HGCM82633A004352', '1HGCM82633A004351',
+             'NOPE']
+        ))
+        self.assertEqual(count, 1)
+        self.assertEqual(list(results), ['1HGCM82633A004351', '1HGCM82633A004350', '1HGCM82633A004352', 'NOPE'])
+        self.assertIsNone(results['NOPE'])
+
+        # Bulk statements evict too, even without a WHERE clause
+        db.session.execute(update(Vehicle).values(model='Pilot'))
+        db.session.commit()
+        self.assertEqual(lookup_vin('1HGCM82633A004350')['model'], 'Pilot')
+
+    def test_by_vin_endpoint(self):
+        response = self.client.get('/vehicles/by-vin/1hgcm82633a004352', headers=self.headers)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['vin'], '1HGCM82633A004352')
+
+        response = self.client.get('/vehicles/by-vin/1HGCM82633A009999', headers=self.headers)
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(self.client.get('/vehicles/by-vin/1HGCM82633A004352').status_code, 401)
+
+    def test_batch_endpoint(self):
+        response = self.client.post('/vehicles/by-vin', headers=self.headers,
+                                    json={'vins': ['1hgcm82633a004350', '1HGCM82633A009999']})
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual(list(data['vehicles']), ['1HGCM82633A004350'])
+        self.assertEqual(data['not_found'], ['1HGCM82633A009999'])
+
+        for body in ({}, {'vins': []}, {'vins': 'x'}, {'vins': [1]}):
+            self.assertEqual(self.client.post('/vehicles/by-vin', headers=self.headers, json=body).status_code, 400)
+        response = self.client.post('/vehicles/by-vin', headers=self.headers, json={'vins': ['X'] * 501})
+        self.assertEqual(response.status_code, 413)
+
+
+if __name__ == '__main__':
+    unittest.main()